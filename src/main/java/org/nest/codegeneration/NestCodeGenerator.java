@@ -13,6 +13,7 @@ import org.nest.codegeneration.converters.NESTReferenceConverter;
 import org.nest.codegeneration.helpers.*;
 import org.nest.codegeneration.sympy.EquationsBlockProcessor;
 import org.nest.codegeneration.sympy.OdeTransformer;
+import org.nest.codegeneration.sympy.SolverOutput;
 import org.nest.nestml._ast.ASTEquationsBlock;
 import org.nest.nestml._ast.ASTNESTMLCompilationUnit;
 import org.nest.nestml._ast.ASTNeuron;
@@ -23,8 +24,10 @@ import org.nest.nestml.prettyprinter.ExpressionsPrettyPrinter;
 import org.nest.nestml.prettyprinter.LegacyExpressionPrinter;
 import org.nest.reporting.Reporter;
 import org.nest.utils.AstUtils;
+import org.nest.utils.ContentHash;
 
 import java.io.File;
+import java.io.IOException;
 import java.nio.file.Path;
 import java.nio.file.Paths;
 import java.util.List;
@@ -41,6 +44,9 @@ import static org.nest.utils.AstUtils.getAllNeurons;
  */
 public class NestCodeGenerator {
   private final static Reporter reporter = Reporter.get();
+  private final static String DEFAULT_GSL_STEPPER = "rkf45";
+  private final static String TEMPLATES_FOLDER = "org/nest/nestml/";
+  private final static String TEMPLATE_SUFFIX = ".ftl";
   private final EquationsBlockProcessor equationsBlockProcessor;
   private final Boolean enableTracing ;
 
@@ -62,6 +68,16 @@ public class NestCodeGenerator {
                             + root.getArtifactName() + "." + NESTMLLanguage.FILE_ENDING);
   }
 
+  /**
+   * Solves the equations blocks of all neurons in parallel. Afterwards, the code is generated neuron by neuron with
+   * {@link #analyseAndGenerate(ASTNESTMLCompilationUnit, Path)} without waiting for the solver.
+   */
+  public void solveEquationsBlocks(
+      final List<ASTNESTMLCompilationUnit> modelRoots,
+      final Path outputBase) {
+    equationsBlockProcessor.solveInBatch(getAllNeurons(modelRoots), outputBase);
+  }
+
   private void analyseAndGenerate(
       final ASTNeuron astNeuron,
       final Path outputBase) {
@@ -191,6 +207,27 @@ public class NestCodeGenerator {
     reporter.reportProgress("Successfully generated NEST module code in " + outputDirectory.toAbsolutePath());
   }
 
+  /**
+   * @return Hash of the solver scripts which solve the equations blocks
+   */
+  public String solverVersion() throws IOException {
+    return EquationsBlockProcessor.solverVersion();
+  }
+
+  /**
+   * @return The python interpreter and the SymPy version which solve the equations blocks
+   */
+  public String solverEnvironment() throws IOException {
+    return EquationsBlockProcessor.solverEnvironment();
+  }
+
+  /**
+   * @return Hash of the templates of the neuron and module code
+   */
+  public String templatesVersion() throws IOException {
+    return ContentHash.ofResources(getClass().getClassLoader(), TEMPLATES_FOLDER, TEMPLATE_SUFFIX);
+  }
+
   private GlobalExtensionManagement getGlexConfiguration() {
     final GlobalExtensionManagement glex = new GlobalExtensionManagement();
     final NESTReferenceConverter converter = new NESTReferenceConverter(false);
@@ -242,6 +279,7 @@ public class NestCodeGenerator {
 
   private void defineSolverType(final GlobalExtensionManagement glex, final ASTNeuron neuron) {
     glex.setGlobalValue("useGSL", false);
+    defineGslStepper(glex, neuron);
 
     if (neuron.findEquationsBlock().isPresent()) {
       if (!functionShapeExists(neuron.findEquationsBlock().get().getShapes()) ||
@@ -258,6 +296,31 @@ public class NestCodeGenerator {
 
   }
 
+  /**
+   * Uses the GSL stepper which the solver recommends after the stiffness analysis of the ODEs. The initial step size is
+   * empty if there is no recommendation, then the integration starts with the simulation resolution. The Jacobian of
+   * the ODEs is generated if the solver computed it. bsimp requires the Jacobian, therefore, the implicit rk4imp is used
+   * instead if it is missing.
+   */
+  private void defineGslStepper(final GlobalExtensionManagement glex, final ASTNeuron neuron) {
+    final Optional<SolverOutput.Integrator> integrator = equationsBlockProcessor.getIntegrator(neuron.getName());
+    final Optional<GslJacobian> jacobian = equationsBlockProcessor.getNumericSolution(neuron.getName())
+        .flatMap(solverOutput -> GslJacobian.create(neuron, solverOutput));
+    String stepper = integrator.map(recommendation -> recommendation.stepper).orElse(DEFAULT_GSL_STEPPER);
+    if (stepper.equals("bsimp") && !jacobian.isPresent()) {
+      stepper = "rk4imp";
+    }
+
+    glex.setGlobalValue("useGslJacobian", jacobian.isPresent());
+    jacobian.ifPresent(printedJacobian -> glex.setGlobalValue("gslJacobian", printedJacobian));
+
+    glex.setGlobalValue("gslStepper", stepper);
+    glex.setGlobalValue("gslStepSize", integrator
+        .filter(recommendation -> recommendation.step_size != null)
+        .map(recommendation -> Double.toString(recommendation.step_size))
+        .orElse(""));
+  }
+
   private boolean functionShapeExists(final List<ASTShape> shapes) {
     return shapes.stream().anyMatch(shape -> shape.getLhs().getDifferentialOrder().size() == 0);
   }
@@ -0,0 +1,141 @@
+/*
+ * Copyright (c) 2015 RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.codegeneration.helpers;
+
+import com.google.common.collect.Lists;
+import com.google.common.collect.Sets;
+import de.monticore.symboltable.Scope;
+import org.nest.codegeneration.converters.GslReferenceConverter;
+import org.nest.codegeneration.sympy.AstCreator;
+import org.nest.codegeneration.sympy.SolverOutput;
+import org.nest.nestml._ast.ASTExpr;
+import org.nest.nestml._ast.ASTNeuron;
+import org.nest.nestml._ast.ASTVariable;
+import org.nest.nestml._symboltable.symbols.VariableSymbol;
+import org.nest.nestml.prettyprinter.ExpressionsPrettyPrinter;
+import org.nest.nestml.prettyprinter.LegacyExpressionPrinter;
+import org.nest.utils.AstUtils;
+
+import java.util.List;
+import java.util.Map;
+import java.util.Optional;
+import java.util.Set;
+
+import static com.google.common.base.Preconditions.checkArgument;
+
+/**
+ * Prints the body of the GSL Jacobian function from the Jacobian which the solver computes for the numeric
+ * integration: the temporaries with the common subexpressions and the assignments of the non-zero entries of the
+ * row-major matrix dfdy. All other entries and df/dt are zero.
+ *
+ * @author plotnikov
+ */
+@SuppressWarnings({"unused"})
+public class GslJacobian {
+  private final List<String> temporaries;
+  private final List<String> entries;
+
+  private GslJacobian(final List<String> temporaries, final List<String> entries) {
+    this.temporaries = temporaries;
+    this.entries = entries;
+  }
+
+  /**
+   * @param astNeuron Neuron with the ODEs of all state variables and the symbol table
+   * @param solverOutput Output of a numeric solution
+   * @return The printed Jacobian or an empty optional if the solver didn't compute the Jacobian or it refers to variables
+   * which are not defined in the neuron
+   */
+  public static Optional<GslJacobian> create(final ASTNeuron astNeuron, final SolverOutput solverOutput) {
+    checkArgument(astNeuron.getSpannedScope().isPresent(), "Run symbol table creator.");
+    if (solverOutput.jacobian == null) {
+      return Optional.empty();
+    }
+
+    final Scope scope = astNeuron.getSpannedScope().get();
+    final Set<String> temporaryNames = Sets.newHashSet();
+    final ExpressionsPrettyPrinter printer = new LegacyExpressionPrinter(new JacobianReferenceConverter(temporaryNames));
+
+    final List<String> temporaries = Lists.newArrayList();
+    for (final Map.Entry<String, String> subexpression : solverOutput.jacobian_subexpressions) {
+      final Optional<ASTExpr> definition = createExpression(subexpression.getValue(), scope, temporaryNames);
+      if (!definition.isPresent()) {
+        return Optional.empty();
+      }
+      temporaries.add("const double " + subexpression.getKey() + " = " + printer.print(definition.get()) + ";");
+      temporaryNames.add(subexpression.getKey());
+    }
+
+    final List<String> entries = Lists.newArrayList();
+    for (final SolverOutput.JacobianEntry entry : solverOutput.jacobian) {
+      final Optional<VariableSymbol> row = resolveStateVariable(entry.row, scope);
+      final Optional<VariableSymbol> column = resolveStateVariable(entry.column, scope);
+      final Optional<ASTExpr> value = createExpression(entry.value, scope, temporaryNames);
+      if (!row.isPresent() || !column.isPresent() || !value.isPresent()) {
+        return Optional.empty();
+      }
+      entries.add(String.format("dfdy[ %s * State_::STATE_VEC_SIZE + %s ] = %s;",
+          GslNames.arrayIndex(row.get()), GslNames.arrayIndex(column.get()), printer.print(value.get())));
+    }
+
+    return Optional.of(new GslJacobian(temporaries, entries));
+  }
+
+  public List<String> getTemporaries() {
+    return temporaries;
+  }
+
+  public List<String> getEntries() {
+    return entries;
+  }
+
+  private static Optional<VariableSymbol> resolveStateVariable(final String name, final Scope scope) {
+    return VariableSymbol.resolveIfExists(name, scope)
+        .filter(variableSymbol -> variableSymbol.isInInitialValues() && !variableSymbol.isFunction());
+  }
+
+  /**
+   * Parses the expression and sets the scope of the neuron as the enclosing scope of its variables.
+   * @return The expression or an empty optional if it uses a variable which is neither defined in the neuron nor a
+   * temporary
+   */
+  private static Optional<ASTExpr> createExpression(
+      final String expression,
+      final Scope scope,
+      final Set<String> temporaryNames) {
+    final ASTExpr astExpr = AstCreator.createExpression(expression);
+    for (final ASTVariable astVariable : AstUtils.getAll(astExpr, ASTVariable.class)) {
+      if (!temporaryNames.contains(astVariable.toString()) &&
+          !VariableSymbol.resolveIfExists(astVariable.toString(), scope).isPresent()) {
+        return Optional.empty();
+      }
+      astVariable.setEnclosingScope(scope);
+    }
+
+    return Optional.of(astExpr);
+  }
+
+  /**
+   * Prints the temporaries of the common subexpressions by their names, all other variables as in the GSL dynamics.
+   */
+  private static class JacobianReferenceConverter extends GslReferenceConverter {
+    private final Set<String> temporaryNames;
+
+    JacobianReferenceConverter(final Set<String> temporaryNames) {
+      this.temporaryNames = temporaryNames;
+    }
+
+    @Override
+    public String convertNameReference(final ASTVariable astVariable) {
+      if (temporaryNames.contains(astVariable.toString())) {
+        return astVariable.toString();
+      }
+      return super.convertNameReference(astVariable);
+    }
+
+  }
+
+}
@@ -37,6 +37,18 @@ public class AstCreator {
 
   }
 
+  public static ASTExpr createExpression(final String expression) {
+    try {
+      // it is ok to call get, since otherwise it is an error in the solver output
+      return PARSER.parseExpr(new StringReader(expression)).get();
+    }
+    catch (IOException e) {
+      final String msg = "Cannot parse expression.";
+      throw new RuntimeException(msg, e);
+    }
+
+  }
+
   static ASTAssignment createAssignment(final String assignmentAsString) {
     try {
       // it is ok to call get, since otherwise it is an error in the file structure
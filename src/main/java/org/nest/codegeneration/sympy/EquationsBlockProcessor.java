@@ -6,7 +6,9 @@
 package org.nest.codegeneration.sympy;
 
 import com.google.common.collect.Lists;
+import com.google.common.collect.Maps;
 import org.nest.nestml._ast.ASTAssignment;
+import org.nest.nestml._ast.ASTEquationsBlock;
 import org.nest.nestml._ast.ASTFunctionCall;
 import org.nest.nestml._ast.ASTNeuron;
 import org.nest.nestml._ast.ASTShape;
@@ -14,8 +16,11 @@ import org.nest.nestml._symboltable.symbols.VariableSymbol;
 import org.nest.nestml.prettyprinter.ExpressionsPrettyPrinter;
 import org.nest.reporting.Reporter;
 
+import java.io.IOException;
 import java.nio.file.Path;
 import java.util.List;
+import java.util.Map;
+import java.util.Optional;
 import java.util.stream.Collectors;
 
 import static org.nest.codegeneration.sympy.TransformerBase.applyIncomingSpikes;
@@ -33,6 +38,9 @@ public class EquationsBlockProcessor {
   private final ExactSolutionTransformer exactSolutionTransformer = new ExactSolutionTransformer();
   private final ShapesToOdesTransformer shapesToOdesTransformer = new ShapesToOdesTransformer();
   private final DeltaSolutionTransformer deltaSolutionTransformer = new DeltaSolutionTransformer();
+  private final GatingVariablesTransformer gatingVariablesTransformer = new GatingVariablesTransformer();
+  // the solver outputs of the neurons whose ODEs are integrated numerically. Key: neuron name
+  private final Map<String, SolverOutput> numericSolutions = Maps.newHashMap();
 
   /**
    * Dependent of the ODE kind either computes the exact solution or brings to the form which can
@@ -48,15 +56,24 @@ public class EquationsBlockProcessor {
 
       final ASTNeuron deepCopy = deepCloneNeuronAndBuildSymbolTable(workingVersion, outputBase);
       // this function is called only for neurons with an ode block. thus, retrieving it is safe.
-      if (workingVersion.findEquationsBlock().get().getShapes().size() > 0 &&
-          !odeShapeExists(workingVersion.findEquationsBlock().get().getShapes()) &&
-          workingVersion.findEquationsBlock().get().getEquations().size() == 1) {
+      final SolverTask solverTask = solverTask(workingVersion.findEquationsBlock().get());
+      if (solverTask == SolverTask.EQUATIONS_WITH_SHAPES) {
 
         // this uses the copy of the AST since the python generator changes the AST during the generation
-        final SolverOutput solverOutput = evaluator.solveOdeWithShapes(deepCopy.findEquationsBlock().get(), outputBase);
+        final SolverOutput solverOutput = evaluator.solveOdeWithShapes(deepCopy, outputBase);
         reporter.reportProgress("The model ODE with shapes will be analyzed.");
         reporter.reportProgress("The solver script is evaluated. Results are stored under " + outputBase.toString());
 
+        // shapes in the ODE form are only propagated exactly. otherwise, the ODEs are integrated as they are written.
+        if (odeShapeExists(workingVersion.findEquationsBlock().get().getShapes()) &&
+            !(solverOutput.status.equals("success") && "exact".equals(solverOutput.solver))) {
+          reporter.reportProgress(astNeuron.getName() +
+                                  ": The shapes in the ODE form cannot be solved exactly. The ODEs are integrated " +
+                                  "numerically.");
+          applyIncomingSpikes(workingVersion);
+          return workingVersion;
+        }
+
         if (!solverOutput.status.equals("success")) {
           reporter.reportProgress(astNeuron.getName() +
                                   ": Equations or shapes could not be solved. The model remains unchanged.",
@@ -72,7 +89,21 @@ public class EquationsBlockProcessor {
 
           case "numeric":
             reporter.reportProgress("Shapes will be solved with GLS.");
+            if (solverOutput.integrator != null) {
+              reporter.reportProgress(astNeuron.getName() + ": the recommended GSL stepper is " + solverOutput.integrator);
+            }
+            if (solverOutput.jacobian != null) {
+              reporter.reportProgress(astNeuron.getName() + ": the Jacobian of the ODEs has " +
+                                      solverOutput.jacobian.size() + " non-zero entries");
+            }
+            numericSolutions.put(astNeuron.getName(), solverOutput);
+
             workingVersion =  shapesToOdesTransformer.transformShapesToOdeForm(astNeuron, solverOutput);
+            if (!solverOutput.gating_variables.isEmpty()) {
+              reporter.reportProgress(astNeuron.getName() + ": the gating variables " + solverOutput.gating_variables +
+                                      " are updated with the exponential Euler method");
+              workingVersion = gatingVariablesTransformer.addGatingUpdates(workingVersion, solverOutput);
+            }
             break;
 
           case "delta":
@@ -84,8 +115,7 @@ public class EquationsBlockProcessor {
             return workingVersion;
         }
       }
-      else if (workingVersion.findEquationsBlock().get().getShapes().size() > 0 &&
-               !odeShapeExists(workingVersion.findEquationsBlock().get().getShapes())) {
+      else if (solverTask == SolverTask.SHAPES) {
         reporter.reportProgress("Shapes will be solved with GLS.");
         final SolverOutput solverOutput = evaluator.solveShapes(deepCopy.findEquationsBlock().get().getShapes(), outputBase);
         workingVersion =  shapesToOdesTransformer.transformShapesToOdeForm(astNeuron, solverOutput);
@@ -100,6 +130,90 @@ public class EquationsBlockProcessor {
     return workingVersion;
   }
 
+  /**
+   * Solves the equations blocks of all neurons in parallel. The results are reused by the subsequent calls of
+   * {@link #solveOdeWithShapes(ASTNeuron, Path)}.
+   * @param neurons Neurons which are processed during the frontend run
+   * @param outputBase Folder where the solver scripts are evaluated
+   */
+  public void solveInBatch(final List<ASTNeuron> neurons, final Path outputBase) {
+    final Map<String, SolverInput> solverInputs = Maps.newHashMap();
+    for (final ASTNeuron astNeuron:neurons) {
+      if (astNeuron.findEquationsBlock().isPresent()) {
+        final ASTNeuron deepCopy = deepCloneNeuronAndBuildSymbolTable(astNeuron, outputBase);
+        createSolverInput(deepCopy)
+            .ifPresent(solverInput -> solverInputs.put(astNeuron.getName(), solverInput));
+      }
+
+    }
+
+    evaluator.solveInBatch(solverInputs, outputBase);
+  }
+
+  /**
+   * Creates the same solver input as {@link #solveOdeWithShapes(ASTNeuron, Path)} passes to the solver.
+   */
+  private Optional<SolverInput> createSolverInput(final ASTNeuron astNeuron) {
+    final ASTEquationsBlock equationsBlock = astNeuron.findEquationsBlock().get();
+    switch (solverTask(equationsBlock)) {
+      case EQUATIONS_WITH_SHAPES:
+        return Optional.of(new SolverInput(astNeuron));
+      case SHAPES:
+        return Optional.of(new SolverInput(equationsBlock.getShapes()));
+      default:
+        return Optional.empty();
+    }
+
+  }
+
+  /**
+   * What the solver computes for an equations block: the solution of the equations with the shapes, the ODE form of
+   * the shapes or nothing, i.e. the shapes in the ODE form are integrated as they are written.
+   */
+  private enum SolverTask {
+    EQUATIONS_WITH_SHAPES, SHAPES, NONE
+  }
+
+  private SolverTask solverTask(final ASTEquationsBlock equationsBlock) {
+    if (equationsBlock.getShapes().size() > 0 && equationsBlock.getEquations().size() > 0) {
+      return SolverTask.EQUATIONS_WITH_SHAPES;
+    }
+    else if (equationsBlock.getShapes().size() > 0 && !odeShapeExists(equationsBlock.getShapes())) {
+      return SolverTask.SHAPES;
+    }
+    return SolverTask.NONE;
+  }
+
+  /**
+   * @param neuronName Name of a neuron which was processed by {@link #solveOdeWithShapes(ASTNeuron, Path)}
+   * @return The GSL stepper which the solver recommends for the numeric integration of the neuron ODEs
+   */
+  public Optional<SolverOutput.Integrator> getIntegrator(final String neuronName) {
+    return getNumericSolution(neuronName).map(solverOutput -> solverOutput.integrator);
+  }
+
+  /**
+   * @param neuronName Name of a neuron which was processed by {@link #solveOdeWithShapes(ASTNeuron, Path)}
+   * @return The solver output of the neuron if its ODEs are integrated numerically, e.g. with the Jacobian of the ODEs
+   */
+  public Optional<SolverOutput> getNumericSolution(final String neuronName) {
+    return Optional.ofNullable(numericSolutions.get(neuronName));
+  }
+
+  /**
+   * @return Hash of the solver scripts. A changed solver can change the solutions of all neurons.
+   */
+  public static String solverVersion() throws IOException {
+    return SymPySolver.version();
+  }
+
+  /**
+   * @return The python interpreter and the SymPy version which solve the equations blocks
+   */
+  public static String solverEnvironment() throws IOException {
+    return SymPySolver.environment();
+  }
+
   private boolean odeShapeExists(final List<ASTShape> shapes) {
     return shapes.stream().anyMatch(shape -> shape.getLhs().getDifferentialOrder().size() > 0);
   }
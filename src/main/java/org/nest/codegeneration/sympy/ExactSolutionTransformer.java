@@ -34,13 +34,23 @@ class ExactSolutionTransformer {
       final SolverOutput solverOutput) {
     ASTNeuron workingVersion = astNeuron;
     workingVersion.addToInternalBlock(createDeclaration("__h ms = resolution()"));
+    // the propagators are defined in terms of the common subexpressions, therefore, they are declared first
+    workingVersion = addVariablesToInternals(workingVersion, solverOutput.common_subexpressions);
+
+    // the solution of a system of ODEs propagates all state variables through the propagator elements
+    if (solverOutput.ode_var_factor != null) {
+      workingVersion = addVariableToInternals(workingVersion, solverOutput.ode_var_factor);
+    }
 
-    workingVersion = addVariableToInternals(workingVersion, solverOutput.ode_var_factor);
     workingVersion = addVariablesToInternals(workingVersion, solverOutput.propagator_elements);
 
     final List<Map.Entry<String, String>> stateShapeVariablesWithInitialValues =
         computeShapeStateVariablesWithInitialValues(solverOutput);
 
+    // the shapes in the ODE form are propagated through the shape state variables of the solution, e.g. `g_ex__1`
+    // replaces `g_ex'`
+    removeShapeOdeInitialValues(workingVersion);
+
     // copy initial block variables to the state block, since they are not backed through an ODE.
     astNeuron.getInitialValuesDeclarations().forEach(astNeuron::addToStateBlock);
 
@@ -53,6 +63,11 @@ class ExactSolutionTransformer {
         solverOutput.ode_var_update_instructions);
 
     applyIncomingSpikes(workingVersion);
+    applyIncomingSpikesToMergedShapes(workingVersion, solverOutput);
+    if (!solverOutput.delta_shapes.isEmpty()) {
+      applyIncomingSpikesToDeltaShapes(
+          workingVersion, solverOutput, workingVersion.getEquations().get(0).getLhs().getName());
+    }
 
     // get rid of the ODE stuff since the model is solved exactly and all ODEs are removed.
     workingVersion.removeEquationsBlock();
@@ -69,6 +84,17 @@ class ExactSolutionTransformer {
     return workingVersion;
   }
 
+  private void removeShapeOdeInitialValues(final ASTNeuron astNeuron) {
+    final Set<String> shapeOdes = astNeuron.findEquationsBlock().get().getShapes()
+        .stream()
+        .filter(shape -> shape.getLhs().getDifferentialOrder().size() > 0)
+        .map(shape -> shape.getLhs().getName())
+        .collect(toSet());
+
+    astNeuron.getInitialValuesBlock().ifPresent(block -> block.getDeclarations().removeIf(
+        declaration -> declaration.getVars().stream().allMatch(variable -> shapeOdes.contains(variable.getName()))));
+  }
+
   private void addStateUpdates(final SolverOutput solverOutput, final ASTNeuron astNeuron)  {
     final Set<String> tempVariables = solverOutput.updates_to_shape_state_variables
         .stream()
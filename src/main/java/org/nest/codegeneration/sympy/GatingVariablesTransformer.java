@@ -0,0 +1,52 @@
+/*
+ * Copyright (c)  RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.codegeneration.sympy;
+
+import org.nest.nestml._ast.ASTDeclaration;
+import org.nest.nestml._ast.ASTNeuron;
+
+import java.util.List;
+import java.util.stream.Collectors;
+
+import static com.google.common.base.Preconditions.checkArgument;
+import static org.nest.codegeneration.sympy.AstCreator.createDeclaration;
+
+/**
+ * Takes the SymPy result with the exponential Euler updates of the gating variables, e.g. of the activation variables
+ * of a Hodgkin-Huxley neuron, and removes their ODEs from the numerically integrated ODEs. The gating variables become
+ * state variables which are updated before the 'integrate'-call and are constant during the numeric integration.
+ *
+ * @author plotnikov
+ */
+class GatingVariablesTransformer {
+
+  ASTNeuron addGatingUpdates(final ASTNeuron astNeuron, final SolverOutput solverOutput) {
+    checkArgument(astNeuron.findEquationsBlock().isPresent());
+    final List<String> gatingVariables = solverOutput.gating_variables;
+
+    astNeuron.findEquationsBlock().get().getEquations().removeIf(
+        equation -> gatingVariables.contains(equation.getLhs().getName()));
+
+    // the gating variables are not backed through an ODE any more, therefore, they are moved to the state block
+    final List<ASTDeclaration> gatingDeclarations = astNeuron.getInitialValuesDeclarations()
+        .stream()
+        .filter(declaration -> declaration.getVars().stream().allMatch(
+            variable -> gatingVariables.contains(variable.getName())))
+        .collect(Collectors.toList());
+    astNeuron.getInitialValuesBlock().ifPresent(block -> block.getDeclarations().removeAll(gatingDeclarations));
+    gatingDeclarations.forEach(astNeuron::addToStateBlock);
+
+    final boolean isResolutionDeclared = astNeuron.getInternalDeclarations()
+        .stream()
+        .anyMatch(declaration -> declaration.getVars().stream().anyMatch(variable -> variable.getName().equals("__h")));
+    if (!isResolutionDeclared) {
+      astNeuron.addToInternalBlock(createDeclaration("__h ms = resolution()"));
+    }
+
+    return TransformerBase.addStatementsBeforeIntegrateCall(astNeuron, solverOutput.gating_update_instructions);
+  }
+
+}
@@ -24,14 +24,20 @@ package org.nest.codegeneration.sympy;
 import com.fasterxml.jackson.core.JsonProcessingException;
 import com.fasterxml.jackson.databind.ObjectMapper;
 import com.google.common.collect.Lists;
+import com.google.common.collect.Sets;
+import org.nest.nestml._ast.ASTDeclaration;
 import org.nest.nestml._ast.ASTEquation;
 import org.nest.nestml._ast.ASTEquationsBlock;
+import org.nest.nestml._ast.ASTNeuron;
 import org.nest.nestml._ast.ASTOdeFunction;
 import org.nest.nestml._ast.ASTShape;
+import org.nest.nestml._ast.ASTVariable;
 import org.nest.nestml.prettyprinter.ExpressionsPrettyPrinter;
 import org.nest.nestml.prettyprinter.NESTMLPrettyPrinter;
+import org.nest.utils.AstUtils;
 
 import java.util.List;
+import java.util.Set;
 import java.util.stream.Collectors;
 
 /**
@@ -41,13 +47,60 @@ class SolverInput {
   public final List<String> functions;
   public final List<String> shapes;
   public final String ode;
+  /**
+   * All equations of the block. The solver computes the exact solution of the whole system if it is linear. {@code ode}
+   * is only set for a block with exactly one equation.
+   */
+  public final List<String> odes;
+  /**
+   * Default values of the parameters, internals and initial values. The solver uses them to estimate the stiffness of
+   * ODEs which are integrated numerically.
+   */
+  public final List<String> parameters;
+  /**
+   * Initial values of the shapes which are defined by ODEs and of their derivatives, e.g. {@code g_ex' = e / tau_syn}.
+   * The solver propagates these shapes exactly, starting from these values after every spike.
+   */
+  public final List<String> initial_values;
+  /**
+   * Shapes which are referenced outside of the ODEs and of the shape definitions, e.g. in functions or in the update
+   * block. The solver propagates them through their own state variables, i.e. they are not merged with equivalent
+   * shapes.
+   */
+  public final List<String> referenced_shapes;
   private final ExpressionsPrettyPrinter printer = new ExpressionsPrettyPrinter();
 
   SolverInput(final ASTEquationsBlock odeBlock) {
+    this(odeBlock, Lists.newArrayList(), Lists.newArrayList(), Lists.newArrayList());
+  }
+
+  /**
+   * Additionally passes the default values of all variables of the neuron with the equations block.
+   */
+  SolverInput(final ASTNeuron astNeuron) {
+    this(
+        astNeuron.findEquationsBlock().get(),
+        printDeclarations(astNeuron),
+        printShapeInitialValues(astNeuron),
+        printReferencedShapes(astNeuron));
+  }
+
+  private SolverInput(
+      final ASTEquationsBlock odeBlock,
+      final List<String> parameters,
+      final List<String> initialValues,
+      final List<String> referencedShapes) {
+    this.parameters = parameters;
+    this.initial_values = initialValues;
+    this.referenced_shapes = referencedShapes;
     ASTEquationsBlock tmp = odeBlock.deepClone();
     tmp = OdeTransformer.replaceSumCalls(tmp);
 
-    ode = printEquation(tmp.getEquations().get(0));
+    odes = tmp.getEquations()
+        .stream()
+        .map(this::printEquation)
+        .collect(Collectors.toList());
+    ode = odes.size() == 1 ? odes.get(0) : null;
 
     functions = tmp.getOdeFunctions()
         .stream()
@@ -63,6 +116,10 @@ class SolverInput {
   public SolverInput(final List<ASTShape> shapes) {
     this.functions = Lists.newArrayList();
     this.ode = null;
+    this.odes = Lists.newArrayList();
+    this.parameters = Lists.newArrayList();
+    this.initial_values = Lists.newArrayList();
+    this.referenced_shapes = Lists.newArrayList();
     this.shapes = shapes
         .stream()
         .map(this::printShape)
@@ -91,6 +148,84 @@ class SolverInput {
     return astShape.getLhs() + " = " + printer.print(astShape.getRhs());
   }
 
+  private static List<String> printDeclarations(final ASTNeuron astNeuron) {
+    final ExpressionsPrettyPrinter printer = new ExpressionsPrettyPrinter();
+    final List<ASTDeclaration> declarations = Lists.newArrayList();
+    declarations.addAll(astNeuron.getParameterDeclarations());
+    declarations.addAll(astNeuron.getInternalDeclarations());
+    declarations.addAll(astNeuron.getInitialValuesDeclarations());
+
+    final List<String> result = Lists.newArrayList();
+    for (final ASTDeclaration declaration:declarations) {
+      // vectors have no scalar value
+      if (declaration.getExpr().isPresent() && !declaration.getSizeParameter().isPresent()) {
+        for (final ASTVariable variable:declaration.getVars()) {
+          result.add(variable + " = " + printer.print(declaration.getExpr().get()));
+        }
+
+      }
+
+    }
+
+    return result;
+  }
+
+  private static List<String> printShapeInitialValues(final ASTNeuron astNeuron) {
+    final ExpressionsPrettyPrinter printer = new ExpressionsPrettyPrinter();
+    final List<String> shapeOdes = astNeuron.findEquationsBlock().get().getShapes()
+        .stream()
+        .filter(shape -> shape.getLhs().getDifferentialOrder().size() > 0)
+        .map(shape -> shape.getLhs().getName())
+        .collect(Collectors.toList());
+
+    final List<String> result = Lists.newArrayList();
+    for (final ASTDeclaration declaration:astNeuron.getInitialValuesDeclarations()) {
+      if (declaration.getExpr().isPresent()) {
+        for (final ASTVariable variable:declaration.getVars()) {
+          if (shapeOdes.contains(variable.getName())) {
+            result.add(variable + " = " + printer.print(declaration.getExpr().get()));
+          }
+
+        }
+
+      }
+
+    }
+
+    return result;
+  }
+
+  private static List<String> printReferencedShapes(final ASTNeuron astNeuron) {
+    final ASTEquationsBlock equationsBlock = astNeuron.findEquationsBlock().get();
+    final List<ASTVariable> references = Lists.newArrayList();
+    astNeuron.getBlockWithVariabless().forEach(block -> references.addAll(AstUtils.getAll(block, ASTVariable.class)));
+    astNeuron.getUpdateBlocks().forEach(block -> references.addAll(AstUtils.getAll(block, ASTVariable.class)));
+    astNeuron.getFunctions().forEach(function -> references.addAll(AstUtils.getAll(function, ASTVariable.class)));
+
+    // a shape which is convolved with a buffer in a function is a part of the ODE, e.g. `convolve(I_shape, spikes)`
+    for (final ASTOdeFunction astOdeFunction:equationsBlock.getOdeFunctions()) {
+      final Set<ASTVariable> convolvedShapes = Sets.newIdentityHashSet();
+      OdeTransformer.get_sumFunctionCalls(astOdeFunction)
+          .forEach(convolveCall -> convolvedShapes.add(convolveCall.getArgs().get(0).getVariable().get()));
+      AstUtils.getAll(astOdeFunction, ASTVariable.class)
+          .stream()
+          .filter(variable -> !convolvedShapes.contains(variable))
+          .forEach(references::add);
+    }
+
+    final Set<String> referencedNames = references
+        .stream()
+        .map(ASTVariable::getName)
+        .collect(Collectors.toSet());
+
+    // only the shapes which are defined as functions of `t` are merged by the solver
+    return equationsBlock.getShapes()
+        .stream()
+        .filter(shape -> shape.getLhs().getDifferentialOrder().isEmpty())
+        .map(shape -> shape.getLhs().getName())
+        .filter(referencedNames::contains)
+        .collect(Collectors.toList());
+  }
 
   String toJSON() {
     final ObjectMapper mapper = new ObjectMapper();
@@ -103,4 +238,18 @@ class SolverInput {
 
   }
 
+  /**
+   * The JSON representation without line breaks. It is used as a request in the JSON-lines protocol of the solver.
+   */
+  String toJSONLine() {
+    final ObjectMapper mapper = new ObjectMapper();
+    try {
+      return mapper.writeValueAsString(this);
+    }
+    catch (JsonProcessingException e) {
+      throw new RuntimeException("The construction of the JSON output. Internal error.", e);
+    }
+
+  }
+
 }
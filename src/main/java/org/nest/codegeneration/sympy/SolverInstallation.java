@@ -0,0 +1,167 @@
+/*
+ * SolverInstallation.java
+ *
+ * This file is part of NEST.
+ *
+ * Copyright (C) 2004 The NEST Initiative
+ *
+ * NEST is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * NEST is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with NEST.  If not, see <http://www.gnu.org/licenses/>.
+ */
+package org.nest.codegeneration.sympy;
+
+import com.google.common.collect.Maps;
+import org.nest.reporting.Reporter;
+import org.nest.utils.ContentHash;
+
+import java.io.IOException;
+import java.nio.file.FileAlreadyExistsException;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
+import java.util.Comparator;
+import java.util.Map;
+import java.util.SortedMap;
+import java.util.concurrent.TimeUnit;
+import java.util.stream.Stream;
+
+/**
+ * Installs the solver scripts once into a fixed folder, instead of copying them into the output folder of every
+ * frontend run. The folder is named after the hash of the scripts, therefore, a changed solver is installed next to
+ * the old one and an installed solver is never modified. The scripts are compiled to bytecode during the
+ * installation, so that the first solver process doesn't pay for the compilation.
+ *
+ * The installation location can be overridden through the environment variable {@code NESTML_SOLVER_HOME}.
+ *
+ * @author plotnikov
+ */
+class SolverInstallation {
+  private final static Reporter reporter = Reporter.get();
+
+  static final String HOME_VARIABLE = "NESTML_SOLVER_HOME";
+  private static final Path DEFAULT_HOME = Paths.get(System.getProperty("user.home"), ".nestml", "solver");
+  // is written after all scripts are installed, a folder without it is an interrupted installation
+  private static final String COMPLETE_MARKER = ".installed";
+  private static final String SCRIPT_SUFFIX = ".py";
+  private static final String TEST_SUFFIX = "_test.py";
+
+  // installed folders of the frontend run. Key: installation home
+  private static final Map<Path, Path> installations = Maps.newHashMap();
+
+  private SolverInstallation() {
+    // contains only static methods
+  }
+
+  static Path home() {
+    final String home = System.getenv(HOME_VARIABLE);
+    return home != null && !home.isEmpty() ? Paths.get(home) : DEFAULT_HOME;
+  }
+
+  /**
+   * Reads the solver scripts, i.e. all python scripts in the folder except the tests. The scripts in subfolders are not
+   * part of the solver.
+   * @param sources Classpath folder of the scripts, e.g. {@code org/nest/sympy/}
+   * @return Key: name of the script, value: content. The scripts are ordered by their names.
+   */
+  static SortedMap<String, byte[]> scripts(final String sources) throws IOException {
+    return ContentHash.readResources(SolverInstallation.class.getClassLoader(), sources, SolverInstallation::isScript);
+  }
+
+  private static boolean isScript(final String name) {
+    return !name.contains("/") && name.endsWith(SCRIPT_SUFFIX) && !name.endsWith(TEST_SUFFIX);
+  }
+
+  /**
+   * @param home Folder which contains the installed solver versions
+   * @param pythonInterpreter Interpreter which compiles the scripts
+   * @param sources Classpath folder of the scripts, e.g. {@code org/nest/sympy/}. All its {@link #scripts} are
+   *                installed.
+   * @return Folder with the installed scripts
+   */
+  static synchronized Path install(
+      final Path home,
+      final String pythonInterpreter,
+      final String sources) throws IOException {
+    final Path cachedInstallation = installations.get(home);
+    if (cachedInstallation != null && Files.exists(cachedInstallation.resolve(COMPLETE_MARKER))) {
+      return cachedInstallation;
+    }
+
+    final Map<String, byte[]> contents = scripts(sources);
+    if (contents.isEmpty()) {
+      throw new IOException("Cannot find the solver scripts in the resource folder: " + sources);
+    }
+
+    final Path installation = home.resolve(ContentHash.of(contents));
+    if (!Files.exists(installation.resolve(COMPLETE_MARKER))) {
+      Files.createDirectories(home);
+      // the scripts are installed into a temporary folder which is renamed at the end. Therefore, concurrent frontend
+      // runs never see a partial installation.
+      final Path temporary = Files.createTempDirectory(home, installation.getFileName() + ".");
+      for (final Map.Entry<String, byte[]> script:contents.entrySet()) {
+        Files.write(temporary.resolve(script.getKey()), script.getValue());
+      }
+      compile(pythonInterpreter, temporary);
+      Files.createFile(temporary.resolve(COMPLETE_MARKER));
+
+      try {
+        Files.move(temporary, installation, StandardCopyOption.ATOMIC_MOVE);
+        reporter.reportProgress("The SymPy solver scripts were installed into " + installation);
+      }
+      catch (FileAlreadyExistsException e) {
+        // another frontend run installed the same version in between
+        delete(temporary);
+      }
+      catch (IOException e) {
+        delete(temporary);
+        if (!Files.exists(installation.resolve(COMPLETE_MARKER))) {
+          throw e;
+        }
+      }
+
+    }
+
+    installations.put(home, installation);
+    return installation;
+  }
+
+  /**
+   * Compiles the scripts to bytecode. A failed compilation is not an error: the interpreter compiles the scripts when
+   * it imports them the first time.
+   */
+  private static void compile(final String pythonInterpreter, final Path folder) {
+    try {
+      final Process process = new ProcessBuilder(pythonInterpreter, "-m", "compileall", "-q", folder.toString())
+          .redirectErrorStream(true)
+          .start();
+      process.getInputStream().close();
+      if (!process.waitFor(60, TimeUnit.SECONDS)) {
+        process.destroyForcibly();
+      }
+
+    }
+    catch (IOException | InterruptedException e) {
+      reporter.reportProgress("Cannot compile the SymPy solver scripts: " + e.getMessage(), Reporter.Level.WARNING);
+    }
+
+  }
+
+  private static void delete(final Path folder) throws IOException {
+    try (final Stream<Path> files = Files.walk(folder)) {
+      files.sorted(Comparator.reverseOrder()).forEach(file -> file.toFile().delete());
+    }
+
+  }
+
+}
@@ -24,6 +24,7 @@ package org.nest.codegeneration.sympy;
 import com.fasterxml.jackson.databind.ObjectMapper;
 import com.google.common.base.Joiner;
 import com.google.common.collect.Lists;
+import com.google.common.collect.Maps;
 import com.google.common.io.Files;
 
 import java.io.IOException;
@@ -35,7 +36,9 @@ import java.util.Map;
 
 /**
  * Encapsulates solver response. Contains the following fields: status (failed, success), initial_values,
- * ode_var_update_instructions, solver, ode_var_factor, const_input, propagator_elements,shape_state_variables
+ * ode_var_update_instructions, solver, ode_var_factor, const_input, propagator_elements,shape_state_variables, cache,
+ * merged_shapes, merged_shape_initial_values, strategy, profile, common_subexpressions, integrator, jacobian,
+ * jacobian_subexpressions, delta_shapes, dependencies, gating_variables, gating_update_instructions, zero_oracle
  */
 public class SolverOutput {
   // all fields must be public since they are set by the JSON framework
@@ -50,6 +53,100 @@ public class SolverOutput {
   public List<String> shape_state_variables = Lists.newArrayList();
   public List<Map.Entry<String, String>> updates_to_shape_state_variables = Lists.newArrayList();
   public List<Map.Entry<String, String>> shape_state_odes = Lists.newArrayList();
+  // maps shapes onto the equivalent shapes whose state variables propagate them
+  public List<Map.Entry<String, String>> merged_shapes = Lists.newArrayList();
+  // weighted initial values of the merged shapes, i.e. the increments of the representative state variables per spike
+  public List<Map.Entry<String, String>> merged_shape_initial_values = Lists.newArrayList();
+  // `hit` or `miss` if the result was looked up in the solver cache, empty otherwise
+  public String cache = "";
+  // the weakest simplification strategy which stayed within the time budgets: simplify, cancel, unsimplified or numeric
+  public String strategy = "";
+  // temporaries which hold the common subexpressions of the propagator elements in the order of their definition
+  public List<Map.Entry<String, String>> common_subexpressions = Lists.newArrayList();
+  // performance records of the solver stages in the order in which the stages were finished
+  public List<StageProfile> profile = Lists.newArrayList();
+  // how often the zero test of the solver decided numerically (numeric_zero, numeric_non_zero) or symbolically
+  public Map<String, Integer> zero_oracle = Maps.newTreeMap();
+  // the recommended GSL stepper of a numeric solution, null if the solver could not estimate the stiffness
+  public Integrator integrator = null;
+  // the non-zero entries of the Jacobian of a numeric solution, null if the Jacobian cannot be printed
+  public List<JacobianEntry> jacobian = null;
+  // temporaries which hold the common subexpressions of the Jacobian entries in the order of their definition
+  public List<Map.Entry<String, String>> jacobian_subexpressions = Lists.newArrayList();
+  // maps the delta shapes of an exact solution onto the jump of the ODE variable per spike weight
+  public List<Map.Entry<String, String>> delta_shapes = Lists.newArrayList();
+  // the parameters and temporaries of every internal of an exact solution, temporaries precede their usages
+  public List<Dependency> dependencies = Lists.newArrayList();
+  // the gating variables of a numeric solution, they are updated exactly before the remaining ODEs are integrated
+  public List<String> gating_variables = Lists.newArrayList();
+  // the exponential Euler updates of the gating variables, preceded by the declarations of their temporaries
+  public List<String> gating_update_instructions = Lists.newArrayList();
+
+  /**
+   * Wall time, peak memory of the solver process and size of the result of one solver stage, e.g. of `exp(A*h)` for
+   * one shape. Memory and size are null if they were not measured.
+   */
+  public static class StageProfile {
+    public String stage = "";
+    public double time;
+    public Long peak_memory_kb;
+    public Long size;
+
+    @Override
+    public String toString() {
+      return String.format("%s: %.3f [s], peak memory: %s [kB], size: %s", stage, time, peak_memory_kb, size);
+    }
+
+  }
+
+  /**
+   * GSL stepper which is recommended by the stiffness analysis of the ODEs, e.g. rkf45 for non-stiff and rk4imp or bsimp
+   * for stiff ODEs, and the initial step size in ms. The step size is null if the ODEs have no decaying modes.
+   */
+  public static class Integrator {
+    public String stepper = "";
+    public Double step_size;
+    public double stiffness_ratio;
+
+    @Override
+    public String toString() {
+      return String.format("%s, initial step: %s [ms], stiffness ratio: %.1f", stepper, step_size, stiffness_ratio);
+    }
+
+  }
+
+  /**
+   * Partial derivative of the right hand side of the ODE of the state variable `row` by the state variable `column`.
+   * The state variables are ODE variables, e.g. V_m or V_m', and shape state variables.
+   */
+  public static class JacobianEntry {
+    public String row = "";
+    public String column = "";
+    public String value = "";
+
+    @Override
+    public String toString() {
+      return String.format("d%s'/d%s = %s", row, column, value);
+    }
+
+  }
+
+  /**
+   * Dependencies of one internal of an exact solution, i.e. of a common subexpression, the ODE variable factor, a
+   * propagator element or the constant input. `parameters` contains the variables on which the internal depends
+   * directly or through temporaries, `temporaries` the common subexpressions which it uses directly.
+   */
+  public static class Dependency {
+    public String name = "";
+    public List<String> parameters = Lists.newArrayList();
+    public List<String> temporaries = Lists.newArrayList();
+
+    @Override
+    public String toString() {
+      return String.format("%s: parameters %s, temporaries %s", name, parameters, temporaries);
+    }
+
+  }
 
   private static final SolverOutput ERROR_RESULT;
   static {
@@ -0,0 +1,156 @@
+/*
+ * SolverWorker.java
+ *
+ * This file is part of NEST.
+ *
+ * Copyright (C) 2004 The NEST Initiative
+ *
+ * NEST is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * NEST is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with NEST.  If not, see <http://www.gnu.org/licenses/>.
+ */
+package org.nest.codegeneration.sympy;
+
+import com.google.common.collect.Lists;
+import org.nest.reporting.Reporter;
+
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Path;
+import java.util.List;
+import java.util.Optional;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * Long-lived python process which runs the `OdeAnalyzer` in the server mode. Requests and replies are exchanged as
+ * JSON-lines over stdin/stdout of the process. Therefore, the interpreter and SymPy are loaded only once per
+ * frontend run and not once per neuron. A worker which doesn't reply within {@code REPLY_TIMEOUT_MINUTES} is killed,
+ * the next request starts a new one.
+ *
+ * @author plotnikov
+ */
+class SolverWorker {
+  private final static Reporter reporter = Reporter.get();
+  private static final String SERVER_OPTION = "--server";
+  // every request is limited by the time budget of the solver, the timeout only ends a hung worker
+  static final long REPLY_TIMEOUT_MINUTES = 30;
+
+  private final Path workingDirectory;
+  private final Process process;
+  private final BufferedWriter requests;
+  // the replies are read by a separate thread, so that a hung worker cannot block the frontend. An empty value marks
+  // the end of the output of the worker.
+  private final BlockingQueue<Optional<String>> replies = new LinkedBlockingQueue<>();
+
+  SolverWorker(final String pythonInterpreter, final String odeAnalyzerScript, final Path workingDirectory)
+      throws IOException {
+    this.workingDirectory = workingDirectory;
+
+    final List<String> commands = Lists.newArrayList(pythonInterpreter, odeAnalyzerScript, SERVER_OPTION);
+    process = new ProcessBuilder(commands).directory(workingDirectory.toFile()).start();
+
+    requests = new BufferedWriter(new OutputStreamWriter(process.getOutputStream(), StandardCharsets.UTF_8));
+    final Thread replyReader = new Thread(() -> {
+      final BufferedReader output = new BufferedReader(
+          new InputStreamReader(process.getInputStream(), StandardCharsets.UTF_8));
+      try {
+        String reply;
+        while ((reply = output.readLine()) != null) {
+          replies.add(Optional.of(reply));
+        }
+
+      }
+      catch (IOException e) {
+        reporter.reportProgress("The SymPy solver worker is not reachable: " + e.getMessage(), Reporter.Level.ERROR);
+      }
+      replies.add(Optional.empty());
+    });
+    replyReader.setDaemon(true);
+    replyReader.start();
+
+    // the error stream must be consumed continuously. otherwise, the worker blocks as soon as the pipe buffer is full
+    final Thread errorReader = new Thread(() -> {
+      final BufferedReader errors = new BufferedReader(
+          new InputStreamReader(process.getErrorStream(), StandardCharsets.UTF_8));
+      errors.lines().forEach(reporter::reportProgress);
+    });
+    errorReader.setDaemon(true);
+    errorReader.start();
+  }
+
+  /**
+   * Sends one request to the worker and waits for the corresponding reply.
+   * @param request JSON serialization of the {@code SolverInput} in one line
+   * @return JSON serialization of the {@code SolverOutput} or an empty value if the worker died or didn't reply in
+   * time. In the latter case the worker is killed.
+   */
+  synchronized Optional<String> solve(final String request) {
+    try {
+      requests.write(request);
+      requests.newLine();
+      requests.flush();
+
+      final Optional<String> reply = replies.poll(REPLY_TIMEOUT_MINUTES, TimeUnit.MINUTES);
+      if (reply == null) {
+        reporter.reportProgress(
+            "The SymPy solver worker didn't reply within " + REPLY_TIMEOUT_MINUTES + " minutes and is stopped.",
+            Reporter.Level.ERROR);
+        process.destroyForcibly();
+        return Optional.empty();
+      }
+
+      return reply;
+    }
+    catch (IOException e) {
+      reporter.reportProgress("The SymPy solver worker is not reachable: " + e.getMessage(), Reporter.Level.ERROR);
+      return Optional.empty();
+    }
+    catch (InterruptedException e) {
+      Thread.currentThread().interrupt();
+      process.destroyForcibly();
+      return Optional.empty();
+    }
+
+  }
+
+  boolean isAlive() {
+    return process.isAlive();
+  }
+
+  Path getWorkingDirectory() {
+    return workingDirectory;
+  }
+
+  /**
+   * Closes the input of the worker, which terminates its serving loop, and kills the process if it doesn't stop.
+   */
+  synchronized void close() {
+    try {
+      requests.close();
+      if (!process.waitFor(5, TimeUnit.SECONDS)) {
+        process.destroyForcibly();
+      }
+
+    }
+    catch (IOException | InterruptedException e) {
+      process.destroyForcibly();
+    }
+
+  }
+
+}
@@ -5,31 +5,35 @@
  */
 package org.nest.codegeneration.sympy;
 
-import com.google.common.base.Charsets;
-import com.google.common.collect.Lists;
-import com.google.common.io.Resources;
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.node.ArrayNode;
+import com.fasterxml.jackson.databind.node.ObjectNode;
+import com.google.common.collect.Maps;
 import org.nest.nestml._ast.ASTEquationsBlock;
+import org.nest.nestml._ast.ASTNeuron;
 import org.nest.nestml._ast.ASTShape;
 import org.nest.reporting.Reporter;
+import org.nest.utils.ContentHash;
 
 import java.io.BufferedReader;
 import java.io.IOException;
-import java.io.InputStream;
 import java.io.InputStreamReader;
-import java.net.URL;
 import java.nio.file.Files;
 import java.nio.file.Path;
 import java.nio.file.Paths;
 import java.util.List;
+import java.util.Map;
+import java.util.Optional;
+import java.util.concurrent.TimeUnit;
 import java.util.stream.Collectors;
 
-import static com.google.common.base.Preconditions.checkNotNull;
-import static java.nio.file.StandardOpenOption.CREATE;
-
 /**
  * The class is responsible for the execution of the PYTHON_INTERPRETER code which
- * was generated from the neuron model.
- * was generated from the neuron model.
+ * was generated from the neuron model. The solver scripts are evaluated by a long-lived
+ * {@link SolverWorker} which is reused for all neurons of one frontend run. Alternatively, the equations of many
+ * neurons can be solved in parallel processes in advance. The scripts are run from their {@link SolverInstallation},
+ * the output folder is the working directory of the solver processes.
  *
  * @author plotnikov
  */
@@ -37,101 +41,286 @@ class SymPySolver {
   private final static Reporter reporter = Reporter.get();
 
   private final static String PYTHON_INTERPRETER = "python";
-  private static final String SHAPES_SCRIPT = "shapes.py";
-  private static final String SHAPES_SOURCE = "org/nest/sympy/shapes.py";
+  private static final String SOLVER_SOURCES = "org/nest/sympy/";
+  private static final String ODE_ANALYZER_SCRIPT = "OdeAnalyzer.py";
 
-  private static final String PROP_MATRIX_SCRIPT = "prop_matrix.py";
-  private static final String PROP_MATRIX_SOURCE = "org/nest/sympy/prop_matrix.py";
+  private static final String BATCH_OPTION = "--batch";
+  private static final String BATCH_INPUT_FILE = "solver_batch.tmp";
+  private static final String BATCH_RESULT_FILE = "solver_batch_result.tmp";
+  // every neuron of the batch is limited by the time budget of the solver, the timeout only ends a hung batch process
+  private static final long BATCH_TIMEOUT_MINUTES = 30;
 
-  private static final String ODE_ANALYZER_SCRIPT = "OdeAnalyzer.py";
-  private static final String ODE_ANALYZER_SOURCE = "org/nest/sympy/OdeAnalyzer.py";
+  // the workers are shared by all solver instances and live until the end of the frontend run.
+  // Key: folder with the solver scripts, value: the worker started in this folder
+  private static final Map<Path, SolverWorker> workers = Maps.newHashMap();
+  // counters of the solver cache usage over all neurons of the frontend run
+  private static int cacheHits = 0;
+  private static int cacheMisses = 0;
+
+  static {
+    Runtime.getRuntime().addShutdownHook(new Thread(SymPySolver::shutdownWorkers));
+  }
+
+  // results of the parallel evaluation. Key: one line JSON representation of the solver input, value: its solution
+  private final Map<String, SolverOutput> batchResults = Maps.newHashMap();
 
   SolverOutput solveOdeWithShapes(final ASTEquationsBlock astOdeDeclaration, final Path output) {
     return executeSolver(new SolverInput(astOdeDeclaration), output);
   }
 
+  /**
+   * Additionally passes the default values of the neuron variables, which are used by the stiffness analysis.
+   */
+  SolverOutput solveOdeWithShapes(final ASTNeuron astNeuron, final Path output) {
+    return executeSolver(new SolverInput(astNeuron), output);
+  }
+
   SolverOutput solveShapes(final List<ASTShape> shapes, final Path output) {
     return executeSolver(new SolverInput(shapes), output);
   }
 
-  private SolverOutput executeSolver(final SolverInput solverInput, final Path output) {
+  /**
+   * Solves the equations of many neurons in parallel processes. The results are stored and returned by subsequent calls
+   * of {@code solveOdeWithShapes} and {@code solveShapes} with the same equations. If the parallel evaluation fails,
+   * the neurons are solved one by one by these calls.
+   * @param solverInputs Key: neuron name, value: its solver input
+   * @param output Folder where the solver scripts are evaluated
+   */
+  void solveInBatch(final Map<String, SolverInput> solverInputs, final Path output) {
+    if (solverInputs.isEmpty()) {
+      return;
+    }
+
     try {
-      reporter.reportProgress("Start long running SymPy script evaluation...");
+      reporter.reportProgress(String.format(
+          "Start parallel SymPy script evaluation for %d neurons...", solverInputs.size()));
 
-      copySolverFramework(output);
-      long start = System.nanoTime();
-      final List<String> commands = Lists.newArrayList();
+      final Path workingDirectory = output.toAbsolutePath().normalize();
+      Files.createDirectories(workingDirectory);
 
-      commands.add(PYTHON_INTERPRETER);
-      commands.add(ODE_ANALYZER_SCRIPT);
-      commands.add(solverInput.toJSON());
+      final ObjectMapper mapper = new ObjectMapper();
+      final ArrayNode batch = mapper.createArrayNode();
+      for (final Map.Entry<String, SolverInput> solverInput:solverInputs.entrySet()) {
+        final ObjectNode document = (ObjectNode) mapper.readTree(solverInput.getValue().toJSONLine());
+        document.put("name", solverInput.getKey());
+        batch.add(document);
+      }
+      Files.write(Paths.get(workingDirectory.toString(), BATCH_INPUT_FILE), mapper.writeValueAsBytes(batch));
+      // a result of an earlier run must not be read if the batch process fails
+      Files.deleteIfExists(Paths.get(workingDirectory.toString(), BATCH_RESULT_FILE));
 
-      final ProcessBuilder processBuilder = new ProcessBuilder(
+      long start = System.nanoTime();
+      final Process process = new ProcessBuilder(
           PYTHON_INTERPRETER,
-          ODE_ANALYZER_SCRIPT,
-          solverInput.toJSON()).directory(output.toFile()).command(commands);
+          odeAnalyzerScript().toString(),
+          BATCH_OPTION,
+          BATCH_INPUT_FILE,
+          BATCH_RESULT_FILE)
+          .directory(workingDirectory.toFile())
+          .redirectErrorStream(true)
+          .start();
+      // the output is read in the background, otherwise a hung process which doesn't close it blocks the frontend
+      final Thread outputReader = new Thread(() -> {
+        final BufferedReader processOutput = new BufferedReader(new InputStreamReader(process.getInputStream()));
+        processOutput.lines().forEach(reporter::reportProgress);
+      });
+      outputReader.setDaemon(true);
+      outputReader.start();
+      if (!process.waitFor(BATCH_TIMEOUT_MINUTES, TimeUnit.MINUTES)) {
+        process.destroyForcibly();
+        throw new IOException("The parallel SymPy script evaluation exceeded " + BATCH_TIMEOUT_MINUTES + " minutes.");
+      }
+      outputReader.join(TimeUnit.SECONDS.toMillis(1));
+      long end = System.nanoTime();
+
+      long elapsedTime = end - start;
+      final String msg = "SymPy scripts were evaluated in parallel. Elapsed time: "
+          + (double)elapsedTime / 1000000000.0 +  " [s]";
+      reporter.reportProgress(msg);
+
+      final JsonNode results = mapper.readTree(Paths.get(workingDirectory.toString(), BATCH_RESULT_FILE).toFile());
+      for (final Map.Entry<String, SolverInput> solverInput:solverInputs.entrySet()) {
+        final JsonNode result = results.get(solverInput.getKey());
+        if (result != null) {
+          final SolverOutput solverOutput = SolverOutput.fromJSON(result.toString());
+          reportCacheUsage(solverOutput);
+          reportStrategy(solverOutput);
+          if (!solverOutput.profile.isEmpty()) {
+            reporter.reportProgress("SymPy solver stages of the neuron " + solverInput.getKey() + ":");
+            reportProfile(solverOutput);
+          }
+
+          batchResults.put(solverInput.getValue().toJSONLine(), solverOutput);
+        }
+
+      }
+
+    }
+    catch (IOException | InterruptedException | RuntimeException e) {
+      final String msg = "Cannot evaluate the SymPy solver scripts in parallel. The neurons are solved one by one.";
+      reporter.reportProgress(msg, Reporter.Level.WARNING);
+    }
+
+  }
+
+  private SolverOutput executeSolver(final SolverInput solverInput, final Path output) {
+    final SolverOutput batchResult = batchResults.get(solverInput.toJSONLine());
+    if (batchResult != null) {
+      reporter.reportProgress("The SymPy solver result was computed during the parallel evaluation.");
+      return batchResult;
+    }
 
+    try {
+      reporter.reportProgress("Start long running SymPy script evaluation...");
 
-      final Process res = processBuilder.start();
-      res.waitFor();
+      final SolverWorker worker = getWorker(output);
+      long start = System.nanoTime();
+      final Optional<String> reply = worker.solve(solverInput.toJSONLine());
       long end = System.nanoTime();
-      
-      // reports standard output
-      getStreamAsListOfStrings(res.getInputStream()).forEach(reporter::reportProgress);
-      // reports errors
-      getStreamAsListOfStrings(res.getErrorStream()).forEach(reporter::reportProgress);
 
       long elapsedTime = end - start;
       final String msg = "SymPy script was evaluated. Elapsed time: "
           + (double)elapsedTime / 1000000000.0 +  " [s]";
       reporter.reportProgress(msg);
 
-      if (getStreamAsListOfStrings(res.getErrorStream()).size() > 0) {
-        getStreamAsListOfStrings(res.getErrorStream())
-            .forEach(error -> reporter.reportProgress(error, Reporter.Level.ERROR));
-
+      if (!reply.isPresent()) {
         reporter.reportProgress("Cannot evaluate the SymPy solver scripts.", Reporter.Level.ERROR);
+        discardWorker(worker);
         return SolverOutput.getErrorResult();
       }
 
-      return SolverOutput.fromJSON(Paths.get(output.toString(), SolverOutput.RESULT_FILE_NAME));
+      final SolverOutput solverOutput = SolverOutput.fromJSON(reply.get());
+      reportCacheUsage(solverOutput);
+      reportStrategy(solverOutput);
+      reportProfile(solverOutput);
+      return solverOutput;
     }
-    catch (IOException | InterruptedException e) {
+    catch (IOException | RuntimeException e) {
       reporter.reportProgress("Cannot evaluate the SymPy solver scripts.", Reporter.Level.ERROR);
       return SolverOutput.getErrorResult();
     }
 
   }
 
-  private void copySolverFramework(final Path output) {
-    try {
-      if (!Files.exists(output)) {
-        Files.createDirectories(output);
-      }
-      final URL shapesPyUrl = getClass().getClassLoader().getResource(SHAPES_SOURCE);
-      checkNotNull(shapesPyUrl, "Cannot read the solver script: " + SHAPES_SCRIPT);
-      final String shapesPy = Resources.toString(shapesPyUrl, Charsets.UTF_8);
-      Files.write(Paths.get(output.toString(), SHAPES_SCRIPT), shapesPy.getBytes(), CREATE);
+  private static synchronized void reportCacheUsage(final SolverOutput solverOutput) {
+    if (solverOutput.cache.equals("hit")) {
+      ++cacheHits;
+    }
+    else if (solverOutput.cache.equals("miss")) {
+      ++cacheMisses;
+    }
+    else {
+      return;
+    }
 
-      final URL propMatrixUrl = getClass().getClassLoader().getResource(PROP_MATRIX_SOURCE);
-      checkNotNull(propMatrixUrl, "Cannot read the solver script: " + PROP_MATRIX_SCRIPT);
-      final String propMatrixPy = Resources.toString(propMatrixUrl, Charsets.UTF_8);
-      Files.write(Paths.get(output.toString(), PROP_MATRIX_SCRIPT), propMatrixPy.getBytes(), CREATE);
+    reporter.reportProgress(String.format(
+        "SymPy solver cache: %s (hits: %d, misses: %d)", solverOutput.cache, cacheHits, cacheMisses));
+  }
+
+  /**
+   * Warns if the solver exceeded its time or size budgets and fell back to a weaker simplification strategy.
+   */
+  private static void reportStrategy(final SolverOutput solverOutput) {
+    if (!solverOutput.strategy.isEmpty() && !solverOutput.strategy.equals("simplify")) {
+      reporter.reportProgress(
+          "The SymPy solver exceeded its budget and used the strategy: " + solverOutput.strategy,
+          Reporter.Level.WARNING);
+    }
 
-      final URL odeAnalyzerUrl = getClass().getClassLoader().getResource(ODE_ANALYZER_SOURCE);
-      checkNotNull(odeAnalyzerUrl, "Cannot read the solver script: " + ODE_ANALYZER_SCRIPT);
-      final String odeAnalyzerPy = Resources.toString(odeAnalyzerUrl, Charsets.UTF_8);
-      Files.write(Paths.get(output.toString(), ODE_ANALYZER_SCRIPT), odeAnalyzerPy.getBytes(), CREATE);
+  }
 
+  /**
+   * Reports the time, memory and expression size of every solver stage and how often the zero test of the solver
+   * decided numerically or symbolically. A cached result has the single stage 'cache lookup', the stages of its
+   * original computation are not reported again.
+   */
+  private static void reportProfile(final SolverOutput solverOutput) {
+    for (final SolverOutput.StageProfile stage:solverOutput.profile) {
+      reporter.reportProgress("  " + stage);
     }
-    catch (IOException e) {
-      throw new RuntimeException(e);
+
+    if (!solverOutput.zero_oracle.isEmpty()) {
+      reporter.reportProgress("  zero tests: " + solverOutput.zero_oracle);
     }
+
+  }
+
+  /**
+   * Returns the running worker for the output folder. A new worker is started only if there is no living worker for
+   * the folder.
+   */
+  private static synchronized SolverWorker getWorker(final Path output) throws IOException {
+    final Path workingDirectory = output.toAbsolutePath().normalize();
+    final SolverWorker cachedWorker = workers.get(workingDirectory);
+    if (cachedWorker != null && cachedWorker.isAlive()) {
+      return cachedWorker;
+    }
+
+    Files.createDirectories(workingDirectory);
+    final SolverWorker worker = new SolverWorker(
+        PYTHON_INTERPRETER, odeAnalyzerScript().toString(), workingDirectory);
+    workers.put(workingDirectory, worker);
+    return worker;
+  }
+
+  private static synchronized void discardWorker(final SolverWorker worker) {
+    workers.remove(worker.getWorkingDirectory());
+    worker.close();
+  }
+
+  /**
+   * Stops all running solver workers. Is called automatically at the JVM shutdown.
+   */
+  static synchronized void shutdownWorkers() {
+    workers.values().forEach(SolverWorker::close);
+    workers.clear();
+  }
+
+  /**
+   * @return Hash of the solver scripts, i.e. the name of the folder of their {@link SolverInstallation}
+   */
+  static String version() throws IOException {
+    return ContentHash.of(SolverInstallation.scripts(SOLVER_SOURCES));
+  }
+
+  /**
+   * @return The path and the version of the python interpreter and the SymPy version, e.g.
+   * {@code /usr/bin/python2.7 2.7.18 sympy 1.1.1}. Another interpreter or SymPy version can change the solutions.
+   */
+  static String environment() throws IOException {
+    final Process process = new ProcessBuilder(
+        PYTHON_INTERPRETER,
+        "-c",
+        "import sys, sympy; print(sys.executable + ' ' + sys.version.split()[0] + ' sympy ' + sympy.__version__)")
+        .redirectErrorStream(true)
+        .start();
+    try {
+      final String output = new BufferedReader(new InputStreamReader(process.getInputStream()))
+          .lines()
+          .collect(Collectors.joining("\n"));
+      if (!process.waitFor(60, TimeUnit.SECONDS)) {
+        process.destroyForcibly();
+        throw new IOException("The python interpreter doesn't respond.");
+      }
+      if (process.exitValue() != 0) {
+        throw new IOException("Cannot determine the SymPy version: " + output);
+      }
+      return output.trim();
+    }
+    catch (InterruptedException e) {
+      throw new IOException(e);
+    }
+
   }
 
-  private List<String> getStreamAsListOfStrings(final InputStream inputStream) throws IOException {
-    final BufferedReader in = new BufferedReader(new InputStreamReader(inputStream));
-    return in.lines().collect(Collectors.toList());
+  /**
+   * Installs the solver scripts on the first call.
+   * @return Absolute path of the installed {@code OdeAnalyzer} script
+   */
+  private static Path odeAnalyzerScript() throws IOException {
+    return SolverInstallation.install(SolverInstallation.home(), PYTHON_INTERPRETER, SOLVER_SOURCES)
+        .resolve(ODE_ANALYZER_SCRIPT)
+        .toAbsolutePath();
   }
 
 }
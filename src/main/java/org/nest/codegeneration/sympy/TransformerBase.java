@@ -142,38 +142,23 @@ final public class TransformerBase {
       final Map.Entry<String, String> constInput,
       final List<String> propagatorSteps) {
     // It must work for multiple integrate calls!
-    final Optional<ASTFunctionCall> integrateCall = AstUtils.getFunctionCall(
-        PredefinedFunctions.INTEGRATE_ODES,
-        astNeuron.getUpdateBlocks().get(0));
-
-    if (integrateCall.isPresent()) {
-      final Optional<ASTNode> smallStatement = AstUtils.getParent(integrateCall.get(), astNeuron);
-      checkState(smallStatement.isPresent());
-      checkState(smallStatement.get() instanceof ASTSmall_Stmt);
-
-      final Optional<ASTNode> statement = AstUtils.getParent(smallStatement.get(), astNeuron);
-      checkState(statement.isPresent());
-      checkState(statement.get() instanceof ASTStmt);
-
-      final Optional<ASTNode> block = AstUtils.getParent(statement.get(), astNeuron);
-      checkState(block.isPresent());
-      checkState(block.get() instanceof ASTBlock);
-
-      final ASTBlock astBlock = (ASTBlock) block.get();
-      for (int i = 0; i < astBlock.getStmts().size(); ++i) {
-        if (astBlock.getStmts().get(i).equals(statement.get())) {
-          astBlock.getStmts().remove(i);
-
-          final List<ASTStmt> updateStatements = propagatorSteps
-              .stream()
-              .map(AstCreator::createStatement)
-              .collect(toList());
-          updateStatements.add(0, AstCreator.createStatement(constInput.getKey() + " real = " + constInput.getValue()));
-
-          astBlock.getStmts().addAll(i, updateStatements);
-          break;
-        }
+    final Optional<ASTStmt> statement = findIntegrateStatement(astNeuron);
+
+    if (statement.isPresent()) {
+      final ASTBlock astBlock = getEnclosingBlock(statement.get(), astNeuron);
+      final int i = astBlock.getStmts().indexOf(statement.get());
+      astBlock.getStmts().remove(i);
+
+      final List<ASTStmt> updateStatements = propagatorSteps
+          .stream()
+          .map(AstCreator::createStatement)
+          .collect(toList());
+      // the solution of a system of ODEs defines the constant inputs in its update instructions
+      if (constInput != null) {
+        updateStatements.add(0, AstCreator.createStatement(constInput.getKey() + " real = " + constInput.getValue()));
       }
+
+      astBlock.getStmts().addAll(i, updateStatements);
       return astNeuron;
     } else {
       Log.trace(
@@ -184,6 +169,56 @@ final public class TransformerBase {
 
   }
 
+  /**
+   * Inserts the statements before the integrate call, e.g. the updates of variables which are not integrated
+   * numerically, but are used by the integrated ODEs.
+   */
+  static ASTNeuron addStatementsBeforeIntegrateCall(final ASTNeuron astNeuron, final List<String> statements) {
+    final Optional<ASTStmt> statement = findIntegrateStatement(astNeuron);
+
+    if (statement.isPresent()) {
+      final ASTBlock astBlock = getEnclosingBlock(statement.get(), astNeuron);
+      astBlock.getStmts().addAll(
+          astBlock.getStmts().indexOf(statement.get()),
+          statements.stream().map(AstCreator::createStatement).collect(toList()));
+    }
+    else {
+      Log.trace(
+          "The model has defined an ODE. But its solution is not used in the update state.",
+          TransformerBase.class.getSimpleName());
+    }
+    return astNeuron;
+  }
+
+  /**
+   * @return The statement of the update block which contains the integrate call
+   */
+  private static Optional<ASTStmt> findIntegrateStatement(final ASTNeuron astNeuron) {
+    final Optional<ASTFunctionCall> integrateCall = AstUtils.getFunctionCall(
+        PredefinedFunctions.INTEGRATE_ODES,
+        astNeuron.getUpdateBlocks().get(0));
+
+    if (!integrateCall.isPresent()) {
+      return Optional.empty();
+    }
+
+    final Optional<ASTNode> smallStatement = AstUtils.getParent(integrateCall.get(), astNeuron);
+    checkState(smallStatement.isPresent());
+    checkState(smallStatement.get() instanceof ASTSmall_Stmt);
+
+    final Optional<ASTNode> statement = AstUtils.getParent(smallStatement.get(), astNeuron);
+    checkState(statement.isPresent());
+    checkState(statement.get() instanceof ASTStmt);
+    return Optional.of((ASTStmt) statement.get());
+  }
+
+  private static ASTBlock getEnclosingBlock(final ASTStmt statement, final ASTNeuron astNeuron) {
+    final Optional<ASTNode> block = AstUtils.getParent(statement, astNeuron);
+    checkState(block.isPresent());
+    checkState(block.get() instanceof ASTBlock);
+    return (ASTBlock) block.get();
+  }
+
   static void addDeclarationToUpdateBlock(final ASTDeclaration astDeclaration, final ASTNeuron astNeuron) {
     final ASTStmt astStmt = NESTMLNodeFactory.createASTStmt();
     final ASTSmall_Stmt astSmall_stmt = NESTMLNodeFactory.createASTSmall_Stmt();
@@ -241,6 +276,67 @@ final public class TransformerBase {
     spikesUpdates.forEach(update -> addAssignmentToUpdateBlock(update, astNeuron));
   }
 
+  /**
+   * Shapes which satisfy the same ODE as another shape are merged by the solver into the state variables of this
+   * representative. Spikes convolved with a merged shape are added to these state variables, weighted with the initial
+   * values of the merged shape which are reported by the solver.
+   */
+  static void applyIncomingSpikesToMergedShapes(final ASTNeuron astNeuron, final SolverOutput solverOutput) {
+    final List<ASTFunctionCall> convCalls = OdeTransformer.get_sumFunctionCalls(astNeuron);
+
+    final List<ASTAssignment> spikesUpdates = Lists.newArrayList();
+    for (ASTFunctionCall convCall:convCalls) {
+      String shape = convCall.getArgs().get(0).getVariable().get().toString();
+      String buffer = convCall.getArgs().get(1).getVariable().get().toString();
+
+      for (Map.Entry<String, String> mergedShape:solverOutput.merged_shapes) {
+        if (!mergedShape.getKey().equals(shape)) {
+          continue;
+        }
+
+        for (Map.Entry<String, String> initialValue:solverOutput.merged_shape_initial_values) {
+          final String variable = initialValue.getKey();
+          if (variable.equals(shape) || variable.matches(shape + "__\\d+$")) {
+            // e.g. `I_shape_ex__1` is propagated by `I_shape_in__1`
+            final String representativeVariable = mergedShape.getValue() + variable.substring(shape.length());
+            spikesUpdates.add(AstCreator.createAssignment(
+                representativeVariable + " += " + buffer + " * (" + initialValue.getValue() + ")"));
+          }
+
+        }
+
+      }
+
+    }
+    spikesUpdates.forEach(update -> addAssignmentToUpdateBlock(update, astNeuron));
+  }
+
+  /**
+   * A delta shape has no state variables, the solver reports the jump of the ODE variable per spike weight instead.
+   * Spikes convolved with a delta shape are added to the ODE variable, weighted with this jump.
+   */
+  static void applyIncomingSpikesToDeltaShapes(
+      final ASTNeuron astNeuron,
+      final SolverOutput solverOutput,
+      final String odeVariable) {
+    final List<ASTFunctionCall> convCalls = OdeTransformer.get_sumFunctionCalls(astNeuron);
+
+    final List<ASTAssignment> spikesUpdates = Lists.newArrayList();
+    for (ASTFunctionCall convCall:convCalls) {
+      String shape = convCall.getArgs().get(0).getVariable().get().toString();
+      String buffer = convCall.getArgs().get(1).getVariable().get().toString();
+
+      for (Map.Entry<String, String> deltaShape:solverOutput.delta_shapes) {
+        if (deltaShape.getKey().equals(shape)) {
+          spikesUpdates.add(AstCreator.createAssignment(
+              odeVariable + " += " + buffer + " * (" + deltaShape.getValue() + ")"));
+        }
+
+      }
+
+    }
+    spikesUpdates.forEach(update -> addAssignmentToUpdateBlock(update, astNeuron));
+  }
 
   static void addAssignmentToUpdateBlock(final ASTAssignment astAssignment, final ASTNeuron astNeuron) {
     final ASTStmt astStmt = NESTMLNodeFactory.createASTStmt();
@@ -0,0 +1,212 @@
+/*
+ * Copyright (c)  RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.frontend;
+
+import com.fasterxml.jackson.core.type.TypeReference;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.google.common.collect.Maps;
+import de.se_rwth.commons.logging.Log;
+import org.nest.utils.ContentHash;
+
+import java.io.IOException;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.attribute.FileTime;
+import java.util.List;
+import java.util.Map;
+import java.util.Objects;
+import java.util.stream.Collectors;
+import java.util.stream.Stream;
+
+/**
+ * Records in the target folder from which inputs the code of every neuron was generated: the hashes of the model
+ * file, of the solver scripts and of the templates, the python and SymPy versions of the solver, the module name and
+ * the tracing flag. In the incremental mode, only neurons whose inputs changed or whose generated files are missing
+ * are solved and generated again.
+ *
+ * Additionally, the timestamps of generated files whose content didn't change are restored after the generation, so
+ * that the build of the NEST module recompiles only the changed neurons.
+ *
+ * @author plotnikov
+ */
+class BuildManifest {
+  private final static String LOG_NAME = BuildManifest.class.getName();
+  static final String MANIFEST_FILE = "nestml_manifest.json";
+
+  private final Path targetPath;
+  // Key: neuron name
+  private final Map<String, Entry> neurons;
+
+  /**
+   * Inputs from which the code of a neuron was generated.
+   */
+  public static class Entry {
+    public String source = "";
+    public String solver = "";
+    public String templates = "";
+    // the python interpreter and the SymPy version which solved the equations
+    public String environment = "";
+    public String module = "";
+    public boolean tracing;
+
+    public Entry() {
+      // used by the JSON framework
+    }
+
+    Entry(
+        final String source,
+        final String solver,
+        final String templates,
+        final String environment,
+        final String module,
+        final boolean tracing) {
+      this.source = source;
+      this.solver = solver;
+      this.templates = templates;
+      this.environment = environment;
+      this.module = module;
+      this.tracing = tracing;
+    }
+
+    @Override
+    public boolean equals(final Object other) {
+      if (!(other instanceof Entry)) {
+        return false;
+      }
+      final Entry entry = (Entry) other;
+      return source.equals(entry.source) && solver.equals(entry.solver) && templates.equals(entry.templates) &&
+             environment.equals(entry.environment) && module.equals(entry.module) && tracing == entry.tracing;
+    }
+
+    @Override
+    public int hashCode() {
+      return Objects.hash(source, solver, templates, environment, module, tracing);
+    }
+
+  }
+
+  private BuildManifest(final Path targetPath, final Map<String, Entry> neurons) {
+    this.targetPath = targetPath;
+    this.neurons = neurons;
+  }
+
+  /**
+   * @return The manifest of the target folder or an empty manifest if there is none or it cannot be read
+   */
+  static BuildManifest read(final Path targetPath) {
+    final Path manifestFile = Paths.get(targetPath.toString(), MANIFEST_FILE);
+    if (Files.exists(manifestFile)) {
+      try {
+        final Map<String, Entry> neurons = new ObjectMapper().readValue(
+            manifestFile.toFile(), new TypeReference<Map<String, Entry>>() {});
+        return new BuildManifest(targetPath, Maps.newTreeMap(neurons));
+      }
+      catch (IOException e) {
+        Log.warn("Cannot read the build manifest, all neurons are generated: " + e.getMessage());
+      }
+
+    }
+    return new BuildManifest(targetPath, Maps.newTreeMap());
+  }
+
+  /**
+   * @return True iff the code of the neuron was generated from the same inputs and the generated files exist
+   */
+  boolean isUpToDate(final String neuronName, final Entry inputs) {
+    return inputs.equals(neurons.get(neuronName)) &&
+           Files.exists(Paths.get(targetPath.toString(), neuronName + ".h")) &&
+           Files.exists(Paths.get(targetPath.toString(), neuronName + ".cpp"));
+  }
+
+  void update(final String neuronName, final Entry inputs) {
+    neurons.put(neuronName, inputs);
+  }
+
+  /**
+   * Removes the neurons which are not in the list, e.g. because their models were deleted.
+   */
+  void retain(final List<String> neuronNames) {
+    neurons.keySet().retainAll(neuronNames);
+  }
+
+  void write() {
+    try {
+      new ObjectMapper()
+          .writerWithDefaultPrettyPrinter()
+          .writeValue(Paths.get(targetPath.toString(), MANIFEST_FILE).toFile(), neurons);
+    }
+    catch (IOException e) {
+      Log.warn("Cannot write the build manifest: " + e.getMessage());
+    }
+
+  }
+
+  /**
+   * Hash and modification time of a generated file.
+   */
+  static class FileState {
+    final String hash;
+    final FileTime lastModified;
+
+    FileState(final String hash, final FileTime lastModified) {
+      this.hash = hash;
+      this.lastModified = lastModified;
+    }
+
+  }
+
+  /**
+   * @return Key: generated file, i.e. C++ source, CMake or SLI file in the target folder
+   */
+  static Map<Path, FileState> snapshot(final Path targetPath) {
+    final Map<Path, FileState> states = Maps.newHashMap();
+    if (!Files.isDirectory(targetPath)) {
+      return states;
+    }
+
+    // the generated files are located in the target folder and in its `sli` folder
+    try (final Stream<Path> files = Files.walk(targetPath, 2)) {
+      for (final Path file:files.filter(BuildManifest::isGeneratedFile).collect(Collectors.toList())) {
+        states.put(file, new FileState(ContentHash.ofFile(file), Files.getLastModifiedTime(file)));
+      }
+
+    }
+    catch (IOException e) {
+      Log.trace("Cannot take the snapshot of the generated files: " + e.getMessage(), LOG_NAME);
+    }
+    return states;
+  }
+
+  /**
+   * Restores the modification times of the files of the snapshot which were rewritten with the same content.
+   */
+  static void restoreUnchangedTimestamps(final Map<Path, FileState> snapshot) {
+    for (final Map.Entry<Path, FileState> state:snapshot.entrySet()) {
+      final Path file = state.getKey();
+      try {
+        if (Files.exists(file) &&
+            !Files.getLastModifiedTime(file).equals(state.getValue().lastModified) &&
+            ContentHash.ofFile(file).equals(state.getValue().hash)) {
+          Files.setLastModifiedTime(file, state.getValue().lastModified);
+        }
+
+      }
+      catch (IOException e) {
+        Log.trace("Cannot restore the modification time of " + file + ": " + e.getMessage(), LOG_NAME);
+      }
+
+    }
+
+  }
+
+  private static boolean isGeneratedFile(final Path file) {
+    final String name = file.getFileName().toString();
+    return Files.isRegularFile(file) &&
+           (name.endsWith(".h") || name.endsWith(".cpp") || name.endsWith(".sli") || name.equals("CMakeLists.txt"));
+  }
+
+}
@@ -19,6 +19,7 @@ public class CliConfiguration {
   private final String jasonLogFile;
   private boolean isTracing;
   private boolean isCodegeneration;
+  private boolean isIncremental;
   private final String moduleName;
 
   public CliConfiguration(final Builder builder) {
@@ -27,6 +28,7 @@ public class CliConfiguration {
     this.jasonLogFile = builder.jasonLogFile;
     this.isTracing = builder.isTracing;
     this.isCodegeneration = builder.isCodegeneration;
+    this.isIncremental = builder.isIncremental;
     this.moduleName = builder.moduleName;
   }
 
@@ -35,6 +37,10 @@ public class CliConfiguration {
     return isCodegeneration;
   }
 
+  boolean isIncremental() {
+    return isIncremental;
+  }
+
   Path getInputPath() {
     return inputPath;
   }
@@ -61,6 +67,7 @@ public class CliConfiguration {
     private String jasonLogFile = "";
     private boolean isTracing = false;
     private boolean isCodegeneration;
+    private boolean isIncremental = false;
     public String moduleName;
 
     Builder withModelPath(final Path modelPath) {
@@ -78,6 +85,11 @@ public class CliConfiguration {
       return this;
     }
 
+    Builder withIncremental(final boolean isIncremental) {
+      this.isIncremental = isIncremental;
+      return this;
+    }
+
     Builder withModuleName(final String moduleName) {
       this.moduleName = moduleName;
       return this;
@@ -17,6 +17,7 @@ import org.nest.nestml._parser.NESTMLParser;
 import org.nest.nestml._symboltable.NESTMLScopeCreator;
 import org.nest.nestml._symboltable.NestmlCoCosManager;
 import org.nest.reporting.Reporter;
+import org.nest.utils.ContentHash;
 import org.nest.utils.FilesHelper;
 import org.nest.utils.LogHelper;
 
@@ -28,8 +29,10 @@ import java.util.Collection;
 import java.util.List;
 import java.util.Map;
 import java.util.Optional;
+import java.util.function.Function;
 
 import static java.util.stream.Collectors.toList;
+import static org.nest.utils.AstUtils.getAllNeurons;
 import static org.nest.utils.FilesHelper.collectNESTMLModelFilenames;
 
 /**
@@ -43,6 +46,8 @@ class CliConfigurationExecutor {
   private static final String LOG_NAME = CliConfigurationExecutor.class.getName();
   private final NestmlCoCosManager checker = new NestmlCoCosManager();
   private final Reporter reporter = Reporter.get();
+  // hashes of the parsed model files. Key: root of the model file
+  private final Map<ASTNESTMLCompilationUnit, String> sourceHashes = Maps.newIdentityHashMap();
 
   public CliConfigurationExecutor() {
     Log.enableFailQuick(false); // otherwise the processing is stopped after encountering first error
@@ -67,11 +72,15 @@ class CliConfigurationExecutor {
       }
 
       cleanUpWorkingFolder(config.getTargetPath());
+      final Map<Path, BuildManifest.FileState> generatedFiles = config.isIncremental() ?
+          BuildManifest.snapshot(config.getTargetPath()) : Maps.newHashMap();
 
       processNestmlModels(modelRoots, config, scopeCreator, generator);
 
       reporter.reportProgress("Format generated code...");
       formatGeneratedCode(config.getTargetPath());
+      // files which were generated with the same content keep their timestamps, e.g. the module files
+      BuildManifest.restoreUnchangedTimestamps(generatedFiles);
 
     }
 
@@ -100,6 +109,7 @@ class CliConfigurationExecutor {
 
         if (root.isPresent()) {
           modelRoots.add(root.get());
+          sourceHashes.put(root.get(), ContentHash.ofFile(modelFile));
           reporter.reportProgress("The NESTML file was parsed successfully: " + modelFile.getFileName().toString());
         }
         else {
@@ -212,6 +222,12 @@ class CliConfigurationExecutor {
   }
 
   private void generateNeuronCode(List<ASTNESTMLCompilationUnit> modelRoots, CliConfiguration config, NestCodeGenerator generator) {
+    if (config.isIncremental()) {
+      generateChangedNeuronCode(modelRoots, config, generator);
+      return;
+    }
+
+    generator.solveEquationsBlocks(modelRoots, config.getTargetPath());
     for (final ASTNESTMLCompilationUnit root:modelRoots) {
       reporter.reportProgress("Generate NEST code from the artifact: " + root.getArtifactName());
       generator.analyseAndGenerate(root, config.getTargetPath());
@@ -219,6 +235,62 @@ class CliConfigurationExecutor {
 
   }
 
+  /**
+   * Solves and generates only the model files with a neuron whose inputs changed since the last run, see
+   * {@link BuildManifest}.
+   */
+  private void generateChangedNeuronCode(
+      final List<ASTNESTMLCompilationUnit> modelRoots,
+      final CliConfiguration config,
+      final NestCodeGenerator generator) {
+    final String solverVersion;
+    final String templatesVersion;
+    final String solverEnvironment;
+    try {
+      solverVersion = generator.solverVersion();
+      templatesVersion = generator.templatesVersion();
+      solverEnvironment = generator.solverEnvironment();
+    }
+    catch (IOException e) {
+      reporter.reportProgress("Cannot compute the versions of the solver and of the templates, all neurons are " +
+                              "generated: " + e.getMessage(), Reporter.Level.WARNING);
+      generator.solveEquationsBlocks(modelRoots, config.getTargetPath());
+      modelRoots.forEach(root -> generator.analyseAndGenerate(root, config.getTargetPath()));
+      return;
+    }
+
+    final Function<ASTNESTMLCompilationUnit, BuildManifest.Entry> inputsOf = root -> new BuildManifest.Entry(
+        sourceHashes.get(root),
+        solverVersion,
+        templatesVersion,
+        solverEnvironment,
+        config.getModuleName(),
+        config.isTracing());
+    final BuildManifest manifest = BuildManifest.read(config.getTargetPath());
+    final List<ASTNESTMLCompilationUnit> changedRoots = Lists.newArrayList();
+    for (final ASTNESTMLCompilationUnit root:modelRoots) {
+      final BuildManifest.Entry inputs = inputsOf.apply(root);
+      if (root.getNeurons().stream().allMatch(neuron -> manifest.isUpToDate(neuron.getName(), inputs))) {
+        reporter.reportProgress("The artifact is unchanged, its code is not generated: " + root.getArtifactName());
+      }
+      else {
+        changedRoots.add(root);
+      }
+
+    }
+
+    generator.solveEquationsBlocks(changedRoots, config.getTargetPath());
+    for (final ASTNESTMLCompilationUnit root:changedRoots) {
+      reporter.reportProgress("Generate NEST code from the artifact: " + root.getArtifactName());
+      generator.analyseAndGenerate(root, config.getTargetPath());
+      final BuildManifest.Entry inputs = inputsOf.apply(root);
+      root.getNeurons().forEach(neuron -> manifest.update(neuron.getName(), inputs));
+    }
+
+    manifest.retain(getAllNeurons(modelRoots).stream().map(ASTNeuron::getName).collect(toList()));
+    manifest.write();
+  }
+
   /**
    *
    * @param modelRoots List with root nodes of NESTML files from the model path
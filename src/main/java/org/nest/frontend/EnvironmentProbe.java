@@ -0,0 +1,192 @@
+/*
+ * Copyright (c)  RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.frontend;
+
+import com.google.common.io.Resources;
+import de.se_rwth.commons.logging.Log;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.Reader;
+import java.io.Writer;
+import java.net.URL;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.List;
+import java.util.Optional;
+import java.util.Properties;
+import java.util.concurrent.TimeUnit;
+import java.util.stream.Collectors;
+
+/**
+ * Checks whether the python interpreter and SymPy are installed in the required versions. Both are probed by one
+ * interpreter process which reads the check script from stdin and prints the results, i.e. no files are written into
+ * the target folder. A successful probe is cached per interpreter: it is repeated only if the interpreter binary
+ * changed. Failed probes are not cached, so that a subsequent installation of SymPy is detected.
+ *
+ * @author plotnikov
+ */
+class EnvironmentProbe {
+  private final static String LOG_NAME = EnvironmentProbe.class.getName();
+  private static final String CHECK_SCRIPT_SOURCE = "checks/environmentChecker.py";
+  private static final String PYTHON_STATUS = "python";
+  private static final String SYMPY_STATUS = "sympy";
+
+  private final String pythonInterpreter;
+  private final Path cacheFile;
+
+  /**
+   * @param pythonInterpreter Name or path of the interpreter, e.g. {@code python}
+   * @param cacheFile Properties file with the successful probes. Key: interpreter path and modification time
+   */
+  EnvironmentProbe(final String pythonInterpreter, final Path cacheFile) {
+    this.pythonInterpreter = pythonInterpreter;
+    this.cacheFile = cacheFile;
+  }
+
+  /**
+   * Result of a probe: whether the python and the SymPy versions are sufficient.
+   */
+  static class Status {
+    final boolean python;
+    final boolean sympy;
+
+    Status(final boolean python, final boolean sympy) {
+      this.python = python;
+      this.sympy = sympy;
+    }
+
+    boolean isSatisfied() {
+      return python && sympy;
+    }
+
+    /**
+     * @param output Lines of the check script, e.g. {@code python True} and {@code sympy False}
+     */
+    static Status parse(final List<String> output) {
+      return new Status(output.contains(PYTHON_STATUS + " True"), output.contains(SYMPY_STATUS + " True"));
+    }
+
+  }
+
+  Status probe() {
+    final Optional<String> cacheKey = resolveInterpreter()
+        .map(interpreter -> interpreter.toAbsolutePath() + "@" + interpreter.toFile().lastModified());
+    final Properties cachedProbes = readCache();
+    if (cacheKey.isPresent() && Boolean.parseBoolean(cachedProbes.getProperty(cacheKey.get()))) {
+      Log.trace("The environment probe of " + cacheKey.get() + " is cached.", LOG_NAME);
+      return new Status(true, true);
+    }
+
+    final Status status = runCheckScript();
+    if (status.isSatisfied() && cacheKey.isPresent()) {
+      cachedProbes.setProperty(cacheKey.get(), Boolean.TRUE.toString());
+      writeCache(cachedProbes);
+    }
+    return status;
+  }
+
+  /**
+   * @return The interpreter binary, which is searched in the PATH if only its name is configured
+   */
+  Optional<Path> resolveInterpreter() {
+    final Path interpreter = Paths.get(pythonInterpreter);
+    if (interpreter.getParent() != null) {
+      return Optional.of(interpreter).filter(Files::isExecutable).map(EnvironmentProbe::realPath);
+    }
+
+    final String path = System.getenv("PATH");
+    if (path == null) {
+      return Optional.empty();
+    }
+
+    for (final String folder:path.split(File.pathSeparator)) {
+      final Path candidate = Paths.get(folder, pythonInterpreter);
+      if (Files.isExecutable(candidate) && !Files.isDirectory(candidate)) {
+        return Optional.of(realPath(candidate));
+      }
+
+    }
+    return Optional.empty();
+  }
+
+  private static Path realPath(final Path path) {
+    try {
+      return path.toRealPath();
+    }
+    catch (IOException e) {
+      return path.toAbsolutePath();
+    }
+
+  }
+
+  private Status runCheckScript() {
+    try {
+      final URL scriptUrl = EnvironmentProbe.class.getClassLoader().getResource(CHECK_SCRIPT_SOURCE);
+      final long start = System.nanoTime();
+      final Process process = new ProcessBuilder(pythonInterpreter, "-").start();
+      try (final OutputStream script = process.getOutputStream()) {
+        Resources.copy(scriptUrl, script);
+      }
+
+      final List<String> output = readLines(process.getInputStream());
+      readLines(process.getErrorStream()).forEach(Log::error);
+      if (!process.waitFor(60, TimeUnit.SECONDS)) {
+        process.destroyForcibly();
+      }
+
+      final long elapsedTime = System.nanoTime() - start;
+      Log.trace("Successfully evaluated script. Elapsed time: " + (double) elapsedTime / 1000000000.0 + " [s]",
+          LOG_NAME);
+      return Status.parse(output);
+    }
+    catch (IOException | InterruptedException e) {
+      Log.info("Cannot run the python interpreter: " + e.getMessage(), LOG_NAME);
+      return new Status(false, false);
+    }
+
+  }
+
+  private static List<String> readLines(final InputStream inputStream) throws IOException {
+    final BufferedReader in = new BufferedReader(new InputStreamReader(inputStream, StandardCharsets.UTF_8));
+    return in.lines().map(String::trim).collect(Collectors.toList());
+  }
+
+  private Properties readCache() {
+    final Properties cachedProbes = new Properties();
+    if (Files.exists(cacheFile)) {
+      try (final Reader reader = Files.newBufferedReader(cacheFile, StandardCharsets.UTF_8)) {
+        cachedProbes.load(reader);
+      }
+      catch (IOException e) {
+        Log.trace("Cannot read the cached environment probes: " + e.getMessage(), LOG_NAME);
+      }
+
+    }
+    return cachedProbes;
+  }
+
+  private void writeCache(final Properties cachedProbes) {
+    try {
+      Files.createDirectories(cacheFile.toAbsolutePath().getParent());
+      try (final Writer writer = Files.newBufferedWriter(cacheFile, StandardCharsets.UTF_8)) {
+        cachedProbes.store(writer, "Successful probes of the python interpreter and SymPy");
+      }
+
+    }
+    catch (IOException e) {
+      Log.trace("Cannot store the environment probe: " + e.getMessage(), LOG_NAME);
+    }
+
+  }
+
+}
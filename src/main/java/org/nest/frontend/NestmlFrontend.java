@@ -12,15 +12,11 @@ import org.nest.codegeneration.NestCodeGenerator;
 import org.nest.reporting.Reporter;
 import org.nest.utils.FilesHelper;
 
-import java.io.*;
 import java.nio.file.Files;
 import java.nio.file.Path;
 import java.nio.file.Paths;
 import java.util.List;
 import java.util.Optional;
-import java.util.stream.Collectors;
-
-import static org.nest.utils.FilesHelper.copyResource;
 
 /**
  * Handles available options set at the tool invocation. Makes minimal checks of the infrastructure:
@@ -29,16 +25,11 @@ import static org.nest.utils.FilesHelper.copyResource;
  * @author plotnikov
  */
 public class NestmlFrontend {
-  private final static String LOG_NAME = NestmlFrontend.class.getName();
-
-  private static final String PYTHON_VERSION_TEST_OUTPUT = "pythonVersion.tmp";
-  private static final String PYTHON_CHECK_SCRIPT = "pythonChecker.py";
-  private static final String PYTHON_CHECK_SCRIPT_SOURCE = "checks/pythonChecker.py";
 
-  private static final String SYMPY_VERSION_TEST_OUTPUT = "sympyVersion.tmp";
-  private static final String SYMPY_CHECK_SCRIPT = "sympyChecker.py";
-  private static final String SYMPY_CHECK_SCRIPT_SOURCE = "checks/sympyChecker.py";
-  private static final String PYTHON_INTERPRETER = "python ";
+  private static final String PYTHON_INTERPRETER = "python";
+  // successful probes of the python interpreter and SymPy, see EnvironmentProbe
+  private static final Path ENVIRONMENT_PROBE_CACHE = Paths.get(
+      System.getProperty("user.home"), ".nestml", "environment_probes.properties");
 
   // Options
   private static final String HELP_ARGUMENT = "help";
@@ -47,6 +38,7 @@ public class NestmlFrontend {
   private static final String DRY_RUN_OPTION = "dry-run";
   private static final String JSON_OPTION = "json_log";
   private static final String MODULE_OPTION = "module_name";
+  private static final String INCREMENTAL_OPTION = "incremental";
 
 
 
@@ -102,6 +94,13 @@ public class NestmlFrontend {
         .numberOfArgs(1)
         .desc(MODULE_DESCRIPTION)
         .build());
+
+    final String INCREMENTAL_DESCRIPTION = "Solves and generates only the neurons whose model files, solver scripts or " +
+                                           "templates changed since the last run with this target folder.";
+    options.addOption(Option.builder(INCREMENTAL_OPTION.substring(0, 1))
+        .longOpt(INCREMENTAL_OPTION)
+        .desc(INCREMENTAL_DESCRIPTION)
+        .build());
   }
 
   public static void main(final String[] args) {
@@ -152,6 +151,8 @@ public class NestmlFrontend {
       isCodegeneration = false;
     }
 
+    final boolean isIncremental = cliParameters.hasOption(INCREMENTAL_OPTION);
+
     final String targetPath = getOptionValue(cliParameters, TARGET_OPTION).orElse("build");
 
     if (cliParameters.getArgs().length != 1) {
@@ -189,6 +190,7 @@ public class NestmlFrontend {
     return Optional.of(new CliConfiguration
         .Builder()
         .withCodegeneration(isCodegeneration)
+        .withIncremental(isIncremental)
         .withModelPath(modelPath)
         .withModuleName(moduleName)
         .withTargetPath(targetPath)
@@ -247,11 +249,8 @@ public class NestmlFrontend {
     cleanUpTmpFiles(cliConfiguration);
 
     boolean isError = false;
-    if (!evaluateCheckScript(
-        PYTHON_CHECK_SCRIPT_SOURCE,
-        PYTHON_CHECK_SCRIPT,
-        PYTHON_VERSION_TEST_OUTPUT,
-        cliConfiguration.getTargetPath())) {
+    final EnvironmentProbe.Status status = new EnvironmentProbe(PYTHON_INTERPRETER, ENVIRONMENT_PROBE_CACHE).probe();
+    if (!status.python) {
       final String msg = "Install Python the in minimal version 2.7. Execution will be terminated.";
       reporter.reportProgress(msg);
       isError = true;
@@ -261,11 +260,7 @@ public class NestmlFrontend {
       reporter.reportProgress(msg);
     }
 
-    if (!evaluateCheckScript(
-        SYMPY_CHECK_SCRIPT_SOURCE,
-        SYMPY_CHECK_SCRIPT,
-        SYMPY_VERSION_TEST_OUTPUT,
-        cliConfiguration.getTargetPath())) {
+    if (!status.sympy) {
       final String msg = "Install SymPy in minimal version 1.0.1.dev, e.g. from github";
       reporter.reportProgress(msg);
       isError = true;
@@ -291,67 +286,6 @@ public class NestmlFrontend {
     }
   }
 
-  private static boolean evaluateCheckScript(
-      final String scriptSource,
-      final String scriptName,
-      final String scriptOutput,
-      final Path targetPath) {
-    executeCommand(scriptSource, scriptName, targetPath);
-
-    final Path file = Paths.get(targetPath.toString(), scriptOutput);
-    if (!Files.exists(file)) {
-      return false;
-    }
-
-    List<String> pythonStatus;
-
-    try {
-      pythonStatus = Files.readAllLines(file);
-    }
-    catch (IOException e) {
-      final String msg = "Cannot read python check file.";
-      reporter.reportProgress(msg);
-      return false;
-    }
-
-    return pythonStatus.size() != 0 && pythonStatus.get(0).equals("True");
-  }
-
-  private static void executeCommand(
-      final String checkScript,
-      final String copiedScriptName,
-      final Path outputFolder) {
-    try {
-      copyResource(NestmlFrontend.class.getClassLoader(), checkScript, copiedScriptName, outputFolder);
-
-      long start = System.nanoTime();
-      final Process res;
-      res = Runtime.getRuntime().exec(
-          PYTHON_INTERPRETER + copiedScriptName,
-          new String[0],
-          outputFolder.toFile());
-      res.waitFor();
-      long end = System.nanoTime();
-      long elapsedTime = end - start;
-      final String msg = "Successfully evaluated script. Elapsed time: "
-          + (double) elapsedTime / 1000000000.0 +  " [s]";
-      Log.trace(msg, LOG_NAME);
-
-      getListFromStream(res.getErrorStream()).forEach(Log::error);
-      getListFromStream(res.getInputStream()).forEach(entry -> Log.info(entry, LOG_NAME));
-
-    }
-    catch (IOException|InterruptedException e) {
-      throw new RuntimeException(e);
-    }
-
-  }
-
-  private static List<String> getListFromStream(final InputStream inputStream) throws IOException {
-    final BufferedReader in = new BufferedReader(new InputStreamReader(inputStream));
-    return in.lines().collect(Collectors.toList());
-  }
-
   private void executeConfiguration(final CliConfiguration configuration) {
     final CliConfigurationExecutor executor = new CliConfigurationExecutor();
     final NestCodeGenerator nestCodeGenerator = new NestCodeGenerator(configuration.isTracing());
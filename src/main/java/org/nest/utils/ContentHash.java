@@ -0,0 +1,151 @@
+/*
+ * Copyright (c)  RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.utils;
+
+import com.google.common.collect.Maps;
+import com.google.common.io.ByteStreams;
+
+import java.io.IOException;
+import java.io.InputStream;
+import java.net.JarURLConnection;
+import java.net.URISyntaxException;
+import java.net.URL;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.security.MessageDigest;
+import java.security.NoSuchAlgorithmException;
+import java.util.Enumeration;
+import java.util.Map;
+import java.util.SortedMap;
+import java.util.function.Predicate;
+import java.util.jar.JarEntry;
+import java.util.jar.JarFile;
+import java.util.stream.Stream;
+
+/**
+ * Computes hex encoded SHA-1 hashes of files and of classpath resources, e.g. to detect changed models, solver scripts
+ * or templates.
+ *
+ * @author plotnikov
+ */
+public class ContentHash {
+
+  private ContentHash() {
+    // contains only static methods
+  }
+
+  /**
+   * @param contents Key: name, value: content. Both are hashed, in the iteration order of the map.
+   */
+  public static String of(final Map<String, byte[]> contents) {
+    final MessageDigest digest = sha1();
+    for (final Map.Entry<String, byte[]> content:contents.entrySet()) {
+      digest.update(content.getKey().getBytes(StandardCharsets.UTF_8));
+      digest.update(content.getValue());
+    }
+    return toHex(digest.digest());
+  }
+
+  public static String ofFile(final Path file) throws IOException {
+    return toHex(sha1().digest(Files.readAllBytes(file)));
+  }
+
+  /**
+   * Hashes all resources in the classpath folder and its subfolders whose names end with the suffix. The folder may be
+   * located in the file system or in a jar.
+   * @param folder Classpath folder, e.g. {@code org/nest/nestml/}
+   * @param suffix E.g. {@code .ftl}
+   */
+  public static String ofResources(final ClassLoader classLoader, final String folder, final String suffix)
+      throws IOException {
+    return of(readResources(classLoader, folder, name -> name.endsWith(suffix)));
+  }
+
+  /**
+   * Reads all resources in the classpath folder and its subfolders whose names are accepted by the filter. The folder
+   * may be located in the file system or in a jar.
+   * @param folder Classpath folder, e.g. {@code org/nest/sympy/}
+   * @param filter Is applied to the names relative to the folder, e.g. {@code shapes.py} or {@code models/iaf.nestml}
+   * @return Key: name relative to the folder, value: content. The resources are ordered by their names, i.e.
+   * independent of the file system.
+   */
+  public static SortedMap<String, byte[]> readResources(
+      final ClassLoader classLoader,
+      final String folder,
+      final Predicate<String> filter) throws IOException {
+    final URL folderUrl = classLoader.getResource(folder);
+    if (folderUrl == null) {
+      throw new IOException("Cannot find the resource folder: " + folder);
+    }
+
+    final SortedMap<String, byte[]> contents = Maps.newTreeMap();
+    if (folderUrl.getProtocol().equals("jar")) {
+      final JarFile jar = ((JarURLConnection) folderUrl.openConnection()).getJarFile();
+      final Enumeration<JarEntry> entries = jar.entries();
+      while (entries.hasMoreElements()) {
+        final JarEntry entry = entries.nextElement();
+        if (!entry.isDirectory() && entry.getName().startsWith(folder)) {
+          final String name = entry.getName().substring(folder.length());
+          if (filter.test(name)) {
+            try (final InputStream content = jar.getInputStream(entry)) {
+              contents.put(name, ByteStreams.toByteArray(content));
+            }
+
+          }
+
+        }
+
+      }
+
+    }
+    else {
+      final Path root = toPath(folderUrl);
+      try (final Stream<Path> files = Files.walk(root)) {
+        for (final Path file:(Iterable<Path>) files.filter(Files::isRegularFile)::iterator) {
+          final String name = root.relativize(file).toString().replace('\\', '/');
+          if (filter.test(name)) {
+            contents.put(name, Files.readAllBytes(file));
+          }
+
+        }
+
+      }
+
+    }
+    return contents;
+  }
+
+  private static Path toPath(final URL url) throws IOException {
+    try {
+      return Paths.get(url.toURI());
+    }
+    catch (URISyntaxException e) {
+      throw new IOException(e);
+    }
+
+  }
+
+  private static MessageDigest sha1() {
+    try {
+      return MessageDigest.getInstance("SHA-1");
+    }
+    catch (NoSuchAlgorithmException e) {
+      throw new RuntimeException(e);
+    }
+
+  }
+
+  private static String toHex(final byte[] digest) {
+    final StringBuilder hex = new StringBuilder();
+    for (final byte b:digest) {
+      hex.append(String.format("%02x", b));
+    }
+    return hex.toString();
+  }
+
+}
@@ -0,0 +1,9 @@
+import sys
+
+print("python " + str(sys.version_info >= (2, 7)))
+try:
+  import sympy
+  from distutils.version import LooseVersion
+  print("sympy " + str(LooseVersion(sympy.__version__) > LooseVersion("1.0.1")))
+except ImportError:
+  print("sympy False")
@@ -1,3 +0,0 @@
-import sys
-output = open('pythonVersion.tmp', 'w')
-output.write(str(sys.version_info >= (2, 7)))
\ No newline at end of file
@@ -21,6 +21,7 @@
 */
 
 // C++ includes:
+#include <algorithm>
 #include <limits>
 
 // Includes from libnestutil:
@@ -186,6 +187,9 @@ ${neuronName}::init_state_(const Node& proto)
 
 <#if useGSL>
 ${tc.include("org.nest.nestml.neuron.function.GSLDifferentiationFunction", body)}
+<#if useGslJacobian>
+${tc.include("org.nest.nestml.neuron.function.GSLJacobianFunction", body)}
+</#if>
 </#if>
 
 void
@@ -199,7 +203,7 @@ ${neuronName}::init_buffers_()
   <#if useGSL>
     if ( B_.__s == 0 )
     {
-      B_.__s = gsl_odeiv_step_alloc( gsl_odeiv_step_rkf45, ${stateSize} );
+      B_.__s = gsl_odeiv_step_alloc( gsl_odeiv_step_${gslStepper}, ${stateSize} );
     }
     else
     {
@@ -225,11 +229,20 @@ ${neuronName}::init_buffers_()
     }
 
     B_.__sys.function = ${neuronName}_dynamics;
+    <#if useGslJacobian>
+    B_.__sys.jacobian = ${neuronName}_jacobian;
+    <#else>
     B_.__sys.jacobian = NULL;
+    </#if>
     B_.__sys.dimension = ${stateSize};
     B_.__sys.params = reinterpret_cast< void* >( this );
     B_.__step = nest::Time::get_resolution().get_ms();
+    <#if gslStepSize?has_content>
+    // the initial step is recommended by the stiffness analysis of the ODEs
+    B_.__integration_step = std::min( nest::Time::get_resolution().get_ms(), ${gslStepSize} );
+    <#else>
     B_.__integration_step = nest::Time::get_resolution().get_ms();
+    </#if>
   </#if>
 
 }
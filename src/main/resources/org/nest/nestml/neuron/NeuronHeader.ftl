@@ -44,6 +44,14 @@
  * @param void* Pointer to model neuron instance.
  */
 extern "C" inline int ${neuronName}_dynamics( double, const double y[], double f[], void* pnode );
+<#if useGslJacobian>
+
+/**
+ * Function computing the Jacobian of the right-hand side of ODE for implicit GSL steppers.
+ * @note Must be declared here so we can befriend it in class.
+ */
+extern "C" inline int ${neuronName}_jacobian( double, const double y[], double* dfdy, double dfdt[], void* pnode );
+</#if>
 </#if>
 
 // Includes from nestkernel:
@@ -410,6 +418,9 @@ private:
 
   <#if useGSL>
     friend int ${neuronName}_dynamics( double, const double y[], double f[], void* pnode );
+    <#if useGslJacobian>
+    friend int ${neuronName}_jacobian( double, const double y[], double* dfdy, double dfdt[], void* pnode );
+    </#if>
   </#if>
 }; /* neuron ${neuronName} */
 
@@ -0,0 +1,28 @@
+<#--
+  Creates GSL implementation of the Jacobian of the system of ODEs. Only the non-zero entries are set, the
+  system is autonomous, i.e. df/dt is zero.
+
+  @param ast ASTBody The body of the neuron containing ODE
+  @result C++ Function
+-->
+extern "C" inline int
+${neuronName}_jacobian( double, const double ode_state[], double* dfdy, double dfdt[], void* pnode )
+{
+  typedef ${neuronName}::State_ State_;
+  // get access to node so we can almost work as in a member function
+  assert( pnode );
+  const ${neuronName}& node = *( reinterpret_cast< ${neuronName}* >( pnode ) );
+
+  std::fill( dfdy, dfdy + State_::STATE_VEC_SIZE * State_::STATE_VEC_SIZE, 0.0 );
+  std::fill( dfdt, dfdt + State_::STATE_VEC_SIZE, 0.0 );
+
+  <#list gslJacobian.getTemporaries() as temporary>
+  ${temporary}
+  </#list>
+
+  <#list gslJacobian.getEntries() as entry>
+  ${entry}
+  </#list>
+
+  return GSL_SUCCESS;
+}
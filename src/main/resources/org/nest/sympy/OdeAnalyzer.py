@@ -1,10 +1,21 @@
 import json
 
-from sympy import *
-from sympy.parsing.sympy_parser import parse_expr
-
+from sympy import Symbol, diff, exp, symbols
+
+import budget
+import solver_profile
+import zero_oracle
+from budget import BudgetExceeded, TimeBudget, simplify_within_budget
+from dependencies import dependency_index
+from gating import gating_updates
+from jacobian import state_jacobian
+from ode_system import LinearOdeSystem
+from parsed_input import ParsedInput, derivative_name
 from prop_matrix import PropagatorCalculator
-from shapes import ShapeFunction
+from shapes import ShapeFunction, ShapeODE
+from solver_cache import SolverCache
+from stiffness import recommend_integrator
+from zero_oracle import is_zero
 
 import sys
 
@@ -12,7 +23,7 @@ import sys
 class SolverInput:
     """
     Parses and encapsulates JSON input into an object with the following fields:
-    `functions`, `shapes`, `ode`
+    `functions`, `shapes`, `ode`, `odes`, `parameters`, `initial_values`, `referenced_shapes`
     """
 
     def __init__(self, json_serialization):
@@ -20,6 +31,12 @@ class SolverInput:
         self.functions = []
         self.shapes = []
         self.ode = ""
+        self.odes = []
+        self.parameters = []
+        # the initial values of the shapes which are defined by ODEs and of their derivatives, e.g. `g' = e/tau`
+        self.initial_values = []
+        # the shapes which are referenced outside of the ODEs, e.g. in functions, they keep their own state variables
+        self.referenced_shapes = []
 
         self.__dict__ = json.loads(json_serialization)
 
@@ -46,6 +63,29 @@ class SolverOutput:
         self.const_input = const_input
         self.updates_to_shape_state_variables = []
         self.shape_state_odes = []
+        self.merged_shapes = []
+        self.merged_shape_initial_values = []
+        self.common_subexpressions = []
+        # jumps of the ODE variable per spike weight of the delta shapes of an exact solution: [{shape: factor}]
+        self.delta_shapes = []
+        # the recommended GSL stepper of the numeric solution, see `recommend_integrator`
+        self.integrator = None
+        # the non-zero entries of the Jacobian of the numeric solution and their common subexpressions, see
+        # `state_jacobian`. `jacobian` is None if the Jacobian cannot be printed.
+        self.jacobian = None
+        self.jacobian_subexpressions = []
+        # the gating variables of the numeric solution and their exponential Euler updates, see `gating_updates`. The
+        # gating variables aren't a part of the ODEs which are integrated numerically.
+        self.gating_variables = []
+        self.gating_update_instructions = []
+        # the parameters and temporaries of every internal of an exact solution in topological order, see
+        # `dependency_index`
+        self.dependencies = []
+        # the output is created after all simplifications of the solution are done
+        self.strategy = budget.weakest_strategy()
+        self.profile = []
+        # how often each path of the zero test was taken, see `zero_oracle.statistics`
+        self.zero_oracle = {}
 
     def decode_apostroph(self, ode):
         return
@@ -62,6 +102,35 @@ class SolverOutput:
     def add_initial_values(self, initial_values):
         self.initial_values += initial_values
 
+    def add_common_subexpressions(self, common_subexpressions):
+        self.common_subexpressions += common_subexpressions
+
+    def index_dependencies(self):
+        """
+        Indexes the dependencies of the common subexpressions, the ODE variable factor, the propagator elements and
+        the constant input.
+        """
+        definitions = []
+        for definition in self.common_subexpressions + [self.ode_var_factor] + (self.propagator_elements or []) + \
+                [self.const_input]:
+            definitions += list((definition or {}).items())
+        self.dependencies = dependency_index(definitions)
+
+    def add_delta_shape(self, shape, factor):
+        """
+        Records that a spike which is convolved with the delta shape increments the ODE variable by `factor` times the
+        spike weight.
+        """
+        self.delta_shapes.append({str(shape): str(factor)})
+
+    def add_merged_shape(self, shape, representative, weight):
+        """
+        Records that the shape is propagated by the state variables of the representative. A spike which is convolved
+        with the shape adds the weighted initial values of the shape to the state variables of the representative.
+        """
+        self.merged_shapes.append({str(shape.name): str(representative.name)})
+        self.merged_shape_initial_values += shape.get_initial_values(weight)
+
 
 h = symbols("__h")
 
@@ -72,31 +141,21 @@ class OdeAnalyzer(object):
     """
 
     @staticmethod
-    def is_linear_constant_coefficient_ode(ode_var, ode_rhs, shape_vars, shape_definitions, function_vars,
-                                           function_definitions):
-        for shape, shape_definition in zip(shape_vars, shape_definitions):
-            exec ("{} = parse_expr(\"{}\")".format(shape, shape_definition))
-
-        for function_var, function_definition in zip(function_vars, function_definitions):
-            exec ("{} = parse_expr(\"{}\", local_dict=locals())".format(function_var, function_definition))
-
-        # ode functions are defined in the local scope. it must be passed explicitly into the parse_exp,
-        # otherwise, all functions in the ode would not be recognized as `complex` defined through the rhs symbols
-        ode_var = parse_expr(ode_var)
-        ode_rhs = parse_expr(ode_rhs, local_dict=locals())
-
-        dvar = diff(ode_rhs, ode_var)
-        dtdvar = diff(dvar, Symbol("t"))
-
-        if simplify(dtdvar) == simplify(0):
-            return True
-        else:
+    def is_linear_constant_coefficient_ode(parsed_input):
+        """
+        :param parsed_input: `ParsedInput` with an ODE
+        :return: True iff the factor of the ODE variable doesn't depend on time, False for a system of ODEs
+        """
+        if parsed_input.ode_var is None:
             return False
+        with solver_profile.stage("linearity check"):
+            dvar = diff(parsed_input.ode_rhs_in_time(), parsed_input.ode_var)
+            dtdvar = diff(dvar, Symbol("t"))
+
+            return is_zero(dtdvar)
 
     @staticmethod
     def compute_solution(input_json):
-        input_ode_block = SolverInput(input_json)
-
         """
         The function computes a list with propagator matrices.
         :arguments A list starting with an ODE of the first order followed by shape definitions. An ODE is of the form 
@@ -104,48 +163,42 @@ class OdeAnalyzer(object):
         
         :returns JSON object containing all data necessary to compute an update step.
         """
-        if len(input_ode_block.shapes) == 1:
-            tmp = input_ode_block.shapes[0].split('=')
-            shape_name = str(tmp[0])
-            shape_expr = parse_expr(tmp[1].strip())
-            if shape_expr.is_Function and str(shape_expr.func).startswith("delta"):
-                # extract the name of the ODE and its defining expression
-                ode_definition = input_ode_block.ode.split('=')  # it is now a list with 2 elements
-                ode_var = ode_definition[0].replace("'", "").strip()
-                ode_rhs = ode_definition[1].strip()
-
-                function_vars = []  #
-                function_definitions = []  # contains shape functions as ShapeFunction objects
-                if "functions" in input_ode_block.__dict__:
-                    for function_def in input_ode_block.functions:
-                        tmp = function_def.split('=')
-                        function_vars.append(tmp[0].strip())
-                        function_definitions.append(tmp[1].strip())
-
-                if OdeAnalyzer.is_linear_constant_coefficient_ode(ode_var,
-                                                                  ode_rhs,
-                                                                  [shape_name],
-                                                                  [shape_expr],
-                                                                  function_vars,
-                                                                  function_definitions):
-                    for function_var, function_definition in zip(function_vars, function_definitions):
-                        exec ("{} = parse_expr(\"{}\", local_dict=locals())".format(function_var, function_definition))
-
-                    # TODO discuss with Inga
-                    ode_rhs_expr = parse_expr(ode_rhs, local_dict=locals())
-                    const_input = simplify(1 / diff(ode_rhs_expr, parse_expr(shape_name)) * (
-                        ode_rhs_expr - diff(ode_rhs_expr, parse_expr(ode_var)) * parse_expr(ode_var)) - (
-                        parse_expr(shape_name)))
-
-                    c1 = diff(ode_rhs_expr, parse_expr(ode_var))
-                    # The symbol must be declared again. Otherwise, the right hand side will be used for the derivative
-                    c2 = diff(ode_rhs_expr, parse_expr(shape_name))
+        budget.reset_statistics()
+        zero_oracle.reset_statistics()
+        solver_profile.reset()
+        return solver_profile.call_with_cprofile(OdeAnalyzer.solve, input_json)
+
+    @staticmethod
+    def solve(input_json):
+        # all definitions are parsed once, the following stages work on SymPy expressions
+        with solver_profile.stage("input parsing"):
+            parsed_input = ParsedInput(SolverInput(input_json))
+
+        if parsed_input.shape_odes:
+            return OdeAnalyzer.solve_with_shape_odes(parsed_input)
+
+        delta_shapes = [shape for shape, shape_expr in parsed_input.shapes.items()
+                        if OdeAnalyzer.is_delta_shape(shape_expr)]
+        if len(parsed_input.shapes) == 1:
+            shape_name, shape_expr = list(parsed_input.shapes.items())[0]
+            if OdeAnalyzer.is_delta_shape(shape_expr):
+                if OdeAnalyzer.is_linear_constant_coefficient_ode(parsed_input):
+                    ode_var = parsed_input.ode_var
+                    ode_rhs_expr = parsed_input.ode_rhs
+
+                    # the ODE is written as `V' = c1 * V + c2 * (G + const_input)`, i.e. the constant input is measured in
+                    # the units of the spikes which are convolved with the delta shape
+                    const_input = simplify_within_budget(1 / diff(ode_rhs_expr, shape_name) * (
+                        ode_rhs_expr - diff(ode_rhs_expr, ode_var) * ode_var) - shape_name)
+
+                    c1 = diff(ode_rhs_expr, ode_var)
+                    c2 = diff(ode_rhs_expr, shape_name)
 
                     tau_constant = shape_expr.args[1] # is is passed as the second argument of the delta function
                     ode_var_factor = exp(-h/tau_constant)
                     ode_var_update_instructions = [
-                        ode_var + " = __ode_var_factor * " + str(ode_var),
-                        ode_var + " += " + str(str(simplify(c2 / c1 * (exp(h * c1) - 1)))) + " * __const_input"]
+                        str(ode_var) + " = __ode_var_factor * " + str(ode_var),
+                        str(ode_var) + " += " + str(simplify_within_budget(c2 / c1 * (exp(h * c1) - 1))) + " * __const_input"]
                     result = SolverOutput(
                         "success",
                         "delta",
@@ -153,65 +206,169 @@ class OdeAnalyzer(object):
                         {"__ode_var_factor": str(ode_var_factor)},
                         {"__const_input": str(const_input)},
                         ode_var_update_instructions)
-                    return json.dumps(result.__dict__, indent=2)
+                    return OdeAnalyzer.serialize(result)
+                # a delta shape has neither an exact solution in a non-linear ODE nor a numeric one, there is no
+                # solution and the frontend reports that the equations cannot be solved
                 return None
 
-        shape_functions = []  # contains shape functions as ShapeFunction objects
-        for shape_function in input_ode_block.shapes:
-            tmp = shape_function.split('=')
-            lhs_var = tmp[0].strip()
-            shape_expr = tmp[1].strip()
-            shape_functions.append(ShapeFunction(lhs_var, shape_expr))
-
-        if input_ode_block.ode is None:
-            result = OdeAnalyzer.convert_shapes_to_odes(shape_functions)
-            return json.dumps(result.__dict__, indent=2)
-
-        # extract the name of the ODE and its defining expression
-        ode_definition = input_ode_block.ode.split('=')  # it is now a list with 2 elements
-        ode_var = ode_definition[0].replace("'", "").strip()
-        ode_rhs = ode_definition[1].strip()
-
-        function_vars = []  #
-        function_definitions = []  # contains shape functions as ShapeFunction objects
-        if "functions" in input_ode_block.__dict__:
-            for function_def in input_ode_block.functions:
-                tmp = function_def.split('=')
-                function_vars.append(tmp[0].strip())
-                function_definitions.append(tmp[1].strip())
-
-        if OdeAnalyzer.is_linear_constant_coefficient_ode(ode_var,
-                                                          ode_rhs,
-                                                          [shape.name for shape in shape_functions],
-                                                          [shape.shape_expr for shape in shape_functions],
-                                                          function_vars,
-                                                          function_definitions):
-
-            return OdeAnalyzer.compute_exact_solution(function_definitions,
-                                                      function_vars,
-                                                      ode_rhs,
-                                                      ode_var,
-                                                      shape_functions)
+        # delta shapes are jumps of the ODE variable, the other shapes are propagated exactly in the same step
+        if delta_shapes:
+            # a system of ODEs with delta shapes is integrated numerically
+            if not OdeAnalyzer.is_linear_constant_coefficient_ode(parsed_input):
+                return None
+            continuous_shapes = [shape for shape in parsed_input.shapes.keys() if shape not in delta_shapes]
+            return OdeAnalyzer.compute_exact_solution(parsed_input.ode_var, parsed_input.ode_rhs,
+                                                      OdeAnalyzer.analyze_shapes(parsed_input, continuous_shapes),
+                                                      delta_shapes, parsed_input.referenced_shapes)
+
+        shape_functions = OdeAnalyzer.analyze_shapes(parsed_input, parsed_input.shapes.keys())
+
+        if parsed_input.is_system():
+            system = LinearOdeSystem.from_parsed_input(parsed_input)
+            if system is None:
+                return OdeAnalyzer.serialize(OdeAnalyzer.numeric_solution(parsed_input, shape_functions))
+            return OdeAnalyzer.within_exact_budget(
+                lambda: OdeAnalyzer.compute_system_solution(system, shape_functions),
+                lambda: OdeAnalyzer.serialize(OdeAnalyzer.numeric_solution(parsed_input, shape_functions)))
+
+        if parsed_input.ode_var is None:
+            return OdeAnalyzer.serialize(OdeAnalyzer.numeric_solution(parsed_input, shape_functions))
+
+        if OdeAnalyzer.is_linear_constant_coefficient_ode(parsed_input):
+            return OdeAnalyzer.within_exact_budget(
+                lambda: OdeAnalyzer.compute_exact_solution(parsed_input.ode_var, parsed_input.ode_rhs, shape_functions,
+                                                           referenced_shapes=parsed_input.referenced_shapes),
+                lambda: OdeAnalyzer.serialize(OdeAnalyzer.numeric_solution(parsed_input, shape_functions)))
         else:  # is_linear_constant_coefficient_ode evaluates to false
-            result = OdeAnalyzer.convert_shapes_to_odes(shape_functions)
-            return json.dumps(result.__dict__, indent=2)
+            return OdeAnalyzer.serialize(OdeAnalyzer.numeric_solution(parsed_input, shape_functions))
+
+    @staticmethod
+    def is_delta_shape(shape_expr):
+        return shape_expr.is_Function and str(shape_expr.func).startswith("delta")
+
+    @staticmethod
+    def analyze_shapes(parsed_input, shapes):
+        """
+        :param shapes: Symbols of the shapes
+        :return: List of `ShapeFunction` objects of the shapes
+        """
+        shape_functions = []  # contains shape functions as ShapeFunction objects
+        for shape_name in shapes:
+            with solver_profile.stage("shape order detection " + str(shape_name)) as record:
+                shape_functions.append(ShapeFunction(str(shape_name), parsed_input.shapes[shape_name]))
+                record.set_size(shape_functions[-1].derivative_factors)
+        return shape_functions
 
     @staticmethod
-    def compute_exact_solution(function_definitions, function_vars, ode_rhs, ode_var, shape_functions):
+    def solve_with_shape_odes(parsed_input):
+        """
+        Shapes which are defined by linear homogeneous ODEs with constant coefficients, e.g. `g'' = -g/tau**2 - 2*g'/tau`,
+        are propagated exactly like shapes which are defined as functions of `t`. There is no numeric solution for them:
+        their ODEs are integrated as they are written in the model.
+        :return: The exact solution or None if a shape ODE or the ODEs of the model aren't linear
+        """
+        shape_odes = OdeAnalyzer.analyze_shape_odes(parsed_input)
+        if shape_odes is None:
+            return None
+
+        delta_shapes = [shape for shape, shape_expr in parsed_input.shapes.items()
+                        if OdeAnalyzer.is_delta_shape(shape_expr)]
+        shapes = OdeAnalyzer.analyze_shapes(
+            parsed_input, [shape for shape in parsed_input.shapes.keys() if shape not in delta_shapes]) + shape_odes
+
+        if parsed_input.is_system():
+            system = LinearOdeSystem.from_parsed_input(parsed_input)
+            if system is None or delta_shapes:
+                return None
+            return OdeAnalyzer.within_exact_budget(lambda: OdeAnalyzer.compute_system_solution(system, shapes),
+                                                   lambda: None)
+
+        if parsed_input.ode_var is None or not OdeAnalyzer.is_linear_constant_coefficient_ode(parsed_input):
+            return None
+        # the shape ODEs aren't inlined as functions of `t`, their symbols must not occur in the factors of the ODE
+        state_symbols = [parsed_input.ode_var] + [shape.name for shape in shape_odes]
+        if any(diff(parsed_input.ode_rhs, symbol).has(*state_symbols) for symbol in state_symbols):
+            return None
+
+        return OdeAnalyzer.within_exact_budget(
+            lambda: OdeAnalyzer.compute_exact_solution(parsed_input.ode_var, parsed_input.ode_rhs, shapes, delta_shapes,
+                                                       parsed_input.referenced_shapes),
+            lambda: None)
+
+    @staticmethod
+    def analyze_shape_odes(parsed_input):
+        """
+        :return: List of `ShapeODE` objects of the shapes which are defined by ODEs or None if a shape ODE isn't linear
+        or an initial value is missing
+        """
+        shape_odes = []
+        for shape_name, (order, rhs) in parsed_input.shape_odes.items():
+            with solver_profile.stage("shape ODE " + str(shape_name)) as record:
+                initial_values = [parsed_input.initial_values.get(Symbol(derivative_name(str(shape_name), k)))
+                                  for k in range(order)]
+                if any(initial_value is None for initial_value in initial_values):
+                    return None
+                shape_odes.append(ShapeODE.from_ode(str(shape_name), order, rhs, initial_values))
+                record.set_size(shape_odes[-1].ode_sys_rhs)
+                if not shape_odes[-1].is_linear():
+                    return None
+        return shape_odes
+
+    @staticmethod
+    def within_exact_budget(compute, fallback):
+        """
+        :param compute: Function which computes the serialized exact solution
+        :param fallback: Function which computes the serialized solution if the exact solution exceeds the time budget,
+        e.g. the numeric solution
+        :return: The exact solution or the fallback solution
+        """
+        exact_budget = TimeBudget(budget.exact_timeout())
+        try:
+            with exact_budget:
+                return compute()
+        except BudgetExceeded as e:
+            if e.budget is not exact_budget:
+                raise
+            # the shapes are propagated by the numeric solver instead
+            budget.record_strategy("numeric")
+            return fallback()
+
+    @staticmethod
+    def compute_exact_solution(ode_var, ode_rhs, shape_functions, delta_shapes=(), referenced_shapes=()):
+        """
+        :param ode_var: Symbol of the ODE variable
+        :param ode_rhs: Right hand side of the ODE in which all functions are inlined
+        :param shape_functions: List of `ShapeFunction` or `ShapeODE` objects
+        :param delta_shapes: Symbols of the delta shapes. A spike which is convolved with a delta shape increments the
+        ODE variable by the integral of the delta input, i.e. by the spike weight times the whole factor of the shape
+        in the ODE, e.g. by `-2/C_m` times the weight for `-2/C_m * I_in`.
+        :param referenced_shapes: Symbols of the shapes which are referenced outside of the ODEs, they are not merged
+        :return: The exact solution or None if the factor of a delta shape depends on the state
+        """
+        delta_factors = [(shape, diff(ode_rhs, shape)) for shape in delta_shapes]
+        state_symbols = [ode_var] + list(delta_shapes) + [shape.name for shape in shape_functions]
+        if any(factor.has(*state_symbols) for _, factor in delta_factors):
+            return None
+        delta_jumps = delta_factors
+        ode_rhs = ode_rhs.xreplace(dict((shape, 0) for shape in delta_shapes))
+
         calculator = PropagatorCalculator()
+        # shapes which satisfy the same ODE share the state variables and the propagator of one representative
+        shape_functions, merged_shapes = calculator.merge_equivalent_shapes(shape_functions, ode_var, ode_rhs,
+                                                                            referenced_shapes)
         prop_matrices, const_input, step_const = calculator.ode_to_prop_matrices(
             shape_functions,
             ode_var,
             ode_rhs,
-            function_vars,
-            function_definitions)
-        propagator_elements, ode_var_factor, const_input, ode_var_update_instructions = \
+            [shape for shape, _, _ in merged_shapes])
+        propagator_elements, ode_var_factor, const_input, ode_var_update_instructions, common_subexpressions = \
             calculator.prop_matrix_to_prop_step(
                 prop_matrices,
                 const_input,
                 step_const,
                 shape_functions,
-                ode_var)
+                ode_var,
+                exp(h * diff(ode_rhs, ode_var)))
         # build result JSON
         result = SolverOutput("success",
                               "exact",
@@ -219,11 +376,74 @@ class OdeAnalyzer(object):
                               ode_var_factor,
                               const_input,
                               ode_var_update_instructions)
+        result.add_common_subexpressions(common_subexpressions)
         for shape in shape_functions:
             result.add_shape_state_variables(shape.additional_shape_state_variables())
             result.add_initial_values(shape.get_initial_values())
             result.add_updates_to_shape_state_variables(shape.get_updates_to_shape_state_variables())
-        return json.dumps(result.__dict__, indent=2)
+        for shape, representative, weight in merged_shapes:
+            result.add_merged_shape(shape, representative, weight)
+        for shape, jump in delta_jumps:
+            result.add_delta_shape(shape, jump)
+        return OdeAnalyzer.serialize(result)
+
+    @staticmethod
+    def compute_system_solution(system, shape_functions):
+        """
+        :param system: `LinearOdeSystem`
+        :param shape_functions: List of `ShapeFunction` objects
+        :return: The exact solution. It contains neither an ODE variable factor nor a constant input, the constant
+        inputs of all ODEs are defined by the update instructions.
+        """
+        propagators, ode_var_update_instructions = system.propagation_step(shape_functions)
+        common_subexpressions, reduced = PropagatorCalculator.eliminate_common_subexpressions(
+            [value for _, value in propagators])
+        propagator_elements = [{name: str(value)} for (name, _), value in zip(propagators, reduced)]
+
+        result = SolverOutput("success", "exact", propagator_elements, None, None, ode_var_update_instructions)
+        result.add_common_subexpressions(common_subexpressions)
+        for shape in shape_functions:
+            result.add_shape_state_variables(shape.additional_shape_state_variables())
+            result.add_initial_values(shape.get_initial_values())
+            result.add_updates_to_shape_state_variables(shape.get_updates_to_shape_state_variables())
+        return OdeAnalyzer.serialize(result)
+
+    @staticmethod
+    def serialize(result):
+        """
+        :param result: `SolverOutput`
+        :return: JSON serialization of the result with the records of all stages in its `profile` section and the
+        counters of the zero test in its `zero_oracle` section
+        """
+        with solver_profile.stage("dependency index"):
+            result.index_dependencies()
+        result.zero_oracle = dict(zero_oracle.statistics)
+        fields = dict((name, value) for name, value in result.__dict__.items() if name != "profile")
+        with solver_profile.stage("serialization"):
+            serialization = json.dumps(fields, indent=2)
+        result.profile = solver_profile.records()
+        # the result is serialized once, the profile with the serialization stage is appended as the last field
+        return serialization[:-len("\n}")] + ',\n  "profile": ' + json.dumps(result.profile) + "\n}"
+
+    @staticmethod
+    def numeric_solution(parsed_input, shape_functions):
+        """
+        :return: The numeric solution with the exponential Euler updates of the gating variables, the recommended GSL
+        stepper and the Jacobian for the remaining ODEs and the shapes
+        """
+        result = OdeAnalyzer.convert_shapes_to_odes(shape_functions)
+        with solver_profile.stage("gating variables"):
+            gating_variables, result.gating_update_instructions = gating_updates(parsed_input)
+            result.gating_variables = [str(variable) for variable in gating_variables]
+            parsed_input = parsed_input.without_equations(gating_variables)
+        with solver_profile.stage("stiffness analysis"):
+            result.integrator = recommend_integrator(parsed_input, shape_functions, parsed_input.parameters)
+        with solver_profile.stage("jacobian") as record:
+            jacobian = state_jacobian(parsed_input, shape_functions)
+            if jacobian is not None:
+                result.jacobian_subexpressions, result.jacobian = jacobian
+                record.set_size([entry["value"] for entry in result.jacobian])
+        return result
 
     @staticmethod
     def convert_shapes_to_odes(shape_functions):
@@ -234,9 +454,68 @@ class OdeAnalyzer(object):
             result.add_initial_values(shape.get_initial_values())
         return result
 
+    @staticmethod
+    def serve(input_stream, output_stream, cache=None):
+        """
+        Runs the analyzer as a long-lived worker. Every line read from `input_stream` must contain one `SolverInput`
+        serialized as JSON. For every request exactly one line with the serialized `SolverOutput` is written into
+        `output_stream`. The worker terminates when `input_stream` is closed.
+        :param input_stream: Stream with JSON-lines requests, e.g. `sys.stdin`
+        :param output_stream: Stream where JSON-lines replies are written, e.g. `sys.stdout`
+        :param cache: Optional `SolverCache`. If it is provided, every reply contains the field `cache` with the value
+        `hit` or `miss`.
+        """
+        while True:
+            request = input_stream.readline()
+            if not request:
+                break
+            if not request.strip():
+                continue
+
+            cache_status = None
+            try:
+                if cache is not None:
+                    result, is_hit = cache.compute_solution(request, OdeAnalyzer.compute_solution)
+                    cache_status = "hit" if is_hit else "miss"
+                else:
+                    result = OdeAnalyzer.compute_solution(request)
+            except Exception as e:
+                sys.stderr.write("Cannot compute the solution: {}\n".format(e))
+                result = None
+
+            if result is None:
+                result = json.dumps(SolverOutput("failed", None, None, None, None, None).__dict__)
+
+            # the reply must be written as one line, therefore, the pretty printed JSON is condensed
+            reply = json.loads(result)
+            if cache_status is not None:
+                reply["cache"] = cache_status
+            output_stream.write(json.dumps(reply) + "\n")
+            output_stream.flush()
+
 
 # MAIN ENTRY POINT ###
 if __name__ == "__main__":
-    result = OdeAnalyzer.compute_solution(sys.argv[1])
-    f = open('result.tmp', 'w')
-    f.write(result)
+    if sys.argv[1] == "--server":
+        # the protocol uses stdout exclusively. all other output, e.g. debug prints, is redirected to stderr
+        protocol_stream = sys.stdout
+        sys.stdout = sys.stderr
+        OdeAnalyzer.serve(sys.stdin, protocol_stream, SolverCache())
+    elif sys.argv[1] == "--batch":
+        # solves the list of `SolverInput`s from the file `sys.argv[2]` in parallel and stores the results keyed by the
+        # neuron name in the file `sys.argv[3]`
+        from batch_solver import read_batch, solve_batch
+        with open(sys.argv[2], 'r') as batch_file:
+            solver_inputs = read_batch(batch_file.read())
+        results = solve_batch(solver_inputs, OdeAnalyzer.compute_solution, cache=SolverCache())
+        with open(sys.argv[3], 'w') as result_file:
+            result_file.write(json.dumps(dict((name, json.loads(result)) for name, result in results.items()),
+                                         indent=2))
+    elif sys.argv[1] == "--cache-info":
+        print(json.dumps(SolverCache().info(), indent=2))
+    elif sys.argv[1] == "--cache-clear":
+        SolverCache().clear()
+    else:
+        result, _ = SolverCache().compute_solution(sys.argv[1], OdeAnalyzer.compute_solution)
+        f = open('result.tmp', 'w')
+        f.write(result)
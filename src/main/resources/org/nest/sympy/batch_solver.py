@@ -0,0 +1,157 @@
+"""
+   This script solves many equations blocks in parallel. Every
+   `SolverInput` is computed in its own process and at most as many
+   processes as there are cores run at the same time. A job which
+   exceeds its time budget is terminated and reported as failed, a
+   job which raises an error or crashes doesn't affect other jobs.
+
+   Example:
+   ========
+
+   results = solve_batch({"iaf_psc_alpha": psc_json, "iaf_cond_alpha": cond_json},
+                         OdeAnalyzer.compute_solution,
+                         timeout=60)
+
+   `results` maps every neuron name onto the JSON serialization of its
+   `SolverOutput`.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from OdeAnalyzer import SolverOutput
+
+# The time budget of one job in seconds can be overridden through this environment variable.
+TIMEOUT_VARIABLE = "NESTML_SOLVER_TIMEOUT"
+DEFAULT_TIMEOUT = 600
+
+# Interval in seconds in which running jobs are checked for results.
+POLL_INTERVAL = 0.05
+
+
+class BatchJob(object):
+    """
+    A running job: the process which computes the solution and the receiving end of the pipe with its result.
+    """
+
+    def __init__(self, name, process, connection):
+        self.name = name
+        self.process = process
+        self.connection = connection
+        self.start = time.time()
+
+
+def _run_job(compute, input_json, connection):
+    """
+    Entry point of the job process. Sends the tuple (result, error message) to the parent process.
+    """
+    try:
+        connection.send((compute(input_json), None))
+    except Exception as e:
+        connection.send((None, str(e)))
+    connection.close()
+
+
+def read_batch(batch_json):
+    """
+    :param batch_json: JSON list with `SolverInput` documents. Every document contains the neuron name in the field
+    `name`.
+    :return: Dictionary which maps neuron names onto the JSON serialization of their `SolverInput`
+    """
+    solver_inputs = {}
+    for document in json.loads(batch_json):
+        name = document.pop("name")
+        solver_inputs[name] = json.dumps(document)
+    return solver_inputs
+
+
+def solve_batch(solver_inputs, compute, processes=None, timeout=None, cache=None):
+    """
+    Computes the solutions for all inputs in parallel.
+    :param solver_inputs: Dictionary which maps neuron names onto the JSON serialization of their `SolverInput`
+    :param compute: Function which computes the serialized `SolverOutput`, e.g. `OdeAnalyzer.compute_solution`
+    :param processes: Maximal number of jobs which run at the same time. Defaults to the number of cores.
+    :param timeout: Time budget of one job in seconds. Defaults to `DEFAULT_TIMEOUT`.
+    :param cache: Optional `SolverCache`. Cached inputs are not computed again and every result contains the field
+    `cache` with the value `hit` or `miss`.
+    :return: Dictionary which maps neuron names onto the JSON serialization of their `SolverOutput`
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if timeout is None:
+        timeout = float(os.environ.get(TIMEOUT_VARIABLE, DEFAULT_TIMEOUT))
+
+    results = {}
+    pending = []
+    for name in sorted(solver_inputs.keys()):
+        cached_result = cache.lookup(cache.key(solver_inputs[name])) if cache is not None else None
+        if cached_result is not None:
+            cache.hits += 1
+            results[name] = _finish(cached_result, "hit")
+        else:
+            pending.append(name)
+
+    running = []
+    while pending or running:
+        while pending and len(running) < processes:
+            name = pending.pop(0)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_job, args=(compute, solver_inputs[name], sender))
+            process.daemon = True
+            process.start()
+            sender.close()  # only the job process writes into the pipe
+            running.append(BatchJob(name, process, receiver))
+
+        still_running = []
+        for job in running:
+            # the pipe is checked again after the liveness check, since the job could finish in between
+            if job.connection.poll() or (not job.process.is_alive() and job.connection.poll()):
+                try:
+                    result, error = job.connection.recv()
+                    job.process.join()
+                except EOFError:  # the process terminated without sending a result
+                    job.process.join()
+                    result, error = None, "the solver process terminated with the exit code {}".format(
+                        job.process.exitcode)
+            elif not job.process.is_alive():
+                job.process.join()
+                result, error = None, "the solver process terminated with the exit code {}".format(
+                    job.process.exitcode)
+            elif time.time() - job.start > timeout:
+                job.process.terminate()
+                job.process.join()
+                result, error = None, "the solver exceeded the time budget of {} s".format(timeout)
+            else:
+                still_running.append(job)
+                continue
+
+            job.connection.close()
+            if result is None:
+                sys.stderr.write("{}: cannot compute the solution: {}\n".format(
+                    job.name, error if error is not None else "unsupported equations"))
+                result = json.dumps(SolverOutput("failed", None, None, None, None, None).__dict__)
+            elif cache is not None:
+                cache.put_if_cacheable(cache.key(solver_inputs[job.name]), result)
+
+            if cache is not None:
+                cache.misses += 1
+            results[job.name] = _finish(result, "miss" if cache is not None else None)
+
+        if len(still_running) == len(running):
+            time.sleep(POLL_INTERVAL)
+        running = still_running
+
+    return results
+
+
+def _finish(result, cache_status):
+    """
+    Condenses the result into one line and marks whether it was read from the cache.
+    """
+    reply = json.loads(result)
+    if cache_status is not None:
+        reply["cache"] = cache_status
+    return json.dumps(reply)
@@ -0,0 +1,79 @@
+import unittest
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from batch_solver import read_batch, solve_batch
+from OdeAnalyzer import OdeAnalyzer
+from solver_cache import SolverCache
+
+psc_ode_block = '{' \
+                '"functions" : [ "I_syn = I_shape_in+I_shape_ex+I_e+currents" ],' \
+                '"shapes" : [ "I_shape_in = pA*(e/tau_syn_in)*t*exp((-1)/tau_syn_in*t)", "I_shape_ex = pA*(e/tau_syn_ex)*t*exp((-1)/tau_syn_ex*t)" ], ' \
+                '"ode" : "V_abs\' = (-1)/Tau*V_abs+1/C_m*I_syn"' \
+                '}'
+
+delta_shape = '{' \
+              '"functions" : [ ],' \
+              '"shapes" : [ "G = delta(t, tau_m)" ],' \
+              '"ode" : "V_abs\' = (-1)/tau_m*V_abs+1/C_m*(G+I_e+currents)"'\
+              '}'
+
+
+def pathological_solver(input_json):
+    if "hangs" in input_json:
+        time.sleep(60)
+    elif "crashes" in input_json:
+        os._exit(1)
+    elif "raises" in input_json:
+        raise Exception("cannot solve")
+    return json.dumps({"status": "success", "solver": "exact"})
+
+
+def degraded_solver(input_json):
+    strategy = "unsimplified" if "slow" in input_json else "simplify"
+    return json.dumps({"status": "success", "solver": "exact", "strategy": strategy})
+
+
+class TestBatchSolver(unittest.TestCase):
+
+    def test_read_batch(self):
+        batch = json.dumps([dict(json.loads(psc_ode_block), name="iaf_psc_alpha"),
+                            dict(json.loads(delta_shape), name="iaf_psc_delta")])
+        testant = read_batch(batch)
+        self.assertEqual(set(["iaf_psc_alpha", "iaf_psc_delta"]), set(testant.keys()))
+        self.assertFalse("name" in json.loads(testant["iaf_psc_alpha"]))
+
+    def test_solve_batch(self):
+        testant = solve_batch({"iaf_psc_alpha": psc_ode_block, "iaf_psc_delta": delta_shape},
+                              OdeAnalyzer.compute_solution)
+        self.assertEqual("exact", json.loads(testant["iaf_psc_alpha"])["solver"])
+        self.assertEqual("delta", json.loads(testant["iaf_psc_delta"])["solver"])
+
+    def test_error_isolation(self):
+        solver_inputs = dict((name, json.dumps({"behaviour": name})) for name in ["hangs", "crashes", "raises", "works"])
+
+        start = time.time()
+        testant = solve_batch(solver_inputs, pathological_solver, processes=2, timeout=1)
+        self.assertTrue(time.time() - start < 30)
+
+        self.assertEqual("success", json.loads(testant["works"])["status"])
+        for name in ["hangs", "crashes", "raises"]:
+            self.assertEqual("failed", json.loads(testant[name])["status"])
+
+    def test_degraded_results_are_not_cached(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = SolverCache(cache_dir)
+            solve_batch({"slow": json.dumps({"behaviour": "slow"}), "fast": json.dumps({"behaviour": "fast"})},
+                        degraded_solver, cache=cache)
+            self.assertEqual(1, len(cache.entries()))
+            self.assertIsNone(cache.get(cache.key(json.dumps({"behaviour": "slow"}))))
+        finally:
+            shutil.rmtree(cache_dir)
+
+if __name__ == '__main__':
+    unittest.main()
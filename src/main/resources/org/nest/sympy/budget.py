@@ -0,0 +1,189 @@
+"""
+   This script provides time and size budgets for the symbolic
+   computations of the solver. A single model can keep `simplify`
+   running for minutes, therefore, every simplification is done by the
+   first strategy of the following ladder which stays within its budget:
+
+   - `simplify`: full simplification, only for expressions with at most
+     `NESTML_SIMPLIFY_MAX_OPS` operations (see `count_ops`),
+   - `cancel`: `cancel(together(expr))`, i.e. a common denominator
+     without common factors,
+   - `unsimplified`: the expression is used as it is.
+
+   Every strategy may run `NESTML_SIMPLIFY_TIMEOUT` seconds. Additionally,
+   the whole exact solution is computed within `NESTML_EXACT_TIMEOUT`
+   seconds, otherwise the `numeric` solver is used. The weakest strategy
+   which was used for a solution is reported in the `SolverOutput`.
+
+   Time budgets are enforced by `SIGALRM`. They are ignored where no
+   alarm signal is available, i.e. on Windows and outside of the main
+   thread.
+
+   Example:
+   ========
+
+   reset_statistics()
+   derivative_factors = simplify_within_budget(derivative_factors)
+   weakest_strategy()  # e.g. "cancel" if `simplify` exceeded its budget
+"""
+
+import os
+import signal
+import threading
+import time
+
+from sympy import MatrixBase, cancel, count_ops, simplify, together
+
+# The budgets can be overridden through these environment variables.
+SIMPLIFY_TIMEOUT_VARIABLE = "NESTML_SIMPLIFY_TIMEOUT"
+DEFAULT_SIMPLIFY_TIMEOUT = 10
+SIMPLIFY_MAX_OPS_VARIABLE = "NESTML_SIMPLIFY_MAX_OPS"
+DEFAULT_SIMPLIFY_MAX_OPS = 400
+EXACT_TIMEOUT_VARIABLE = "NESTML_EXACT_TIMEOUT"
+DEFAULT_EXACT_TIMEOUT = 300
+
+# The strategies from the strongest to the weakest one.
+STRATEGIES = ["simplify", "cancel", "unsimplified", "numeric"]
+FULL_STRATEGY = STRATEGIES[0]
+
+statistics = dict((strategy, 0) for strategy in STRATEGIES)
+
+
+def reset_statistics():
+    for strategy in STRATEGIES:
+        statistics[strategy] = 0
+
+
+def record_strategy(strategy):
+    statistics[strategy] += 1
+
+
+def weakest_strategy():
+    """
+    :return: The weakest strategy which was used since the last `reset_statistics`, `simplify` if none was used
+    """
+    for strategy in reversed(STRATEGIES):
+        if statistics[strategy] > 0:
+            return strategy
+    return FULL_STRATEGY
+
+
+def simplify_timeout():
+    return float(os.environ.get(SIMPLIFY_TIMEOUT_VARIABLE, DEFAULT_SIMPLIFY_TIMEOUT))
+
+
+def simplify_max_ops():
+    return int(os.environ.get(SIMPLIFY_MAX_OPS_VARIABLE, DEFAULT_SIMPLIFY_MAX_OPS))
+
+
+def exact_timeout():
+    return float(os.environ.get(EXACT_TIMEOUT_VARIABLE, DEFAULT_EXACT_TIMEOUT))
+
+
+class BudgetExceeded(Exception):
+    """
+    Is raised inside of a `TimeBudget` block when its time is over. `budget` is the exceeded budget, which allows
+    nested budgets to tell their own expiry from the expiry of an enclosing budget.
+    """
+
+    def __init__(self, budget):
+        Exception.__init__(self, "the time budget of {} s is exceeded".format(budget.seconds))
+        self.budget = budget
+
+
+def alarm_available():
+    return hasattr(signal, "setitimer") and threading.current_thread().name == "MainThread"
+
+
+class TimeBudget(object):
+    """
+    Context manager which raises `BudgetExceeded` if its block runs longer than `seconds`. Budgets can be nested, the
+    alarm is always set to the earliest deadline of all active budgets.
+    """
+
+    # the active budgets, the outermost one first
+    active = []
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = None
+        self.expired = False
+        self.previous_handler = None
+
+    def __enter__(self):
+        if not alarm_available():
+            return self
+
+        self.deadline = time.time() + self.seconds
+        if not TimeBudget.active:
+            self.previous_handler = signal.signal(signal.SIGALRM, TimeBudget._on_alarm)
+        TimeBudget.active.append(self)
+        TimeBudget._set_alarm()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self in TimeBudget.active:
+            TimeBudget.active.remove(self)
+            if TimeBudget.active:
+                TimeBudget._set_alarm()
+            else:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, self.previous_handler or signal.SIG_DFL)
+        return False
+
+    @staticmethod
+    def _set_alarm():
+        deadlines = [budget.deadline for budget in TimeBudget.active if not budget.expired]
+        if deadlines:
+            # a zero interval would disable the timer instead of firing immediately
+            signal.setitimer(signal.ITIMER_REAL, max(min(deadlines) - time.time(), 0.001))
+        else:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    @staticmethod
+    def _on_alarm(signum, frame):
+        now = time.time()
+        for budget in TimeBudget.active:
+            if not budget.expired and budget.deadline <= now:
+                # expired budgets don't fire again while the exception unwinds the enclosed blocks
+                budget.expired = True
+                raise BudgetExceeded(budget)
+        TimeBudget._set_alarm()
+
+
+def simplify_within_budget(expr):
+    """
+    Simplifies the expression by the strongest strategy which stays within the budget and records the strategy.
+    :param expr: SymPy expression or matrix. The entries of a matrix are simplified one by one.
+    :return: The simplified expression
+    """
+    if isinstance(expr, MatrixBase):
+        return expr.applyfunc(simplify_within_budget)
+
+    if count_ops(expr) <= simplify_max_ops():
+        result = _run_within_budget(simplify, expr)
+        if result is not None:
+            record_strategy("simplify")
+            return result
+
+    result = _run_within_budget(lambda x: cancel(together(x)), expr)
+    if result is not None:
+        record_strategy("cancel")
+        return result
+
+    record_strategy("unsimplified")
+    return expr
+
+
+def _run_within_budget(strategy, expr):
+    """
+    :return: The result of the strategy or None if it exceeded the simplification time budget
+    """
+    budget = TimeBudget(simplify_timeout())
+    try:
+        with budget:
+            return strategy(expr)
+    except BudgetExceeded as e:
+        if e.budget is not budget:
+            raise
+        return None
@@ -0,0 +1,54 @@
+import json
+import os
+import unittest
+
+from sympy.parsing.sympy_parser import parse_expr
+
+import budget
+from budget import BudgetExceeded, TimeBudget, simplify_within_budget
+from OdeAnalyzer import OdeAnalyzer
+
+psc_ode_block = '{' \
+                '"shapes" : [ "I_shape = (e/tau_syn) * t * exp(-1/tau_syn*t)" ],' \
+                '"ode" : "V_m\' = -1/tau_m * V_m + 1/C_m * (I_shape + I_e)"' \
+                '}'
+
+
+class TestBudget(unittest.TestCase):
+
+    def setUp(self):
+        budget.reset_statistics()
+
+    def tearDown(self):
+        for variable in [budget.SIMPLIFY_MAX_OPS_VARIABLE, budget.EXACT_TIMEOUT_VARIABLE]:
+            os.environ.pop(variable, None)
+
+    def test_simplify_within_budget(self):
+        self.assertEqual(parse_expr("1"), simplify_within_budget(parse_expr("sin(x)**2 + cos(x)**2")))
+        self.assertEqual("simplify", budget.weakest_strategy())
+
+    def test_size_budget(self):
+        os.environ[budget.SIMPLIFY_MAX_OPS_VARIABLE] = "0"
+        self.assertEqual(parse_expr("a + b"), simplify_within_budget(parse_expr("(a**2 - b**2)/(a - b)")))
+        self.assertEqual("cancel", budget.weakest_strategy())
+
+    def test_nested_time_budgets(self):
+        outer = TimeBudget(0.05)
+        inner = TimeBudget(10)
+        try:
+            with outer:
+                with inner:
+                    while True:
+                        pass
+        except BudgetExceeded as e:
+            self.assertIs(outer, e.budget)
+        self.assertEqual([], TimeBudget.active)
+
+    def test_numeric_fallback(self):
+        os.environ[budget.EXACT_TIMEOUT_VARIABLE] = "0.001"
+        testant = json.loads(OdeAnalyzer.compute_solution(psc_ode_block))
+        self.assertEqual("numeric", testant["solver"])
+        self.assertEqual("numeric", testant["strategy"])
+
+if __name__ == '__main__':
+    unittest.main()
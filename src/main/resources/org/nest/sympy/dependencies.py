@@ -0,0 +1,56 @@
+"""
+   This script computes the dependency index of the internals of an exact
+   solution: the common subexpressions, the ODE variable factor, the
+   propagator elements and the constant input. Every entry of the index
+   names one internal, the parameters on which it depends directly or
+   through temporaries and the temporaries which it uses directly. The
+   entries are topologically ordered, i.e. every temporary precedes the
+   internals which use it.
+
+   If a parameter changes, only the entries which list it must be
+   recomputed, in the order of the index. The resolution `__h` and
+   buffers, e.g. `currents`, are listed like parameters. Units and the
+   Euler number `e` are constants and are not listed.
+
+   Example:
+   ========
+
+   dependency_index([("__cse0", "exp(-__h/tau_syn)"), ("__P_I__0_0", "__cse0")])
+   # [{"name": "__cse0", "parameters": ["__h", "tau_syn"], "temporaries": []},
+   #  {"name": "__P_I__0_0", "parameters": ["__h", "tau_syn"], "temporaries": ["__cse0"]}]
+"""
+
+from parsed_input import parse_definition
+from stiffness import implicit_values
+
+
+def dependency_index(definitions):
+    """
+    :param definitions: List of (name, expression) of the internals in the order of their definition
+    :return: List of dictionaries with the `name`, the sorted `parameters` and the sorted `temporaries` of every internal
+    in topological order. Definitions which depend cyclically on each other are appended in the order of their
+    definition.
+    """
+    names = [name for name, _ in definitions]
+    symbols = {}
+    for name, expression in definitions:
+        free_symbols = parse_definition(expression).free_symbols
+        constants = implicit_values(free_symbols)
+        symbols[name] = set(str(symbol) for symbol in free_symbols if symbol not in constants)
+
+    temporaries = dict((name, symbols[name] & set(names)) for name in names)
+    ordered = []
+    parameters = {}
+    remaining = list(names)
+    while remaining:
+        # the first definition whose temporaries are all defined keeps the order of the definitions stable
+        ready = [name for name in remaining if temporaries[name] <= set(ordered)] or remaining[:1]
+        name = ready[0]
+        remaining.remove(name)
+        ordered.append(name)
+        parameters[name] = symbols[name] - set(names)
+        for temporary in temporaries[name]:
+            parameters[name] |= parameters.get(temporary, set())
+
+    return [{"name": name, "parameters": sorted(parameters[name]), "temporaries": sorted(temporaries[name])}
+            for name in ordered]
@@ -0,0 +1,35 @@
+import json
+import unittest
+
+from OdeAnalyzer import OdeAnalyzer
+from dependencies import dependency_index
+from ode_analyzer_test import mixed_delta_block
+
+
+class TestDependencyIndex(unittest.TestCase):
+
+    def test_transitive_parameters(self):
+        testant = dependency_index([("__cse0", "exp(-__h/tau_syn)"),
+                                    ("__cse1", "__cse0 * e / (C_m * mV)"),
+                                    ("__P__0_0", "__cse1 * tau_syn")])
+        self.assertEqual(["__cse0", "__cse1", "__P__0_0"], [entry["name"] for entry in testant])
+        self.assertEqual(["C_m", "__h", "tau_syn"], testant[2]["parameters"])
+        self.assertEqual(["__cse1"], testant[2]["temporaries"])
+
+    def test_topological_order(self):
+        testant = dependency_index([("__P__0_0", "__cse0 + __cse1"), ("__cse1", "__cse0 * Tau"),
+                                    ("__cse0", "exp(-__h/Tau)")])
+        self.assertEqual(["__cse0", "__cse1", "__P__0_0"], [entry["name"] for entry in testant])
+        self.assertEqual(["Tau", "__h"], testant[2]["parameters"])
+
+    def test_exact_solution(self):
+        output = json.loads(OdeAnalyzer.compute_solution(mixed_delta_block))
+        testant = dict((entry["name"], entry) for entry in output["dependencies"])
+        internals = [name for definition in output["common_subexpressions"] + output["propagator_elements"] +
+                     [output["ode_var_factor"], output["const_input"]] for name in definition.keys()]
+        self.assertEqual(sorted(internals), sorted(testant.keys()))
+        self.assertEqual(["C_m", "I_e"], testant["__const_input"]["parameters"])
+        self.assertFalse("C_m" in testant["__ode_var_factor"]["parameters"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+   This script finds the gating variables among the ODEs which are
+   integrated numerically, e.g. of a Hodgkin-Huxley neuron, and computes
+   their exponential Euler (Rush-Larsen) updates. A gating variable x
+   satisfies an ODE of the first order which is linear in x,
+
+       x' = a + b * x,
+
+   whose rate b depends on another state variable through an exponential
+   or a logarithm, e.g. on the membrane potential:
+   x' = alpha(V) * (1 - x) - beta(V) * x. If the other state
+   variables are constant during one step of the length h, the ODE is
+   solved exactly by
+
+       x(t+h) = x_inf + (x(t) - x_inf) * exp(b * h) with x_inf = -a/b.
+
+   The gating variables are updated by these instructions before the
+   remaining ODEs are integrated numerically. The numeric stepper treats
+   the gating variables as constants during the step, therefore, the fast
+   gating kinetics don't restrict its step size any more.
+
+   The update of a gating variable must not use another gating variable,
+   since all updates are computed from the state at the beginning of the
+   step. The gating variables are chosen greedily: ODEs whose coefficients
+   depend on fewer candidates come first. ODEs with a constant rate, e.g.
+   the adaptation current of an adaptive neuron, and ODEs whose rate is a
+   polynomial of the other state variables, e.g. the membrane potential of
+   a conductance based neuron, are left to the numeric stepper.
+
+   Common subexpressions of the updates are stored in the temporaries
+   `__gate0`, `__gate1`, ... which are computed in every step.
+
+   Example:
+   ========
+
+   variables, instructions = gating_updates(parsed_input)
+   # [Act_m, Act_h, Inact_n], ["__gate0 real = exp(-__h*(...))", "Act_m = ...", ...]
+"""
+
+from sympy import Function, Symbol, diff, exp
+
+from jacobian import PRINTABLE_FUNCTIONS
+from prop_matrix import PropagatorCalculator
+from zero_oracle import is_zero
+
+GATE_PREFIX = "__gate"
+
+h = Symbol("__h")
+
+
+def gating_candidates(parsed_input):
+    """
+    :param parsed_input: `ParsedInput` with ODEs
+    :return: List of (variable, a, b) tuples of the ODEs `x' = a + b * x` whose rate b depends on another state
+    variable through an exponential or a logarithm, in the order of the ODEs
+    """
+    states, _ = parsed_input.state_equations()
+    candidates = []
+    for variable, order, rhs in parsed_input.equations:
+        if order != 1:
+            continue
+        if any(not isinstance(function, PRINTABLE_FUNCTIONS) for function in rhs.atoms(Function)):
+            continue
+        rate = diff(rhs, variable)
+        if is_zero(rate) or rate.has(variable) or Symbol("t") in rate.free_symbols:
+            continue
+        others = [state for state in states if state != variable]
+        if not any(function.has(*others) for function in rate.atoms(*PRINTABLE_FUNCTIONS)):
+            continue
+        candidates.append((variable, rhs.xreplace({variable: 0}), rate))
+    return candidates
+
+
+def gating_variables(candidates):
+    """
+    :param candidates: List of (variable, a, b) tuples, see `gating_candidates`
+    :return: The candidates whose coefficients don't depend on another chosen candidate, in the order of the ODEs
+    """
+    def depends_on(candidate, variable):
+        return candidate[1].has(variable) or candidate[2].has(variable)
+
+    dependencies = [len([other for other in candidates if other is not candidate and depends_on(candidate, other[0])])
+                    for candidate in candidates]
+    chosen = []
+    # `sorted` is stable, i.e. candidates with the same number of dependencies keep the order of the ODEs
+    for index in sorted(range(len(candidates)), key=lambda i: dependencies[i]):
+        candidate = candidates[index]
+        if any(depends_on(candidate, candidates[other][0]) or depends_on(candidates[other], candidate[0])
+               for other in chosen):
+            continue
+        chosen.append(index)
+    return [candidates[index] for index in sorted(chosen)]
+
+
+def gating_updates(parsed_input):
+    """
+    :param parsed_input: `ParsedInput` with ODEs
+    :return: Tuple of the list of the gating variables and the list of their update instructions. The instructions
+    declare the temporaries with the common subexpressions first and assign the new values of the gating variables
+    afterwards.
+    """
+    gates = gating_variables(gating_candidates(parsed_input))
+    values = []
+    for variable, constant, rate in gates:
+        steady_state = -constant / rate
+        values.append(steady_state + (variable - steady_state) * exp(rate * h))
+
+    subexpressions, values = PropagatorCalculator.eliminate_common_subexpressions(values, GATE_PREFIX)
+    instructions = ["{} real = {}".format(name, definition)
+                    for subexpression in subexpressions for name, definition in subexpression.items()]
+    instructions += ["{} = {}".format(variable, value) for (variable, _, _), value in zip(gates, values)]
+    return [variable for variable, _, _ in gates], instructions
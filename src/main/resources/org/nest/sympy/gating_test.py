@@ -0,0 +1,83 @@
+import json
+import math
+import unittest
+
+from sympy import Symbol
+from sympy.parsing.sympy_parser import parse_expr
+
+from OdeAnalyzer import OdeAnalyzer, SolverInput
+from gating import gating_updates
+from parsed_input import ParsedInput
+from stiffness_test import gated_neuron
+
+hh_block = json.dumps({
+    "shapes": ["I_syn_ex = (e/tau_syn_ex) * t * exp(-t/tau_syn_ex)"],
+    "odes": ["V_m' = (-(g_Na * Act_m**3 * Act_h * (V_m - E_Na) + g_K * Inact_n**4 * (V_m - E_K) + g_L * (V_m - E_L))"
+             " + I_syn_ex + I_e) / C_m",
+             "Inact_n' = (alpha_n * (1 - Inact_n) - beta_n * Inact_n) / ms",
+             "Act_m' = (alpha_m * (1 - Act_m) - beta_m * Act_m) / ms",
+             "Act_h' = (alpha_h * (1 - Act_h) - beta_h * Act_h) / ms"],
+    "functions": ["alpha_n = (0.01 * (V_m / mV + 55.)) / (1. - exp(-(V_m / mV + 55.) / 10.))",
+                  "beta_n = 0.125 * exp(-(V_m / mV + 65.) / 80.)",
+                  "alpha_m = (0.1 * (V_m / mV + 40.)) / (1. - exp(-(V_m / mV + 40.) / 10.))",
+                  "beta_m = 4. * exp(-(V_m / mV + 65.) / 18.)",
+                  "alpha_h = 0.07 * exp(-(V_m / mV + 65.) / 20.)",
+                  "beta_h = 1. / (1. + exp(-(V_m / mV + 35.) / 10.))"],
+    "parameters": ["g_Na = 12000.0 * nS", "g_K = 3600.0 * nS", "g_L = 30 * nS", "C_m = 100.0 * pF",
+                   "E_Na = 50 * mV", "E_K = -77 * mV", "E_L = -54.402 * mV", "tau_syn_ex = 0.2 * ms", "I_e = 0 * pA",
+                   "V_m = -65. * mV", "Inact_n = 0.3", "Act_m = 0.05", "Act_h = 0.6"]})
+
+
+def execute(instructions, environment):
+    """
+    Executes the update instructions in the environment, which maps the names of the symbols onto numbers.
+    """
+    for instruction in instructions:
+        variable, expression = instruction.split(" = ", 1)
+        environment[variable.replace(" real", "")] = float(parse_expr(expression).subs(
+            dict((Symbol(name), value) for name, value in environment.items())))
+
+
+class TestGating(unittest.TestCase):
+
+    def test_hodgkin_huxley(self):
+        variables, instructions = gating_updates(ParsedInput(SolverInput(hh_block)))
+        # the membrane potential depends polynomially on the gates and is integrated numerically
+        self.assertEqual(["Inact_n", "Act_m", "Act_h"], [str(variable) for variable in variables])
+        self.assertEqual(["Inact_n", "Act_m", "Act_h"],
+                         [instruction.split(" = ")[0] for instruction in instructions[-3:]])
+        self.assertTrue(all(instruction.startswith("__gate") for instruction in instructions[:-3]))
+
+    def test_exact_for_constant_voltage(self):
+        _, instructions = gating_updates(ParsedInput(SolverInput(hh_block)))
+        environment = {"V_m": -60., "mV": 1., "ms": 1., "__h": 0.1, "Inact_n": 0.3, "Act_m": 0.05, "Act_h": 0.6}
+        execute(instructions, environment)
+
+        alpha_m = 0.1 * (-60. + 40.) / (1. - math.exp(-(-60. + 40.) / 10.))
+        beta_m = 4. * math.exp(-(-60. + 65.) / 18.)
+        m_inf = alpha_m / (alpha_m + beta_m)
+        self.assertAlmostEqual(m_inf + (0.05 - m_inf) * math.exp(-(alpha_m + beta_m) * 0.1), environment["Act_m"],
+                               places=12)
+
+        # stable for steps which are much longer than the time constants of the gates
+        environment.update({"__h": 1000., "Inact_n": 0.3, "Act_m": 0.05, "Act_h": 0.6})
+        execute(instructions, environment)
+        self.assertAlmostEqual(m_inf, environment["Act_m"], places=12)
+
+    def test_numeric_solution(self):
+        output = json.loads(OdeAnalyzer.compute_solution(hh_block))
+        self.assertEqual("numeric", output["solver"])
+        self.assertEqual(["Inact_n", "Act_m", "Act_h"], output["gating_variables"])
+        # the gating variables are constants of the remaining ODEs
+        self.assertEqual({"V_m", "I_syn_ex", "I_syn_ex__1"},
+                         set(entry["row"] for entry in output["jacobian"]) |
+                         set(entry["column"] for entry in output["jacobian"]))
+
+    def test_no_gating_variables(self):
+        # the rate of the gate is constant, the rate of the membrane potential is a polynomial of the states
+        output = json.loads(OdeAnalyzer.compute_solution(gated_neuron(5)))
+        self.assertEqual([], output["gating_variables"])
+        self.assertEqual([], output["gating_update_instructions"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+   This script computes the symbolic Jacobian of the ODEs which are
+   integrated numerically. The state vector consists of the ODE variables
+   (an ODE of order n contributes the variable and its first n-1
+   derivatives) and of the state variables of the shapes which are
+   integrated together with the ODEs. Only the entries which are not
+   identically zero are emitted, i.e. the list of entries is the sparsity
+   pattern of the Jacobian. Common subexpressions of the entries are
+   stored in the temporaries `__jac0`, `__jac1`, ...
+
+   The Jacobian is passed to the GSL steppers through
+   `gsl_odeiv_system.jacobian`, which enables the implicit stepper `bsimp`.
+   The generated Jacobian function sets df/dt to zero. Therefore, no
+   Jacobian is emitted if the ODEs depend explicitly on `t` or if an entry
+   contains a function which cannot be printed in NESTML, e.g. the
+   derivative of `max`.
+
+   Example:
+   ========
+
+   subexpressions, entries = state_jacobian(parsed_input, shape_functions)
+   # [{"__jac0": "1/C_m"}], [{"row": "V_m", "column": "V_m", "value": "-__jac0*g_L"}, ...]
+"""
+
+from sympy import E, Function, Matrix, Symbol, exp, log
+from sympy.parsing.sympy_parser import parse_expr
+
+from parsed_input import nestml_name
+from prop_matrix import PropagatorCalculator
+from zero_oracle import is_zero
+
+JACOBIAN_PREFIX = "__jac"
+
+# functions which are printed in NESTML and C++
+PRINTABLE_FUNCTIONS = (exp, log)
+
+
+def state_system(parsed_input, shapes):
+    """
+    :param parsed_input: `ParsedInput` with ODEs
+    :param shapes: List of `ShapeFunction` objects
+    :return: Tuple of the list of state symbols and the list of their derivatives. The shape state variables follow the
+    ODE variables.
+    """
+    states, derivatives = parsed_input.state_equations()
+    for shape in shapes:
+        for ode in shape.nestml_ode_form:
+            for variable, rhs in ode.items():
+                states.append(Symbol(variable))
+                derivatives.append(parse_expr(rhs))
+    return states, derivatives
+
+
+def state_jacobian(parsed_input, shapes):
+    """
+    :param parsed_input: `ParsedInput` with ODEs
+    :param shapes: List of `ShapeFunction` objects
+    :return: Tuple of the list of {temporary: definition} in the order of the definitions and the list of the non-zero
+    entries {"row": state, "column": state, "value": expression} with NESTML names, or None if the Jacobian cannot be
+    printed
+    """
+    states, derivatives = state_system(parsed_input, shapes)
+    if not states or any(Symbol("t") in derivative.free_symbols for derivative in derivatives):
+        return None
+
+    # derivatives of the ODE variables are printed as in NESTML, e.g. `V_m'`
+    names = dict((state, Symbol(nestml_name(str(state)))) for state in states)
+    names[E] = Symbol("e")
+    jacobian = Matrix(derivatives).jacobian(states)
+    positions = []
+    values = []
+    for row in range(len(states)):
+        for column in range(len(states)):
+            if not is_zero(jacobian[row, column]):
+                positions.append((row, column))
+                values.append(jacobian[row, column].xreplace(names))
+
+    if any(not isinstance(function, PRINTABLE_FUNCTIONS) for value in values for function in value.atoms(Function)):
+        return None
+
+    subexpressions, values = PropagatorCalculator.eliminate_common_subexpressions(values, JACOBIAN_PREFIX)
+    entries = [{"row": str(names[states[row]]), "column": str(names[states[column]]), "value": str(value)}
+               for (row, column), value in zip(positions, values)]
+    return subexpressions, entries
@@ -0,0 +1,49 @@
+import json
+import unittest
+
+from sympy import Symbol
+from sympy.parsing.sympy_parser import parse_expr
+
+from OdeAnalyzer import OdeAnalyzer
+from stiffness_test import gated_neuron
+
+
+def entries(output):
+    """
+    :return: Dictionary which maps (row, column) onto the entry of the Jacobian in which the temporaries are inlined
+    """
+    temporaries = {}
+    for definition in output["jacobian_subexpressions"]:
+        for name, expression in definition.items():
+            temporaries[Symbol(name)] = parse_expr(expression).xreplace(temporaries)
+    return dict(((entry["row"], entry["column"]), parse_expr(entry["value"]).xreplace(temporaries))
+                for entry in output["jacobian"])
+
+
+class TestJacobian(unittest.TestCase):
+
+    def test_sparsity_pattern(self):
+        testant = entries(json.loads(OdeAnalyzer.compute_solution(gated_neuron(5))))
+        self.assertEqual({("V_m", "V_m"), ("V_m", "n"), ("V_m", "g_ex"), ("n", "V_m"), ("n", "n"), ("g_ex", "g_ex")},
+                         set(testant.keys()))
+        self.assertEqual(parse_expr("(E_ex - V_m)/C_m"), testant[("V_m", "g_ex")])
+        self.assertEqual(parse_expr("exp(-V_m/mV)/(mV*tau_gate*(exp(-V_m/mV) + 1)**2)"), testant[("n", "V_m")])
+
+    def test_higher_order(self):
+        block = json.dumps({"shapes": ["I_a = e / tau * t * exp(-t / tau)"],
+                            "odes": ["x'' = -x' / tau + x**2 / tau**2 + I_a"]})
+        output = json.loads(OdeAnalyzer.compute_solution(block))
+        self.assertEqual("numeric", output["solver"])
+        testant = entries(output)
+        self.assertEqual(1, testant[("x", "x'")])
+        self.assertEqual(parse_expr("2 * x / tau**2"), testant[("x'", "x")])
+        self.assertEqual(1, testant[("I_a", "I_a__1")])
+        self.assertFalse(("x", "x") in testant)
+
+    def test_time_dependent_odes(self):
+        block = json.dumps({"shapes": ["g_ex = exp(-t/tau_syn)"],
+                            "odes": ["V_m' = -g_ex * V_m**2 + sin(t)"]})
+        self.assertIsNone(json.loads(OdeAnalyzer.compute_solution(block))["jacobian"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+   This script provides the matrix exponential `exp(A*h)` for matrices
+   whose eigenvalues are known, e.g. the lower triangular matrices and
+   the companion matrices of the propagator systems. Instead of the
+   generic matrix exponential followed by `simplify`, the exponential is
+   computed as the interpolation polynomial of `exp(h*x)` at the
+   eigenvalues (Newton form):
+
+   exp(A*h) = sum_k f[z_0, ..., z_k] (A - z_0) ... (A - z_(k-1))
+
+   where `f[z_0, ..., z_k]` are the divided differences of `exp(h*x)`.
+   Repeated eigenvalues (Jordan blocks, e.g. of the alpha shape) are
+   handled by confluent divided differences, i.e. by derivatives of
+   `exp(h*x)`.
+
+   Every entry of the result has a compact canonical form: a sum of the
+   exponentials `exp(h*z)` of the distinct eigenvalues `z` with factored
+   coefficients.
+
+   Example:
+   ========
+
+   A = Matrix([[-1/tau, 0], [1, -1/tau]])
+   P = exp_matrix(A, [-1/tau, -1/tau], h)
+   # Matrix([[exp(-h/tau), 0], [h*exp(-h/tau), exp(-h/tau)]])
+"""
+
+from sympy import Add, Matrix, eye, exp, factor, factorial, zeros
+
+from zero_oracle import is_zero
+
+
+def group_eigenvalues(eigenvalues):
+    """
+    :param eigenvalues: List of eigenvalues, every eigenvalue is repeated according to its multiplicity
+    :return: List of (eigenvalue, multiplicity) tuples of the distinct eigenvalues
+    """
+    groups = []
+    for eigenvalue in eigenvalues:
+        for i, (group_eigenvalue, multiplicity) in enumerate(groups):
+            if is_zero(group_eigenvalue - eigenvalue):
+                groups[i] = (group_eigenvalue, multiplicity + 1)
+                break
+        else:
+            groups.append((eigenvalue, 1))
+    return groups
+
+
+def triangular_eigenvalues(A):
+    """
+    :return: The diagonal of A if A is triangular, otherwise None
+    """
+    if A.is_lower or A.is_upper:
+        return [A[i, i] for i in range(A.rows)]
+    return None
+
+
+def exp_matrix(A, eigenvalues, h):
+    """
+    Computes exp(A*h).
+    :param A: Square matrix
+    :param eigenvalues: All eigenvalues of A, every eigenvalue is repeated according to its multiplicity
+    :param h: Symbol of the time step
+    :return: The matrix exp(A*h) in compact form
+    """
+    # equal eigenvalues are adjacent and represented by the same object, which makes confluent divided differences
+    # easy to detect
+    nodes = []
+    for eigenvalue, multiplicity in group_eigenvalues(eigenvalues):
+        nodes += [eigenvalue] * multiplicity
+
+    if len(nodes) != A.rows:
+        raise Exception("The number of eigenvalues ({}) differs from the dimension of the matrix ({})".format(
+            len(nodes), A.rows))
+
+    distinct_nodes = []
+    for node in nodes:
+        if node not in distinct_nodes:
+            distinct_nodes.append(node)
+
+    # the coefficient of exp(h*z) of every entry is accumulated separately, so that the result doesn't contain
+    # quotients of exponentials
+    coefficients = dict((node, zeros(A.rows)) for node in distinct_nodes)
+    newton_basis = eye(A.rows)
+    for k, divided_difference in enumerate(_divided_differences(nodes, h)):
+        for node, factor_of_exponential in divided_difference.items():
+            coefficients[node] += factor_of_exponential * newton_basis
+        if k < len(nodes) - 1:
+            newton_basis = newton_basis * (A - nodes[k] * eye(A.rows))
+
+    return Matrix(A.rows, A.cols, lambda i, j: Add(*[factor(coefficients[node][i, j]) * exp(h * node)
+                                                     for node in distinct_nodes]))
+
+
+def _divided_differences(nodes, h):
+    """
+    :return: The divided differences f[z_0], f[z_0, z_1], ..., f[z_0, ..., z_(n-1)] of f(x) = exp(h*x). Every
+    divided difference is a dictionary which maps every node z onto the factor of exp(h*z).
+    """
+    n = len(nodes)
+    # table[i] contains f[z_i, ..., z_(i+k)] after the k-th pass
+    table = [{node: 1} for node in nodes]
+    result = [table[0]]
+    for k in range(1, n):
+        for i in range(n - k):
+            if nodes[i] == nodes[i + k]:
+                # all nodes in between are equal: f[z, ..., z] = f^(k)(z) / k!
+                table[i] = {nodes[i]: h ** k / factorial(k)}
+            else:
+                difference = dict(table[i + 1])
+                for node, factor_of_exponential in table[i].items():
+                    difference[node] = difference.get(node, 0) - factor_of_exponential
+                denominator = nodes[i + k] - nodes[i]
+                table[i] = dict((node, factor_of_exponential / denominator)
+                                for node, factor_of_exponential in difference.items())
+        result.append(table[0])
+    return result
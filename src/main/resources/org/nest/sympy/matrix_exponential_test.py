@@ -0,0 +1,49 @@
+import unittest
+
+from sympy import Float, Matrix, exp, eye, symbols
+
+from matrix_exponential import exp_matrix, group_eigenvalues, triangular_eigenvalues
+
+h, tau, tau_m, C_m = symbols("h tau tau_m C_m")
+values = {h: Float("0.1"), tau: Float("2.3"), tau_m: Float("10.7"), C_m: Float("250")}
+
+
+class TestMatrixExponential(unittest.TestCase):
+
+    def assertMatchesNumericExponential(self, A, P):
+        # the Taylor series of exp(A*h) converges quickly for small time steps
+        Ah = A.subs(values) * values[h]
+        expected = eye(A.rows)
+        term = eye(A.rows)
+        for k in range(1, 30):
+            term = term * Ah / k
+            expected += term
+
+        for i in range(A.rows):
+            for j in range(A.cols):
+                self.assertAlmostEqual(float(expected[i, j]), float(P[i, j].subs(values)), places=12)
+
+    def test_distinct_eigenvalues(self):
+        A = Matrix([[-1/tau, 0], [1/C_m, -1/tau_m]])
+        testant = exp_matrix(A, triangular_eigenvalues(A), h)
+        self.assertEqual(exp(-h/tau), testant[0, 0])
+        self.assertMatchesNumericExponential(A, testant)
+
+    def test_jordan_block(self):
+        A = Matrix([[-1/tau, 0, 0], [1, -1/tau, 0], [0, 1/C_m, -1/tau_m]])
+        testant = exp_matrix(A, triangular_eigenvalues(A), h)
+        self.assertEqual(h * exp(-h/tau), testant[1, 0])
+        self.assertMatchesNumericExponential(A, testant)
+
+    def test_companion_matrix(self):
+        # t**2 * exp(-t/tau) satisfies y''' = -3/tau y'' - 3/tau**2 y' - 1/tau**3 y
+        A = Matrix([[-3/tau, -3/tau**2, -1/tau**3, 0], [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1/C_m, -1/tau_m]])
+        testant = exp_matrix(A, [-1/tau, -1/tau, -1/tau, -1/tau_m], h)
+        self.assertMatchesNumericExponential(A, testant)
+
+    def test_group_eigenvalues(self):
+        self.assertEqual([(-1/tau, 2), (-1/tau_m, 1)], group_eigenvalues([-1/tau, -tau/tau**2, -1/tau_m]))
+        self.assertIsNone(triangular_eigenvalues(Matrix([[0, 1], [1, 0]])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,13 @@
 import unittest
 
 import json
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from sympy.parsing.sympy_parser import parse_expr
+
 from prop_matrix import PropagatorCalculator
 from shapes import ShapeFunction
 from OdeAnalyzer import OdeAnalyzer
@@ -41,6 +48,21 @@ delta_shape = '{' \
               '"ode" : "V_abs\' = (-1)/tau_m*V_abs+1/C_m*(G+I_e+currents)"'\
               '}'
 
+multisynapse_block = '{' \
+                     '"functions" : [ "I_syn = I_1 + I_2 + I_3 + I_e" ],' \
+                     '"shapes" : [ "I_1 = exp(-t/tau_syn)", "I_2 = exp(-t/tau_syn)", "I_3 = exp(-t/tau_syn_3)" ],' \
+                     '"ode" : "V_m\' = -V_m/tau_m + I_syn/C_m"' \
+                     '}'
+
+mixed_delta_block = json.dumps({
+    "shapes": ["I_ex = delta(t, tau)", "I_in = delta(t, tau)", "I_a = exp(-t/tau_syn)"],
+    "ode": "V_m' = -V_m/Tau + (I_ex - 2 * I_in + I_a + I_e)/C_m"})
+
+shape_ode_block = json.dumps({
+    "shapes": ["I_shape'' = -I_shape/tau_syn**2 - 2*I_shape'/tau_syn"],
+    "initial_values": ["I_shape = 0", "I_shape' = pA * e / tau_syn"],
+    "ode": "V_abs' = -V_abs/Tau + (I_shape + I_e + currents)/C_m"})
+
 
 class TestSolutionComputation(unittest.TestCase):
 
@@ -56,15 +78,27 @@ class TestSolutionComputation(unittest.TestCase):
         shape_exc = ShapeFunction("I_ex", "(e/tau_syn_ex) * t * exp(-t/tau_syn_ex)")
         shapes = [shape_inh, shape_exc]
 
-        ode_var = "V_m"
-        ode_rhs = "-V_m/Tau + (I_in + I_ex + I_e) / C_m"
+        ode_var = parse_expr("V_m")
+        ode_rhs = parse_expr("-V_m/Tau + (I_in + I_ex + I_e) / C_m")
 
         calculator = PropagatorCalculator()
-        prop_matrices, const_input, step_const = calculator.ode_to_prop_matrices(shapes, ode_var, ode_rhs, [], [])
-        propagator_elements, ode_var_factor, const_input, update_instructions \
+        prop_matrices, const_input, step_const = calculator.ode_to_prop_matrices(shapes, ode_var, ode_rhs)
+        propagator_elements, ode_var_factor, const_input, update_instructions, common_subexpressions \
             = calculator.prop_matrix_to_prop_step(prop_matrices, const_input, step_const, shapes, ode_var)
         self.assertTrue(len(propagator_elements) > 0)
 
+    def test_common_subexpressions(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(psc_ode_block))
+        temporaries = [list(temporary.keys())[0] for temporary in testant["common_subexpressions"]]
+        self.assertTrue(len(temporaries) > 0)
+        # every temporary is defined before it is used
+        for i, temporary in enumerate(testant["common_subexpressions"]):
+            self.assertFalse(any(name in list(temporary.values())[0] for name in temporaries[i:]))
+        # the exponentials of the time constants are computed once
+        emitted = [list(element.values())[0] for element in testant["propagator_elements"]] + \
+                  [list(temporary.values())[0] for temporary in testant["common_subexpressions"]]
+        self.assertEqual(1, sum(value.count("exp(-__h/tau_syn_in)") for value in emitted))
+
     def test_analyzer(self):
         testant = OdeAnalyzer.compute_solution(psc_ode_block2)
         self.assertIsNotNone(testant)
@@ -99,5 +133,90 @@ class TestSolutionComputation(unittest.TestCase):
         self.assertIsNotNone(testant)
         print testant
 
+    def test_mixed_delta_shapes(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(mixed_delta_block))
+        self.assertEqual("exact", testant["solver"])
+        self.assertEqual(["I_a"], testant["shape_state_variables"])
+        # a spike increments the ODE variable by its weight times the factor of the shape in the ODE
+        self.assertEqual({"I_ex": parse_expr("1/C_m"), "I_in": parse_expr("-2/C_m")},
+                         dict((shape, parse_expr(factor)) for definition in testant["delta_shapes"]
+                              for shape, factor in definition.items()))
+        self.assertFalse(any("I_ex" in instruction or "I_in" in instruction
+                             for instruction in testant["ode_var_update_instructions"]))
+
+    def test_delta_shapes_only(self):
+        block = json.dumps({"shapes": ["I_ex = delta(t, tau)", "I_in = delta(t, tau)"],
+                            "ode": "V_m' = -V_m/Tau + (I_ex - I_in)/C_m"})
+        testant = json.loads(OdeAnalyzer.compute_solution(block))
+        self.assertEqual("exact", testant["solver"])
+        self.assertEqual([], testant["propagator_elements"])
+        self.assertEqual(2, len(testant["delta_shapes"]))
+
+    def test_delta_shapes_in_system(self):
+        block = json.dumps({"shapes": ["I_ex = delta(t, tau)"],
+                            "odes": ["V_m' = -V_m/Tau + (I_ex + w)/C_m", "w' = -w/tau_w"]})
+        self.assertIsNone(OdeAnalyzer.compute_solution(block))
+        block = json.dumps({"shapes": ["I_ex = delta(t, tau)", "I_a = exp(-t/tau_syn)"],
+                            "odes": ["V_m' = -V_m/Tau + (I_ex + I_a + w)/C_m", "w' = -w/tau_w"]})
+        self.assertIsNone(OdeAnalyzer.compute_solution(block))
+
+    def test_state_dependent_delta_shapes(self):
+        block = json.dumps({"shapes": ["I_ex = delta(t, tau)", "I_in = delta(t, tau)"],
+                            "ode": "V_m' = -V_m/Tau + V_m * (I_ex - I_in)/C_m"})
+        self.assertIsNone(OdeAnalyzer.compute_solution(block))
+
+    def test_shape_odes(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(shape_ode_block))
+        self.assertEqual("exact", testant["solver"])
+        self.assertEqual(["I_shape__1", "I_shape"], testant["shape_state_variables"])
+        self.assertEqual([{"I_shape__1": "e*pA/tau_syn"}, {"I_shape": "0"}], testant["initial_values"])
+        # the eigenvalues of the shape ODE are known, therefore, the propagator is computed in closed form
+        self.assertTrue(any("exp(-__h/tau_syn)" in list(temporary.values())[0]
+                            for temporary in testant["common_subexpressions"]))
+
+    def test_nonlinear_shape_odes(self):
+        # conductance based synapse
+        block = json.dumps({"shapes": ["g_ex' = -g_ex/tau_syn"], "initial_values": ["g_ex = nS"],
+                            "ode": "V_m' = -V_m/Tau - g_ex * (V_m - E_ex)/C_m"})
+        self.assertIsNone(OdeAnalyzer.compute_solution(block))
+        # nonlinear shape
+        block = json.dumps({"shapes": ["g_ex' = -g_ex**2/tau_syn"], "initial_values": ["g_ex = nS"],
+                            "ode": "V_m' = -V_m/Tau + g_ex/C_m"})
+        self.assertIsNone(OdeAnalyzer.compute_solution(block))
+
+    def test_merge_equivalent_shapes(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(multisynapse_block))
+        self.assertEqual(["I_1", "I_3"], testant["shape_state_variables"])
+        self.assertEqual([{"I_2": "I_1"}], testant["merged_shapes"])
+        self.assertEqual([{"I_2": "1"}], testant["merged_shape_initial_values"])
+        self.assertFalse(any("I_2" in instruction for instruction in testant["ode_var_update_instructions"]))
+        self.assertEqual({"__const_input": "I_e/C_m"}, testant["const_input"])
+
+    def test_referenced_shapes_are_not_merged(self):
+        # the merged state holds the weighted sum of both shapes, i.e. neither shape can be read from it
+        for referenced_shape in ["I_1", "I_2"]:
+            block = dict(json.loads(multisynapse_block), referenced_shapes=[referenced_shape])
+            testant = json.loads(OdeAnalyzer.compute_solution(json.dumps(block)))
+            self.assertEqual(["I_1", "I_2", "I_3"], testant["shape_state_variables"])
+            self.assertEqual([], testant["merged_shapes"])
+
+    def test_server(self):
+        requests = StringIO(json.dumps(json.loads(psc_ode_block)) + "\n" + json.dumps(json.loads(delta_shape)) + "\n")
+        replies = StringIO()
+        OdeAnalyzer.serve(requests, replies)
+
+        testant = [json.loads(reply) for reply in replies.getvalue().splitlines()]
+        self.assertEqual(2, len(testant))
+        self.assertEqual("exact", testant[0]["solver"])
+        self.assertEqual("delta", testant[1]["solver"])
+
+    def test_server_reports_failures(self):
+        requests = StringIO("{ not a solver input }\n")
+        replies = StringIO()
+        OdeAnalyzer.serve(requests, replies)
+
+        testant = json.loads(replies.getvalue())
+        self.assertEqual("failed", testant["status"])
+
 if __name__ == '__main__':
     unittest.main()
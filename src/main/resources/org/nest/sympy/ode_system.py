@@ -0,0 +1,174 @@
+"""
+   This script provides exact propagators for systems of linear constant
+   coefficient ODEs which are driven by shapes, e.g. an adaptive neuron
+   with the membrane potential and an adaptation current or a membrane
+   equation of a higher order. An ODE of order n contributes the variable
+   and its first n-1 derivatives to the state vector x. The system
+
+       x' = A x + sum over all shapes of c_s * shape + b
+
+   is linear iff A, the shape factors c_s and the constant input b
+   depend neither on the state nor on the shapes nor on `t`. One step of
+   the length h propagates the state by
+
+       x(t+h) = P x(t) + sum over all shapes of P_s y_s(t) + Q b
+
+   with P = exp(A*h), Q = integral of exp(A*s) from 0 to h, and the shape
+   state vector y_s. P and Q are the blocks of exp(M*h) of the augmented
+   matrix M = [[A, I], [0, 0]]; P_s is a block of the propagator of the
+   shape and the system together. The matrix exponentials are computed
+   in closed form if the eigenvalues of A are known, i.e. if A is
+   triangular or its characteristic polynomial can be solved.
+
+   Example:
+   ========
+
+   system = LinearOdeSystem.from_parsed_input(parsed_input)
+   if system is not None:  # None if the system isn't linear
+       propagator_elements, update_instructions = system.propagation_step(shape_functions)
+"""
+
+from sympy import Dummy, ImmutableMatrix, Matrix, Symbol, Tuple, diff, eye, roots, zeros
+
+import solver_profile
+from budget import simplify_within_budget
+from matrix_exponential import triangular_eigenvalues
+from parsed_input import nestml_name
+from prop_matrix import PropagatorCalculator, propagators
+from zero_oracle import is_zero
+
+
+class LinearOdeSystem(object):
+    """
+    The system x' = A x + sum over all shapes of c_s * shape + b with the state vector `states`, the matrix `A`, the
+    shape factors `shape_factors` (a column c_s for every shape symbol) and the constant input `const_inputs`.
+    """
+
+    def __init__(self, states, A, shape_factors, const_inputs):
+        self.states = states
+        self.A = A
+        self.shape_factors = shape_factors
+        self.const_inputs = const_inputs
+
+    @staticmethod
+    def from_parsed_input(parsed_input):
+        """
+        :param parsed_input: `ParsedInput` with ODEs
+        :return: `LinearOdeSystem` or None if the ODEs aren't linear with constant coefficients
+        """
+        with solver_profile.stage("linearity check"):
+            states, derivatives = parsed_input.state_equations()
+            shapes = parsed_input.shape_symbols()
+            variables = states + shapes
+            for derivative in derivatives:
+                for i, u in enumerate(variables):
+                    if not is_zero(diff(derivative, u, Symbol("t"))):
+                        return None
+                    if any(not is_zero(diff(derivative, u, w)) for w in variables[i:]):
+                        return None
+
+            # the coefficients are constant, therefore, they are evaluated in the zero state
+            zero_state = dict((u, 0) for u in variables)
+            A = Matrix(len(states), len(states), lambda k, l: diff(derivatives[k], states[l]).xreplace(zero_state))
+            shape_factors = dict((shape, Matrix([diff(derivative, shape).xreplace(zero_state)
+                                                 for derivative in derivatives])) for shape in shapes)
+            const_inputs = Matrix([derivative.xreplace(zero_state) for derivative in derivatives])
+            if any(not is_zero(diff(const_input, Symbol("t"))) for const_input in const_inputs):
+                return None
+
+            return LinearOdeSystem(states, A, shape_factors, const_inputs)
+
+    def eigenvalues(self):
+        """
+        :return: The list of eigenvalues of A (repeated according to their multiplicity) or None if they are unknown
+        """
+        eigenvalues = triangular_eigenvalues(self.A)
+        if eigenvalues is None:
+            x = Dummy("x")
+            found = roots(self.A.charpoly(x).as_expr(), x)
+            if sum(found.values()) != self.A.rows:
+                return None
+            eigenvalues = [eigenvalue for eigenvalue, multiplicity in found.items() for _ in range(multiplicity)]
+        return eigenvalues
+
+    def propagation_step(self, shapes):
+        """
+        Computes the propagators of the system and records the updates of the shape state variables in the shapes.
+        :param shapes: List of `ShapeFunction` or `ShapeODE` objects
+        :return: Tuple of the list of (propagator name, value) tuples and the list of update instructions of the state
+        variables. The propagators are named `__P__k_l` and `__Q__k_l` for P and Q, and `__P_<shape>__i_j` for the
+        propagator of the shape and the system.
+        """
+        n = len(self.states)
+        eigenvalues = self.eigenvalues()
+
+        M = zeros(2 * n)
+        M[:n, :n] = self.A
+        M[:n, n:] = eye(n)
+        with solver_profile.stage("exp(A*h) ODE system") as record:
+            PQ = propagators.lookup(
+                Tuple(ImmutableMatrix(M), Tuple(*(eigenvalues + [0] * n if eigenvalues is not None else []))),
+                PropagatorCalculator.propagator)
+            record.set_size(PQ)
+
+        with solver_profile.stage("simplification") as record:
+            const_inputs = [simplify_within_budget(const_input) for const_input in self.const_inputs]
+            record.set_size(const_inputs)
+
+        propagator_elements = []
+        # the state variables are updated simultaneously from the values of the previous step
+        next_states = zeros(n, 1)
+        for k in range(n):
+            for l in range(n):
+                if not is_zero(PQ[k, l]):
+                    next_states[k] += self.propagator(propagator_elements, "__P__{}_{}".format(k, l), PQ[k, l]) * \
+                                      Symbol(nestml_name(str(self.states[l])))
+                if not is_zero(const_inputs[l]) and not is_zero(PQ[k, n + l]):
+                    next_states[k] += self.propagator(propagator_elements, "__Q__{}_{}".format(k, l), PQ[k, n + l]) * \
+                                      Symbol("__const_input__{}".format(l))
+
+        for shape in shapes:
+            order = shape.order
+            # the shape block of the system of the shape without the ODE variable
+            shape_matrix, shape_eigenvalues = PropagatorCalculator.shape_system(shape, 0, 0)
+
+            S = zeros(order + n)
+            S[:order, :order] = shape_matrix[:order, :order]
+            S[order:, order - 1] = self.shape_factors[shape.name]
+            S[order:, order:] = self.A
+            if shape_eigenvalues is not None and eigenvalues is not None:
+                system_eigenvalues = shape_eigenvalues[:order] + eigenvalues
+            else:
+                system_eigenvalues = []
+            with solver_profile.stage("exp(A*h) " + str(shape.name)) as record:
+                p = propagators.lookup(Tuple(ImmutableMatrix(S), Tuple(*system_eigenvalues)),
+                                       PropagatorCalculator.propagator)
+                record.set_size(p)
+
+            shape_state_vector = Matrix([Symbol(variable) for variable in shape.additional_shape_state_variables()])
+            P = zeros(order + n, order)
+            for i in range(order + n):
+                for j in range(order):
+                    if not is_zero(p[i, j]):
+                        P[i, j] = self.propagator(
+                            propagator_elements, "__P_{}__{}_{}".format(shape.name, i, j), p[i, j])
+
+            shape_state_updates = P[:order, :] * shape_state_vector
+            for idx in range(order):
+                shape.add_update_to_shape_state_variable(shape_state_vector[idx], shape_state_updates[idx])
+            next_states += P[order:, :] * shape_state_vector
+
+        update_instructions = ["__const_input__{} real = {}".format(l, const_inputs[l])
+                               for l in range(n) if not is_zero(const_inputs[l])]
+        update_instructions += ["__next__{} real = {}".format(k, next_states[k]) for k in range(n)]
+        update_instructions += ["{} = __next__{}".format(nestml_name(str(self.states[k])), k) for k in range(n)]
+        return propagator_elements, update_instructions
+
+    @staticmethod
+    def propagator(propagator_elements, name, value):
+        """
+        Appends the propagator element to the list.
+        :return: Symbol of the propagator element
+        """
+        propagator_elements.append((name, value))
+        return Symbol(name)
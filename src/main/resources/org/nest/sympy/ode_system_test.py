@@ -0,0 +1,80 @@
+import json
+import unittest
+
+from sympy import Float, Symbol, exp
+from sympy.parsing.sympy_parser import parse_expr
+
+from OdeAnalyzer import OdeAnalyzer, SolverInput
+from ode_system import LinearOdeSystem
+from parsed_input import ParsedInput
+
+second_order_block = json.dumps({
+    "shapes": ["I_shape = exp(-t/tau_syn)"],
+    "odes": ["x'' = -2/tau * x' - x/tau**2 + I_shape + I_e"]})
+
+coupled_block = json.dumps({
+    "shapes": ["I_shape = exp(-t/tau_syn)"],
+    "functions": ["I_syn = I_shape + I_e"],
+    "odes": ["V_m' = -V_m/tau_m + I_syn/C_m", "w' = (a*V_m - w)/tau_w"]})
+
+values = {"tau": 3.0, "tau_syn": 2.0, "I_e": 0.5, "__h": 0.1}
+
+
+def step(output, state):
+    """
+    Executes the update instructions of the exact solution once.
+    :param state: Dictionary with the values of all state variables
+    """
+    environment = dict((Symbol(name), value) for name, value in values.items())
+    for definition in output["common_subexpressions"] + output["propagator_elements"]:
+        for name, expression in definition.items():
+            environment[Symbol(name)] = parse_expr(expression).xreplace(environment)
+    variables = dict((Symbol(name.replace("'", "__d")), value) for name, value in state.items())
+    variables.update(environment)
+    for instruction in output["ode_var_update_instructions"]:
+        name, expression = instruction.replace(" real", "").split("=")
+        variables[Symbol(name.strip().replace("'", "__d"))] = \
+            Float(parse_expr(expression.replace("'", "__d")).xreplace(variables))
+    return dict((name, variables[Symbol(name.replace("'", "__d"))]) for name in state)
+
+
+class TestLinearOdeSystem(unittest.TestCase):
+
+    def test_second_order_ode(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(second_order_block))
+        self.assertEqual("exact", testant["solver"])
+        self.assertEqual(["x = __next__0", "x' = __next__1"], testant["ode_var_update_instructions"][-2:])
+
+        # the reference is the Runge-Kutta integration of x'' = -2/tau x' - x/tau**2 + exp(-t/tau_syn) + I_e
+        def rhs(t, x, dx):
+            return dx, -2 / values["tau"] * dx - x / values["tau"] ** 2 + exp(-t / values["tau_syn"]) + values["I_e"]
+
+        x, dx, dt = 0.3, -0.2, values["__h"] / 100
+        for i in range(100):
+            t = i * dt
+            k1 = rhs(t, x, dx)
+            k2 = rhs(t + dt / 2, x + dt / 2 * k1[0], dx + dt / 2 * k1[1])
+            k3 = rhs(t + dt / 2, x + dt / 2 * k2[0], dx + dt / 2 * k2[1])
+            k4 = rhs(t + dt, x + dt * k3[0], dx + dt * k3[1])
+            x, dx = x + dt / 6 * (k1[0] + 2 * k2[0] + 2 * k3[0] + k4[0]), \
+                dx + dt / 6 * (k1[1] + 2 * k2[1] + 2 * k3[1] + k4[1])
+
+        state = step(testant, {"x": 0.3, "x'": -0.2, "I_shape": 1.0})
+        self.assertAlmostEqual(x, float(state["x"]), places=9)
+        self.assertAlmostEqual(dx, float(state["x'"]), places=9)
+
+    def test_coupled_odes(self):
+        system = LinearOdeSystem.from_parsed_input(ParsedInput(SolverInput(coupled_block)))
+        self.assertEqual(parse_expr("Matrix([[-1/tau_m, 0], [a/tau_w, -1/tau_w]])"), system.A)
+        self.assertEqual(parse_expr("Matrix([[I_e/C_m], [0]])"), system.const_inputs)
+        self.assertEqual(parse_expr("Matrix([[1/C_m], [0]])"), system.shape_factors[Symbol("I_shape")])
+
+    def test_nonlinear_odes(self):
+        nonlinear_block = json.dumps({
+            "shapes": ["g_ex = exp(-t/tau_syn)"],
+            "odes": ["V_m' = -V_m/tau_m - g_ex * (V_m - E_ex)/C_m", "w' = -w/tau_w"]})
+        self.assertIsNone(LinearOdeSystem.from_parsed_input(ParsedInput(SolverInput(nonlinear_block))))
+        self.assertEqual("numeric", json.loads(OdeAnalyzer.compute_solution(nonlinear_block))["solver"])
+
+if __name__ == '__main__':
+    unittest.main()
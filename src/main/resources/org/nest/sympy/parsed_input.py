@@ -0,0 +1,183 @@
+"""
+   This script provides the front stage of the solver. A `SolverInput`
+   contains definitions like `name = expression` as strings. `ParsedInput`
+   parses every definition exactly once into SymPy expressions:
+   - `functions` maps every function symbol onto its definition, in
+     which all other functions are inlined,
+   - `shapes` maps every shape symbol onto its definition as a function
+     of `t`,
+   - `shape_odes` maps every shape which is defined by an ODE, e.g.
+     `g'' = -g/tau**2 - 2*g'/tau`, onto the order and the right hand
+     side of the ODE,
+   - `initial_values` maps the shapes of `shape_odes` and their
+     derivatives onto their initial values, e.g. `__D_g` onto `e/tau`,
+   - `ode_var` is the variable and `ode_rhs` the right hand side of the
+     ODE in which all functions are inlined (both are None if the input
+     contains only shapes or a system of ODEs),
+   - `equations` lists the variable, the order and the right hand side
+     of every ODE in `odes`, e.g. of a system of ODEs or of an ODE of a
+     higher order,
+   - `parameters` contains the definitions of the parameters, internals
+     and initial values as strings, they are evaluated only by the
+     stiffness analysis of the numeric solution.
+   - `referenced_shapes` lists the shapes which are referenced outside
+     of the ODEs, e.g. in functions or in the update block.
+   Derivatives like `V_m'` are named like in the frontend, e.g. `__D_V_m`
+   (see `derivative_name`).
+   Later stages (the linearity check, the propagator computation, the
+   delta shape) work on these expressions and substitute symbols with
+   `xreplace` instead of parsing the definitions again.
+
+   Example:
+   ========
+
+   parsed_input = ParsedInput(SolverInput(input_json))
+   parsed_input.ode_rhs  # e.g. -V_m/tau_m + (I_shape + I_e)/C_m
+"""
+
+import copy
+import re
+from collections import OrderedDict
+
+from sympy import Symbol
+from sympy.parsing.sympy_parser import parse_expr
+
+DERIVATIVE_PATTERN = re.compile(r"([A-Za-z_]\w*)('+)")
+DERIVATIVE_NAME_PATTERN = re.compile(r"^__(D+)_(\w+)$")
+
+
+def split_definition(definition):
+    """
+    :param definition: String of the form `name = expression`, the name of an ODE ends with apostrophes
+    :return: Tuple of the stripped name and the stripped expression
+    """
+    name, expression = definition.split("=", 1)
+    return name.strip(), expression.strip()
+
+
+def derivative_name(name, order):
+    """
+    :return: The name of the `order`-th derivative of the variable, e.g. `__DD_g_ex` for `g_ex''`
+    """
+    if order == 0:
+        return name
+    return "__" + "D" * order + "_" + name
+
+
+def nestml_name(name):
+    """
+    :return: The NESTML name of a variable which is named by `derivative_name`, e.g. `g_ex''` for `__DD_g_ex`
+    """
+    match = DERIVATIVE_NAME_PATTERN.match(name)
+    if match is None:
+        return name
+    return match.group(2) + "'" * len(match.group(1))
+
+
+def parse_definition(expression):
+    return parse_expr(DERIVATIVE_PATTERN.sub(lambda m: derivative_name(m.group(1), len(m.group(2))), expression))
+
+
+class ParsedInput(object):
+    """
+    Parsed form of a `SolverInput` with the fields `functions`, `shapes`, `shape_odes`, `initial_values`, `ode_var`,
+    `ode_rhs`, `equations`, `parameters` and `referenced_shapes`.
+    """
+
+    def __init__(self, solver_input):
+        self.functions = OrderedDict()
+        for definition in getattr(solver_input, "functions", None) or []:
+            name, expression = split_definition(definition)
+            self.functions[parse_expr(name)] = parse_definition(expression)
+        self.inline_functions()
+
+        self.shapes = OrderedDict()
+        self.shape_odes = OrderedDict()
+        for definition in getattr(solver_input, "shapes", None) or []:
+            name, expression = split_definition(definition)
+            order = len(name) - len(name.rstrip("'"))
+            if order > 0:
+                self.shape_odes[Symbol(name.rstrip("'"))] = (order, parse_definition(expression))
+            else:
+                self.shapes[parse_expr(name)] = parse_expr(expression)
+
+        self.initial_values = OrderedDict()
+        for definition in getattr(solver_input, "initial_values", None) or []:
+            name, expression = split_definition(definition)
+            order = len(name) - len(name.rstrip("'"))
+            self.initial_values[Symbol(derivative_name(name.rstrip("'"), order))] = parse_definition(expression)
+
+        # `odes` contains all ODEs of the equations block, older inputs contain only the field `ode`
+        odes = getattr(solver_input, "odes", None)
+        if not odes:
+            ode = getattr(solver_input, "ode", None)
+            odes = [ode] if ode else []
+
+        self.parameters = list(getattr(solver_input, "parameters", None) or [])
+        self.referenced_shapes = [Symbol(name) for name in getattr(solver_input, "referenced_shapes", None) or []]
+
+        self.equations = []
+        for definition in odes:
+            name, expression = split_definition(definition)
+            self.equations.append((Symbol(name.rstrip("'")),
+                                    len(name) - len(name.rstrip("'")),
+                                    parse_definition(expression).xreplace(self.functions)))
+
+        if len(self.equations) == 1 and self.equations[0][1] == 1:
+            self.ode_var = self.equations[0][0]
+            self.ode_rhs = self.equations[0][2]
+        else:
+            self.ode_var = None
+            self.ode_rhs = None
+
+    def inline_functions(self):
+        """
+        Replaces every function which is used in the definition of another function by its definition. Every pass
+        resolves one level of nesting, therefore, at most as many passes as there are functions are needed.
+        """
+        for _ in range(len(self.functions)):
+            if not any(definition.has(*self.functions.keys()) for definition in self.functions.values()):
+                break
+            for function in self.functions:
+                self.functions[function] = self.functions[function].xreplace(self.functions)
+
+    def is_system(self):
+        """
+        :return: True iff the input contains several ODEs or an ODE of a higher order
+        """
+        return len(self.equations) > 1 or any(order > 1 for _, order, _ in self.equations)
+
+    def state_equations(self):
+        """
+        An ODE of order n contributes its variable and the first n-1 derivatives to the state vector, e.g. `x` and
+        `__D_x` for `x'' = f`.
+        :return: Tuple of the list of state symbols and the list of their derivatives
+        """
+        states = []
+        derivatives = []
+        for variable, order, rhs in self.equations:
+            variables = [Symbol(derivative_name(str(variable), i)) for i in range(order)]
+            states += variables
+            derivatives += variables[1:] + [rhs]
+        return states, derivatives
+
+    def without_equations(self, variables):
+        """
+        :param variables: Symbols of ODE variables, e.g. of gating variables which aren't integrated numerically
+        :return: Copy of the input without the ODEs of the variables, the variables are parameters of the remaining ODEs
+        """
+        result = copy.copy(self)
+        result.equations = [equation for equation in self.equations if equation[0] not in variables]
+        return result
+
+    def shape_symbols(self):
+        """
+        :return: The symbols of all shapes, i.e. of the shapes which are defined as functions of `t` and by ODEs
+        """
+        return list(self.shapes.keys()) + list(self.shape_odes.keys())
+
+    def ode_rhs_in_time(self):
+        """
+        :return: The right hand side of the ODE in which all shapes are replaced by their definitions
+        """
+        return self.ode_rhs.xreplace(self.shapes)
@@ -0,0 +1,69 @@
+import unittest
+
+from sympy.parsing.sympy_parser import parse_expr
+
+from OdeAnalyzer import SolverInput
+from parsed_input import ParsedInput
+
+nested_functions_block = '{' \
+                         '"functions" : [ "I_syn = I_syn_exc + I_syn_inh", "I_syn_exc = g_ex*(V_m-E_ex)", ' \
+                         '"I_syn_inh = g_in*(V_m-E_in)" ],' \
+                         '"shapes" : [ "g_in = exp(-t/tau_syn_in)", "g_ex = exp(-t/tau_syn_ex)" ],' \
+                         '"ode" : "V_m\' = (-I_syn+I_e)/C_m"' \
+                         '}'
+
+shapes_only = '{' \
+              '"shapes" : [ "g_in = exp(-t/tau_syn_in)" ]' \
+              '}'
+
+system_block = '{' \
+               '"shapes" : [ "I_shape = exp(-t/tau_syn)" ],' \
+               '"odes" : [ "V_m\' = -V_m/tau_m + (I_shape - w)/C_m", "w\'\' = -w\'/tau_w + a*V_m" ]' \
+               '}'
+
+shape_ode_block = '{' \
+                  '"shapes" : [ "g_ex\'\' = -g_ex/tau_syn**2 - 2*g_ex\'/tau_syn", "g_in = exp(-t/tau_syn)" ],' \
+                  '"initial_values" : [ "g_ex = 0", "g_ex\' = e/tau_syn" ],' \
+                  '"ode" : "V_m\' = -V_m/tau_m + (g_ex + g_in)/C_m"' \
+                  '}'
+
+
+class TestParsedInput(unittest.TestCase):
+
+    def test_nested_functions_are_inlined(self):
+        testant = ParsedInput(SolverInput(nested_functions_block))
+        self.assertEqual(parse_expr("g_ex*(V_m-E_ex) + g_in*(V_m-E_in)"), testant.functions[parse_expr("I_syn")])
+        self.assertEqual(parse_expr("V_m"), testant.ode_var)
+        self.assertEqual(parse_expr("(-g_ex*(V_m-E_ex) - g_in*(V_m-E_in) + I_e)/C_m"), testant.ode_rhs)
+
+    def test_shapes(self):
+        testant = ParsedInput(SolverInput(nested_functions_block))
+        self.assertEqual([parse_expr("g_in"), parse_expr("g_ex")], list(testant.shapes.keys()))
+        self.assertFalse(testant.ode_rhs_in_time().has(parse_expr("g_in")))
+        self.assertTrue(testant.ode_rhs_in_time().has(parse_expr("tau_syn_in")))
+
+    def test_shapes_only(self):
+        testant = ParsedInput(SolverInput(shapes_only))
+        self.assertIsNone(testant.ode_var)
+        self.assertIsNone(testant.ode_rhs)
+        self.assertEqual(1, len(testant.shapes))
+
+    def test_shape_odes(self):
+        testant = ParsedInput(SolverInput(shape_ode_block))
+        self.assertEqual([parse_expr("g_in")], list(testant.shapes.keys()))
+        self.assertEqual({parse_expr("g_ex"): (2, parse_expr("-g_ex/tau_syn**2 - 2*__D_g_ex/tau_syn"))},
+                         dict(testant.shape_odes))
+        self.assertEqual({parse_expr("g_ex"): 0, parse_expr("__D_g_ex"): parse_expr("e/tau_syn")},
+                         dict(testant.initial_values))
+        self.assertEqual([parse_expr("g_in"), parse_expr("g_ex")], testant.shape_symbols())
+
+    def test_system(self):
+        testant = ParsedInput(SolverInput(system_block))
+        self.assertTrue(testant.is_system())
+        self.assertIsNone(testant.ode_var)
+        self.assertEqual([(parse_expr("V_m"), 1), (parse_expr("w"), 2)],
+                         [(variable, order) for variable, order, _ in testant.equations])
+        self.assertEqual(parse_expr("-__D_w/tau_w + a*V_m"), testant.equations[1][2])
+
+if __name__ == '__main__':
+    unittest.main()
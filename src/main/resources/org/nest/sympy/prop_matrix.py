@@ -1,18 +1,29 @@
-from math import *
-from sympy import *
+from sympy import ImmutableMatrix, Matrix, Symbol, Tuple, count_ops, cse, diff, exp, numbered_symbols, sqrt, symbols
 from sympy.parsing.sympy_parser import parse_expr
 from sympy.matrices import zeros
 
+import solver_profile
+from budget import simplify_within_budget
+from matrix_exponential import exp_matrix, triangular_eigenvalues
+from renaming_memo import RenamingMemo
 from shapes import ShapeFunction, ShapeODE
+from zero_oracle import is_zero
+
+# Prefix of the temporaries which hold common subexpressions of the propagators, e.g. `__cse0`.
+CSE_PREFIX = "__cse"
 
 h = symbols("__h")
 
+# exp(A*h) doesn't depend on the names of the parameters in `A`. Neurons which use the same shapes and ODE with
+# differently named parameters share one computation.
+propagators = RenamingMemo(fixed_symbols=[h])
+
 
 class PropagatorCalculator(object):
     global h
 
     @staticmethod
-    def ode_to_prop_matrices(shapes, ode_var_str, ode_rhs_str, function_vars, function_definitions):
+    def ode_to_prop_matrices(shapes, ode_var, ode_rhs, merged_shapes=()):
         """
         The function `ode_to_prop_matrices` calculates a so called proagator
         for any given linear constant coefficient ODE with an inhomogeneous part
@@ -29,16 +40,15 @@ class PropagatorCalculator(object):
         shape_sin = ShapeFunction("shape_sinb", "sin(t)")
         shapes = [shape_alpha, shape_exp, shape_sin]
 
-        ode_var = "V_m"
-        ode_rhs = "-1/Tau * V_m-1/C * (shape_alpha + shape_exp + shape_sin + currents + I_E)"
+        ode_var = parse_expr("V_m")
+        ode_rhs = parse_expr("-1/Tau * V_m-1/C * (shape_alpha + shape_exp + shape_sin + currents + I_E)")
         prop_matrices, const_input, step_const = otpm.ode_to_prop_matrices(shapes, ode_var, ode_rhs)
+
+        `ode_rhs` is the right hand side of the ODE in which all functions are inlined, e.g. by `ParsedInput`. Shapes
+        in `merged_shapes` are propagated by the state of an equivalent shape in `shapes` (see
+        `merge_equivalent_shapes`), therefore, they are removed from the ODE.
         """
-        for function_var, function_definition in zip(function_vars, function_definitions):
-            exec("{0} = parse_expr(\"{1}\")".format(function_var, function_definition))
-        # ode functions are defined in the local scope. it must be passed explicitly into the parse_exp,
-        # otherwise, all functions in the ode would not be recognized as `complex` symbols
-        ode_rhs = parse_expr(ode_rhs_str, local_dict=locals())
-        ode_var = parse_expr(ode_var_str)
+        ode_rhs = ode_rhs.xreplace(dict((shape.name, 0) for shape in merged_shapes))
 
         # For V'= 1/Tau * V + 1/C * shape `ode_var_factor` is `1/Tau`
         # The `shape_factor` here is `1/C` this will be a list `shape_factors`
@@ -54,40 +64,14 @@ class PropagatorCalculator(object):
 
             shape_factor = diff(ode_rhs, shape.name)
 
-            if isinstance(shape, ShapeFunction):
-                # For shapes that satisfy a homogeneous linear ODE of order 1 or
-                # 2 we calculate a upper triangular matrix to make calculations more
-                # efficient.
-                if shape.order == 1:
-                    A = Matrix([[shape.derivative_factors[0], 0             ],
-                                [shape_factor,                ode_var_factor]])
-                elif shape.order == 2:
-                    solutionpq = -shape.derivative_factors[1]/2 + sqrt(shape.derivative_factors[1]**2 / 4 + shape.derivative_factors[0])
-                    A = Matrix([[shape.derivative_factors[1]+solutionpq, 0,            0             ],
-                                [1,                                      -solutionpq,  0             ],
-                                [0,                                     shape_factor, ode_var_factor]])
-                # For shapes that satisfy a homogeneous linear ODE of order larger than
-                # 2 we calculate A by choosing the state variables canonicaly as
-                # y_0=I^(n),..., y_{n-1}=I, y_n=V
-                else:
-                    A = zeros(shape.order+1)
-                    A[shape.order, shape.order] = ode_var_factor
-                    A[shape.order, shape.order - 1] = shape_factor
-                    for j in range(0, shape.order):
-                        A[0, j] = shape.derivative_factors[shape.order - j - 1]
-                    for i in range(1, shape.order):
-                        A[i, i - 1] = 1
-
-            if isinstance(shape, ShapeODE):
-
-                A = zeros(shape.order + 1)
-                A[:shape.order, :shape.order] = shape.matrix
-                A[shape.order, shape.order] = ode_var_factor
-                A[shape.order, shape.order - 1] = shape_factor
+            A, eigenvalues = PropagatorCalculator.shape_system(shape, shape_factor, ode_var_factor)
 
             shape_factors.append(shape_factor)
             # Calculate the mat
-            prop_matrices.append(simplify(exp(A * h)))
+            with solver_profile.stage("exp(A*h) " + str(shape.name)) as record:
+                prop_matrices.append(propagators.lookup(Tuple(ImmutableMatrix(A), Tuple(*(eigenvalues or []))),
+                                                        PropagatorCalculator.propagator))
+                record.set_size(prop_matrices[-1])
 
         step_const = -1/ode_var_factor * (1 - exp(h * ode_var_factor))
 
@@ -95,28 +79,157 @@ class PropagatorCalculator(object):
         for shape_factor, shape in zip(shape_factors, shapes):
             const_input -= shape_factor * shape.name
 
-        return prop_matrices, simplify(const_input), simplify(step_const)
+        with solver_profile.stage("simplification") as record:
+            const_input = simplify_within_budget(const_input)
+            step_const = simplify_within_budget(step_const)
+            record.set_size([const_input, step_const])
+
+        return prop_matrices, const_input, step_const
+
+    @staticmethod
+    def merge_equivalent_shapes(shapes, ode_var, ode_rhs, referenced_shapes=()):
+        """
+        Shapes with identical derivative factors satisfy the same ODE, e.g. two exponential shapes with the same time
+        constant. If they enter the ODE with constant factors, the weighted sum `f_R * R + f_S * S` is propagated by
+        the state of one representative `R`: a spike which is convolved with `S` adds `f_S / f_R` times the initial
+        values of `S` to the state of `R`.
+        Neither `R` nor `S` can be read from this state any more, therefore, the `referenced_shapes`, which are used
+        outside of the ODE, e.g. in functions, keep their own state variables.
+        :return: Tuple of the list of representative shapes and the list of (merged shape, representative, weight)
+        tuples
+        """
+        state_symbols = [ode_var] + [shape.name for shape in shapes]
+
+        representatives = []
+        # representatives which enter the ODE with a constant factor and the factors
+        candidates = []
+        candidate_factors = []
+        merged_shapes = []
+        for shape in shapes:
+            shape_factor = diff(ode_rhs, shape.name)
+            if not isinstance(shape, ShapeFunction) or shape_factor.has(*state_symbols) or is_zero(shape_factor) or \
+                    shape.name in referenced_shapes:
+                representatives.append(shape)
+                continue
+
+            representative = PropagatorCalculator.find_equivalent_shape(shape, candidates)
+            if representative is not None:
+                weight = shape_factor / candidate_factors[candidates.index(representative)]
+                merged_shapes.append((shape, representative, weight))
+            else:
+                representatives.append(shape)
+                candidates.append(shape)
+                candidate_factors.append(shape_factor)
+
+        return representatives, merged_shapes
+
+    @staticmethod
+    def find_equivalent_shape(shape, candidates):
+        """
+        :return: The first shape among the candidates which satisfies the same ODE as the shape or None
+        """
+        for candidate in candidates:
+            if candidate.order == shape.order and \
+                    all(is_zero(a - b) for a, b in zip(candidate.derivative_factors, shape.derivative_factors)):
+                return candidate
+        return None
+
+    @staticmethod
+    def shape_system(shape, shape_factor, ode_var_factor):
+        """
+        Builds the matrix A of the system y' = Ay which consists of the shape and the ODE variable.
+        :param shape: `ShapeFunction` or `ShapeODE`
+        :param shape_factor: Factor of the shape in the ODE
+        :param ode_var_factor: Factor of the ODE variable in the ODE
+        :return: Tuple of A and the list of its eigenvalues (repeated according to their multiplicity) or None if they
+        are unknown
+        """
+        if isinstance(shape, ShapeFunction):
+            # For shapes that satisfy a homogeneous linear ODE of order 1 or
+            # 2 we calculate a upper triangular matrix to make calculations more
+            # efficient.
+            if shape.order == 1:
+                A = Matrix([[shape.derivative_factors[0], 0             ],
+                            [shape_factor,                ode_var_factor]])
+            elif shape.order == 2:
+                if shape.eigenvalues is not None:
+                    # the roots of the characteristic polynomial are known, e.g. both are -1/tau for the alpha shape
+                    roots = [eigenvalue for eigenvalue, multiplicity in shape.eigenvalues for _ in range(multiplicity)]
+                    A = Matrix([[roots[0], 0,            0             ],
+                                [1,        roots[1],     0             ],
+                                [0,        shape_factor, ode_var_factor]])
+                else:
+                    solutionpq = -shape.derivative_factors[1]/2 + sqrt(shape.derivative_factors[1]**2 / 4 + shape.derivative_factors[0])
+                    A = Matrix([[shape.derivative_factors[1]+solutionpq, 0,            0             ],
+                                [1,                                      -solutionpq,  0             ],
+                                [0,                                     shape_factor, ode_var_factor]])
+            # For shapes that satisfy a homogeneous linear ODE of order larger than
+            # 2 we calculate A by choosing the state variables canonicaly as
+            # y_0=I^(n),..., y_{n-1}=I, y_n=V
+            else:
+                A = zeros(shape.order+1)
+                A[shape.order, shape.order] = ode_var_factor
+                A[shape.order, shape.order - 1] = shape_factor
+                for j in range(0, shape.order):
+                    A[0, j] = shape.derivative_factors[shape.order - j - 1]
+                for i in range(1, shape.order):
+                    A[i, i - 1] = 1
+
+        if isinstance(shape, ShapeODE):
+
+            A = zeros(shape.order + 1)
+            A[:shape.order, :shape.order] = shape.matrix
+            A[shape.order, shape.order] = ode_var_factor
+            A[shape.order, shape.order - 1] = shape_factor
+
+        # The eigenvalues of triangular matrices are on the diagonal, the eigenvalues of the companion matrix of a
+        # shape are the roots of its characteristic polynomial. exp(A*h) is computed in closed form from them.
+        eigenvalues = triangular_eigenvalues(A)
+        if eigenvalues is None and shape.eigenvalues is not None:
+            eigenvalues = [eigenvalue for eigenvalue, multiplicity in shape.eigenvalues for _ in range(multiplicity)]
+            eigenvalues.append(ode_var_factor)
+
+        return A, eigenvalues
+
+    @staticmethod
+    def propagator(system):
+        """
+        :param system: Tuple of the matrix A and its eigenvalues, the tuple of eigenvalues is empty if they are unknown
+        :return: The propagator matrix exp(A*h) of the system y' = Ay
+        """
+        A, eigenvalues = system
+        if eigenvalues:
+            return ImmutableMatrix(exp_matrix(Matrix(A), list(eigenvalues), h))
+        return ImmutableMatrix(simplify_within_budget(exp(A * h)))
 
     @staticmethod
     def constant_input(step_const, ode_var_str):
         return "__ode_var_factor * " + ode_var_str + " + __const_input * (" + str(step_const) + ")"
 
     @staticmethod
-    def prop_matrix_to_prop_step(prop_matrices, const_input, step_const, shapes, ode_var_str):
-        p_order_order = prop_matrices[0][shapes[0].order, shapes[0].order]
-        ode_var = parse_expr(ode_var_str)
-        ode_var_factor = {"__ode_var_factor": str(p_order_order)}
+    def prop_matrix_to_prop_step(prop_matrices, const_input, step_const, shapes, ode_var, ode_var_propagator=None):
+        """
+        :param ode_var_propagator: exp(h * c) of the ODE variable with the factor c in the ODE. If it is omitted, it is
+        taken from the propagator of the first shape, i.e. it is required if there are no shapes.
+        :return: Tuple of the propagator elements, the ODE variable factor, the constant input, the update instructions
+        of the ODE variable and the common subexpressions of the propagator elements, the ODE variable factor and the
+        step constant. Every common subexpression is a temporary which is defined before the propagator elements.
+        """
+        p_order_order = prop_matrices[0][shapes[0].order, shapes[0].order] if shapes else ode_var_propagator
+        ode_var_str = str(ode_var)
         const_input = {"__const_input": str(const_input)}
 
-        propagator_elements = []
-        ode_var_update_instructions = [ode_var_str + " = " + str(PropagatorCalculator.constant_input(step_const, ode_var_str))]
+        propagator_names = []
+        propagator_values = []
+        update_instructions = []
         for p, shape in zip(prop_matrices, shapes):
             P = zeros(shape.order + 1, shape.order + 1)
             for i in range(shape.order + 1):
                 for j in range(shape.order + 1):
-                    if simplify(p[i, j]) != sympify(0):
+                    if not is_zero(p[i, j]):
                         P[i, j] = parse_expr("__P_{}__{}_{}".format(shape.name, i, j))
-                        propagator_elements.append({"__P_{}__{}_{}".format(shape.name, i, j): str(p[i, j])})
+                        propagator_names.append("__P_{}__{}_{}".format(shape.name, i, j))
+                        propagator_values.append(p[i, j])
 
             y = zeros(shape.order + 1, 1)
             for i in range(shape.order):
@@ -126,7 +239,7 @@ class PropagatorCalculator(object):
             P[shape.order, shape.order] = 0
             z = P * y
 
-            ode_var_update_instructions.append(ode_var_str + " += " + str(z[shape.order]))
+            update_instructions.append(ode_var_str + " += " + str(z[shape.order]))
 
             shape_state_vector_as_expr = zeros(shape.order, 1)
             for idx in range(len(shape.additional_shape_state_variables())):
@@ -136,5 +249,36 @@ class PropagatorCalculator(object):
             for idx in range(0, shape_state_updates.rows):
                 shape.add_update_to_shape_state_variable(shape_state_vector_as_expr[idx], shape_state_updates[idx])
 
-        return propagator_elements, ode_var_factor, const_input, ode_var_update_instructions
+        # the propagator elements, the ODE variable factor and the step constant share many subterms, e.g. exp(-__h/tau)
+        common_subexpressions, reduced = PropagatorCalculator.eliminate_common_subexpressions(
+            propagator_values + [p_order_order, step_const])
+        propagator_elements = [{name: str(value)} for name, value in zip(propagator_names, reduced)]
+        ode_var_factor = {"__ode_var_factor": str(reduced[-2])}
+        ode_var_update_instructions = [ode_var_str + " = " + PropagatorCalculator.constant_input(reduced[-1], ode_var_str)]
+        ode_var_update_instructions += update_instructions
+
+        return propagator_elements, ode_var_factor, const_input, ode_var_update_instructions, common_subexpressions
+
+    @staticmethod
+    def eliminate_common_subexpressions(expressions, prefix=CSE_PREFIX):
+        """
+        :param expressions: List of expressions, e.g. propagators which depend only on parameters and the time step
+        :param prefix: Prefix of the names of the temporaries
+        :return: Tuple of the list of {temporary: definition} in the order in which the temporaries must be defined
+        and the list of the expressions which use the temporaries
+        """
+        replacements, reduced = cse(expressions, symbols=numbered_symbols(prefix))
+
+        # temporaries of a single operation, e.g. `-Tau` or `1/C_m`, aren't cheaper than their definition and are
+        # inlined. the remaining temporaries are numbered consecutively.
+        substitutions = {}
+        common_subexpressions = []
+        for temporary, definition in replacements:
+            definition = definition.xreplace(substitutions)
+            if count_ops(definition) <= 1:
+                substitutions[temporary] = definition
+            else:
+                substitutions[temporary] = Symbol(prefix + str(len(common_subexpressions)))
+                common_subexpressions.append({str(substitutions[temporary]): str(definition)})
+        return common_subexpressions, [expression.xreplace(substitutions) for expression in reduced]
 
@@ -0,0 +1,76 @@
+"""
+   This script compares the computation of the propagator matrices
+   exp(A*h) by the generic matrix exponential followed by `simplify`
+   with the closed form computed by `matrix_exponential.exp_matrix`.
+   The equations blocks are those of the models in the `models` folder
+   which are solved exactly.
+
+   Example:
+   ========
+
+   python propagator_benchmark.py
+
+   prints the time of both computations and the speedup for every model.
+"""
+
+import time
+
+from sympy import diff, exp, simplify
+from sympy.parsing.sympy_parser import parse_expr
+
+from matrix_exponential import exp_matrix
+from prop_matrix import PropagatorCalculator, h
+from shapes import ShapeFunction
+
+# model name -> (shape definitions, ODE variable, right hand side of the ODE)
+MODELS = [
+    ("iaf_psc_alpha", ["I_shape_in = pA * (e/tau_syn_in) * t * exp(-1/tau_syn_in*t)",
+                       "I_shape_ex = pA * (e/tau_syn_ex) * t * exp(-1/tau_syn_ex*t)"],
+     "V_abs", "-1/Tau * V_abs + 1/C_m * (I_shape_in + I_shape_ex + I_e + currents)"),
+    ("iaf_psc_exp", ["I_shape_in = exp(-1/tau_syn_in*t)", "I_shape_ex = exp(-1/tau_syn_ex*t)"],
+     "V_abs", "-V_abs/tau_m + ((I_shape_in + I_shape_ex + I_e + currents)/C_m) * nS"),
+    ("iaf_neuron", ["G = (e/tau_syn) * t * exp(-1/tau_syn*t)"],
+     "V_abs", "-1/Tau * (V_abs) + (G + I_e + currents) / C_m"),
+    ("iaf_tum_2000", ["I_shape_in = exp(-1/tau_syn_in*t)", "I_shape_ex = exp(-1/tau_syn_ex*t)"],
+     "V_m", "-1/tau_m * V_m + 1/C_m * (I_shape_in + I_shape_ex + I_e + currents)"),
+    ("iaf_psc_alpha_multisynapse", ["I_shape = pA * (e/tau_syn) * t * exp(-1/tau_syn*t)"],
+     "V_abs", "-1/tau_m * V_abs + 1/C_m * (I_shape + I_e + currents)"),
+    ("beta_shape", ["I_shape = (exp(-t/tau_decay) - exp(-t/tau_rise)) / (tau_decay - tau_rise)"],
+     "V_m", "-1/tau_m * V_m + 1/C_m * (I_shape + I_e)"),
+    ("third_order_shape", ["I_shape = t**2 * exp(-t/tau_syn) / 2"],
+     "V_m", "-1/tau_m * V_m + 1/C_m * (I_shape + I_e)"),
+]
+
+
+def benchmark(shape_definitions, ode_var_str, ode_rhs_str):
+    """
+    :return: Tuple of the time of the generic and of the closed form computation in seconds
+    """
+    ode_var = parse_expr(ode_var_str)
+    ode_rhs = parse_expr(ode_rhs_str)
+    ode_var_factor = diff(ode_rhs, ode_var)
+
+    generic_time = 0
+    closed_form_time = 0
+    for shape_definition in shape_definitions:
+        name, definition = [part.strip() for part in shape_definition.split("=", 1)]
+        shape = ShapeFunction(name, definition)
+        A, eigenvalues = PropagatorCalculator.shape_system(shape, diff(ode_rhs, shape.name), ode_var_factor)
+
+        start = time.time()
+        simplify(exp(A * h))
+        generic_time += time.time() - start
+
+        start = time.time()
+        exp_matrix(A, eigenvalues, h)
+        closed_form_time += time.time() - start
+
+    return generic_time, closed_form_time
+
+
+if __name__ == "__main__":
+    print("{:<28} {:>12} {:>12} {:>9}".format("model", "generic [s]", "closed [s]", "speedup"))
+    for model, shape_definitions, ode_var_str, ode_rhs_str in MODELS:
+        generic_time, closed_form_time = benchmark(shape_definitions, ode_var_str, ode_rhs_str)
+        print("{:<28} {:>12.3f} {:>12.3f} {:>8.1f}x".format(
+            model, generic_time, closed_form_time, generic_time / closed_form_time))
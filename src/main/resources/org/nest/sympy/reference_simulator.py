@@ -0,0 +1,233 @@
+"""
+   This script simulates the exact solution of the solver for a whole
+   population of neurons without NEST and without a C++ toolchain. The
+   `SolverOutput` is executed like in the generated code:
+   - the common subexpressions, the ODE variable factor and the
+     propagator elements are evaluated once (they are internals),
+   - every step executes the constant input, the update instructions of
+     the ODE variables and the updates of the shape state variables,
+   - afterwards, the spikes are added to the shape state variables,
+     weighted with the initial values of the shapes, and the spikes of
+     delta shapes are added to the ODE variable, weighted with the jump
+     of the ODE variable per spike weight.
+   Every expression is compiled with `lambdify` into a NumPy function.
+   The state is stored as a structure of arrays, i.e. every state
+   variable is an array with one entry per neuron, and all neurons are
+   propagated by one call of every function. Parameters may be numbers or
+   arrays with one value per neuron.
+
+   Only the subthreshold dynamics is simulated, the threshold and the
+   reset are a part of the update block of the model. Units are replaced
+   by 1, `e` is the Euler number. Variables which are neither parameters
+   nor state variables, e.g. the current buffer `currents`, are inputs
+   which are 0 unless they are passed to `step`.
+
+   Example:
+   ========
+
+   simulator = ReferenceSimulator(solver_output, {"Tau": 10., "C_m": 250., "tau_syn": 2., "I_e": 0.}, 100000)
+   simulator.step(spikes={"I_shape": weights}, inputs={"currents": currents})
+   simulator.state("V_abs")  # array with the membrane potentials of all neurons
+
+   python reference_simulator.py solver_output.json --parameters parameters.json --neurons 100000 --steps 1000
+"""
+
+import argparse
+import json
+import re
+import time
+
+import numpy
+from sympy import Symbol, lambdify
+
+from parsed_input import derivative_name, parse_definition
+from stiffness import implicit_values
+
+DEFAULT_RESOLUTION = 0.1
+
+# e.g. `V_m = expression`, `V_m += expression` or `__next__0 real = expression`
+INSTRUCTION_PATTERN = re.compile(r"^\s*([A-Za-z_]\w*'*)\s*(\+=|real\s*=|=)\s*(.+)$")
+
+SHAPE_STATE_VARIABLE_PATTERN = re.compile(r"^(\w+?)(__\d+)?$")
+
+
+def python_name(name):
+    """
+    :return: Name of the symbol of a NESTML variable, e.g. `__D_x` for `x'`
+    """
+    variable = name.rstrip("'")
+    return derivative_name(variable, len(name) - len(variable))
+
+
+class Kernel(object):
+    """
+    The assignment `variable = expression` or the increment `variable += expression` compiled into a NumPy function.
+    """
+
+    def __init__(self, variable, expression, increment=False, declaration=False):
+        self.variable = Symbol(python_name(variable))
+        self.arguments = sorted(expression.free_symbols, key=str)
+        self.function = lambdify(self.arguments, expression, modules="numpy")
+        self.increment = increment
+        # a declaration of a temporary, e.g. `__next__0 real = expression`
+        self.declaration = declaration
+
+    @staticmethod
+    def from_instruction(instruction):
+        """
+        :param instruction: Update instruction of the `SolverOutput`, e.g. `V_m += P * I_shape`
+        """
+        match = INSTRUCTION_PATTERN.match(instruction)
+        if match is None:
+            raise ValueError("Cannot parse the update instruction '{}'".format(instruction))
+        variable, operator, expression = match.groups()
+        return Kernel(variable, parse_definition(expression), operator == "+=", operator.startswith("real"))
+
+    def execute(self, environment):
+        """
+        :param environment: Dictionary which maps symbols onto numbers or arrays. It is updated with the result.
+        """
+        value = self.function(*[environment[argument] for argument in self.arguments])
+        if self.increment:
+            value = environment[self.variable] + value
+        environment[self.variable] = value
+
+
+class ReferenceSimulator(object):
+    """
+    Propagates a population of `size` neurons with the exact solution `solver_output` (the deserialized JSON) in steps
+    of `resolution` ms.
+    """
+
+    def __init__(self, solver_output, parameters, size, resolution=DEFAULT_RESOLUTION, initial_state=None):
+        if solver_output["solver"] != "exact":
+            raise ValueError("Only exact solutions can be simulated, the solver is '{}'".format(
+                solver_output["solver"]))
+        self.size = size
+
+        # the constants are internals of the model, the updates are executed in every step
+        constants = [Kernel(name, parse_definition(expression))
+                     for definition in solver_output["common_subexpressions"] +
+                     ([solver_output["ode_var_factor"]] if solver_output["ode_var_factor"] else []) +
+                     solver_output["propagator_elements"]
+                     for name, expression in definition.items()]
+        self.updates = [Kernel(name, parse_definition(expression))
+                        for name, expression in (solver_output["const_input"] or {}).items()]
+        instructions = [Kernel.from_instruction(instruction)
+                        for instruction in solver_output["ode_var_update_instructions"]]
+        self.updates += instructions
+        self.updates += [Kernel(name, parse_definition(expression))
+                         for definition in solver_output["updates_to_shape_state_variables"]
+                         for name, expression in definition.items()]
+        # (shape, shape state variable, kernel of the increment per spike weight)
+        spike_increments = [(SHAPE_STATE_VARIABLE_PATTERN.match(name).group(1), name,
+                             Kernel("__increment", parse_definition(value)))
+                            for definition in solver_output["initial_values"] for name, value in definition.items()]
+        merged_shapes = dict(item for definition in solver_output["merged_shapes"] for item in definition.items())
+        for definition in solver_output["merged_shape_initial_values"]:
+            for name, value in definition.items():
+                shape = SHAPE_STATE_VARIABLE_PATTERN.match(name).group(1)
+                # e.g. `I_shape_ex__1` is propagated by `I_shape_in__1`
+                variable = merged_shapes[shape] + name[len(shape):]
+                spike_increments.append((shape, variable, Kernel("__increment", parse_definition(value))))
+        # a delta shape has no state variables, its spikes are jumps of the ODE variable
+        for definition in solver_output.get("delta_shapes", []):
+            for shape, value in definition.items():
+                spike_increments.append((shape, str(instructions[0].variable),
+                                         Kernel("__increment", parse_definition(value))))
+
+        assigned = set(kernel.variable for kernel in constants + self.updates)
+        self.state_variables = [Symbol(name) for name in solver_output["shape_state_variables"]]
+        self.state_variables += sorted(set(kernel.variable for kernel in instructions if not kernel.declaration) -
+                                       set(self.state_variables), key=str)
+
+        self.environment = dict((Symbol(name), numpy.asarray(value, dtype=float)) for name, value in parameters.items())
+        self.environment[Symbol("__h")] = resolution
+        for variable in self.state_variables:
+            self.environment[variable] = numpy.zeros(size)
+        for name, value in (initial_state or {}).items():
+            self.environment[Symbol(python_name(name))] = numpy.zeros(size) + value
+
+        arguments = set().union(*[kernel.arguments for kernel in constants + self.updates +
+                                  [increment for _, _, increment in spike_increments]])
+        undefined = arguments - assigned - set(self.environment.keys())
+        for symbol, value in implicit_values(undefined).items():
+            self.environment[symbol] = float(value)
+        self.inputs = sorted(undefined - set(self.environment.keys()), key=str)
+
+        self.reset_inputs()
+        for kernel in constants:
+            kernel.execute(self.environment)
+        self.spike_increments = []
+        for shape, variable, kernel in spike_increments:
+            kernel.execute(self.environment)
+            self.spike_increments.append((shape, Symbol(variable), self.environment.pop(kernel.variable)))
+
+    def reset_inputs(self):
+        for symbol in self.inputs:
+            self.environment[symbol] = 0.0
+
+    def state(self, name):
+        """
+        :param name: Name of a state variable, e.g. `V_m`, `V_m'` or `I_shape__1`
+        :return: Array with the values of all neurons
+        """
+        return self.environment[Symbol(python_name(name))]
+
+    def step(self, spikes=None, inputs=None):
+        """
+        Propagates all neurons by one step.
+        :param spikes: Dictionary which maps a shape onto the summed weights of the spikes which arrive at every neuron
+        in this step
+        :param inputs: Dictionary which maps an input, e.g. `currents`, onto its values in this step
+        """
+        self.reset_inputs()
+        for name, value in (inputs or {}).items():
+            self.environment[Symbol(name)] = value
+        for kernel in self.updates:
+            kernel.execute(self.environment)
+        for shape, variable, increment in self.spike_increments:
+            if spikes is not None and shape in spikes:
+                self.environment[variable] = self.environment[variable] + spikes[shape] * increment
+
+    def run(self, steps, spikes=None, record=()):
+        """
+        :param steps: Number of steps
+        :param spikes: Dictionary which maps a shape onto an array of the spike weights with the shape (steps, size)
+        :param record: Names of the recorded state variables
+        :return: Dictionary which maps every recorded state variable onto an array with the shape (steps, size)
+        """
+        traces = dict((name, numpy.empty((steps, self.size))) for name in record)
+        for i in range(steps):
+            self.step(dict((shape, weights[i]) for shape, weights in spikes.items()) if spikes else None)
+            for name in record:
+                traces[name][i] = self.state(name)
+        return traces
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulates the exact solution of the solver with NumPy.")
+    parser.add_argument("solver_output", help="file with the JSON output of the solver")
+    parser.add_argument("--parameters", help="file with a JSON dictionary of the parameter values")
+    parser.add_argument("--neurons", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION)
+    parser.add_argument("--rate", type=float, default=0.01, help="probability of a spike per shape, neuron and step")
+    args = parser.parse_args()
+
+    with open(args.solver_output, "r") as output_file:
+        output = json.load(output_file)
+    values = {}
+    if args.parameters:
+        with open(args.parameters, "r") as parameters_file:
+            values = json.load(parameters_file)
+
+    start = time.time()
+    simulator = ReferenceSimulator(output, values, args.neurons, args.resolution)
+    compiled = time.time()
+    shapes = set(shape for shape, _, _ in simulator.spike_increments)
+    for _ in range(args.steps):
+        simulator.step(dict((shape, (numpy.random.random(args.neurons) < args.rate).astype(float)) for shape in shapes))
+    finished = time.time()
+    print("compilation: {:.3f} [s], simulation: {:.3f} [s], {:.3g} neuron steps per second".format(
+        compiled - start, finished - compiled, args.neurons * args.steps / max(finished - compiled, 1e-9)))
@@ -0,0 +1,102 @@
+import json
+import unittest
+
+import numpy
+
+from OdeAnalyzer import OdeAnalyzer
+from reference_simulator import ReferenceSimulator
+
+psc_exp_block = json.dumps({
+    "shapes": ["I_shape = exp(-t/tau_syn)"],
+    "ode": "V_abs' = -1/Tau * V_abs + 1/C_m * (I_shape + I_e + currents)"})
+
+psc_alpha_block = json.dumps({
+    "shapes": ["I_shape = pA * e / tau_syn * t * exp(-t/tau_syn)"],
+    "ode": "V_abs' = -1/Tau * V_abs + 1/C_m * (I_shape + I_e + currents)"})
+
+
+def psc_exp_response(t, weight, Tau, tau_syn, C_m):
+    """
+    :return: Membrane potential at the time `t` after a spike which arrived at the resting neuron
+    """
+    return weight * Tau * tau_syn / (C_m * (Tau - tau_syn)) * (numpy.exp(-t / Tau) - numpy.exp(-t / tau_syn))
+
+
+class TestReferenceSimulator(unittest.TestCase):
+
+    def test_population(self):
+        output = json.loads(OdeAnalyzer.compute_solution(psc_exp_block))
+        # every neuron has its own membrane time constant
+        Tau = numpy.array([5., 10., 20.])
+        testant = ReferenceSimulator(output, {"Tau": Tau, "tau_syn": 2, "C_m": 250., "I_e": 0.}, 3)
+        weights = numpy.array([100., 200., 300.])
+        testant.step(spikes={"I_shape": weights})
+        traces = testant.run(50, record=["V_abs", "I_shape"])
+        t = numpy.arange(1, 51) * 0.1
+        for i in range(3):
+            numpy.testing.assert_allclose(psc_exp_response(t, weights[i], Tau[i], 2., 250.), traces["V_abs"][:, i],
+                                          rtol=1e-9)
+            numpy.testing.assert_allclose(weights[i] * numpy.exp(-t / 2.), traces["I_shape"][:, i], rtol=1e-9)
+
+    def test_inputs(self):
+        output = json.loads(OdeAnalyzer.compute_solution(psc_alpha_block))
+        testant = ReferenceSimulator(output, {"Tau": 10., "tau_syn": 2., "C_m": 250., "I_e": 100.}, 2,
+                                     initial_state={"V_abs": [0., -5.]})
+        self.assertEqual(["currents"], [str(symbol) for symbol in testant.inputs])
+        for _ in range(2000):
+            testant.step(inputs={"currents": numpy.array([0., 150.])})
+        numpy.testing.assert_allclose([100. * 10. / 250., 250. * 10. / 250.], testant.state("V_abs"), rtol=1e-6)
+
+    def test_alpha_shape_peak(self):
+        output = json.loads(OdeAnalyzer.compute_solution(psc_alpha_block))
+        testant = ReferenceSimulator(output, {"Tau": 10., "tau_syn": 2., "C_m": 250., "I_e": 0.}, 1)
+        testant.step(spikes={"I_shape": numpy.ones(1)})
+        traces = testant.run(40, record=["I_shape"])
+        # the alpha shape is normalized to the peak 1 pA at t = tau_syn
+        self.assertAlmostEqual(1.0, traces["I_shape"][19, 0], places=9)
+        self.assertTrue(numpy.all(traces["I_shape"] <= 1.0 + 1e-12))
+
+    def test_delta_shapes(self):
+        output = json.loads(OdeAnalyzer.compute_solution(json.dumps({
+            "shapes": ["I_ex = delta(t, tau)", "I_shape = exp(-t/tau_syn)"],
+            "ode": "V_abs' = -1/Tau * V_abs + 1/C_m * (I_ex + I_shape)"})))
+        testant = ReferenceSimulator(output, {"Tau": 10., "tau_syn": 2., "C_m": 250.}, 2)
+        testant.step(spikes={"I_ex": numpy.array([100., 0.]), "I_shape": numpy.array([0., 100.])})
+        traces = testant.run(50, record=["V_abs"])
+        t = numpy.arange(1, 51) * 0.1
+        numpy.testing.assert_allclose(100. / 250. * numpy.exp(-t / 10.), traces["V_abs"][:, 0], rtol=1e-9)
+        numpy.testing.assert_allclose(psc_exp_response(t, 100., 10., 2., 250.), traces["V_abs"][:, 1], rtol=1e-9)
+
+    def test_delta_jump(self):
+        # a spike increments the ODE variable by the integral of the delta input, i.e. by the weight times `1/C_m`,
+        # independently of the additional shape
+        output = json.loads(OdeAnalyzer.compute_solution(json.dumps({
+            "shapes": ["G = delta(t, tau_m)", "I_shape = exp(-t/tau_syn)"],
+            "ode": "V_abs' = -1/tau_m * V_abs + 1/C_m * (G + I_shape + I_e + currents)"})))
+        testant = ReferenceSimulator(output, {"tau_m": 10., "tau_syn": 2., "C_m": 250., "I_e": 0.}, 1)
+        testant.step(spikes={"G": numpy.array([100.])})
+        numpy.testing.assert_allclose([100. / 250.], testant.state("V_abs"), rtol=1e-12)
+
+    def test_shape_odes(self):
+        shape_ode_block = json.dumps({
+            "shapes": ["I_shape'' = -I_shape/tau_syn**2 - 2*I_shape'/tau_syn"],
+            "initial_values": ["I_shape = 0", "I_shape' = pA * e / tau_syn"],
+            "ode": "V_abs' = -1/Tau * V_abs + 1/C_m * (I_shape + I_e + currents)"})
+        traces = []
+        # the alpha shape as an ODE and as a function of `t` yield the same trace
+        for block in [shape_ode_block, psc_alpha_block]:
+            testant = ReferenceSimulator(json.loads(OdeAnalyzer.compute_solution(block)),
+                                         {"Tau": 10., "tau_syn": 2., "C_m": 250., "I_e": 0.}, 1)
+            testant.step(spikes={"I_shape": 100. * numpy.ones(1)})
+            traces.append(testant.run(100, record=["V_abs", "I_shape"]))
+        numpy.testing.assert_allclose(traces[1]["V_abs"], traces[0]["V_abs"], rtol=1e-9)
+        numpy.testing.assert_allclose(traces[1]["I_shape"], traces[0]["I_shape"], rtol=1e-9, atol=1e-12)
+
+    def test_numeric_solution(self):
+        output = json.loads(OdeAnalyzer.compute_solution(json.dumps({
+            "shapes": ["g_ex = exp(-t/tau_syn)"],
+            "ode": "V_m' = -V_m/tau_m - g_ex * (V_m - E_ex)/C_m"})))
+        self.assertRaises(ValueError, ReferenceSimulator, output, {}, 1)
+
+if __name__ == '__main__':
+    unittest.main()
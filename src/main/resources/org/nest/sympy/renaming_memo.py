@@ -0,0 +1,122 @@
+"""
+   This script provides a memoization of symbolic computations up to a
+   renaming of the parameters. The same shape appears in many neurons
+   with different parameter names, e.g. `g_in` with `tau_syn_in` and
+   `g_ex` with `tau_syn_ex`. Both are the same computation once the
+   parameters are renamed consistently.
+
+   The argument of the computation is canonicalized by renaming its free
+   symbols in the order of their first occurrence to `__memo_0`,
+   `__memo_1`, ... The result is computed for the canonical argument,
+   stored and renamed back for every lookup. Symbols with a fixed
+   meaning, e.g. the time `t`, are not renamed.
+
+   The strategies of the budgets (see `budget.record_strategy`) which
+   were used for a result are stored with it and recorded again on every
+   hit, i.e. a result which was computed under a degraded budget is
+   reported as degraded by every solution which uses it.
+
+   The memo lives as long as the process, i.e. it is shared by all
+   equations blocks solved by a long running solver worker. The number of
+   entries is bounded, the least recently used entries are removed first.
+
+   Example:
+   ========
+
+   memo = RenamingMemo(fixed_symbols=[t])
+   order = memo.lookup(parse_expr("exp(-t/tau_syn_in)"), compute_order)
+   order = memo.lookup(parse_expr("exp(-t/tau_syn_ex)"), compute_order)  # hit
+"""
+
+from collections import OrderedDict
+
+from sympy import Symbol, preorder_traversal, srepr
+
+import budget
+
+# The maximal number of entries of a memo.
+DEFAULT_MAX_ENTRIES = 256
+
+CANONICAL_PREFIX = "__memo_"
+
+
+def canonical_renaming(expr, fixed_symbols):
+    """
+    :param expr: SymPy expression or immutable matrix
+    :param fixed_symbols: Symbols which are not renamed
+    :return: Tuple of the canonical expression and the dictionary which maps the canonical symbols onto the original
+    ones
+    """
+    fixed_symbols = set(fixed_symbols)
+    renaming = OrderedDict()
+    for node in preorder_traversal(expr):
+        if node.is_Symbol and node not in fixed_symbols and node not in renaming:
+            renaming[node] = Symbol(CANONICAL_PREFIX + str(len(renaming)))
+
+    canonical_expr = expr.xreplace(renaming)
+    return canonical_expr, dict((canonical, original) for original, canonical in renaming.items())
+
+
+def rename(value, renaming):
+    """
+    Applies the renaming to a computation result, which can be a SymPy object, a list, a tuple, a dictionary or a
+    combination of them. All other values are returned unchanged.
+    """
+    if isinstance(value, list):
+        return [rename(item, renaming) for item in value]
+    if isinstance(value, tuple):
+        return tuple(rename(item, renaming) for item in value)
+    if isinstance(value, dict):
+        return dict((rename(key, renaming), rename(item, renaming)) for key, item in value.items())
+    if hasattr(value, "xreplace"):
+        return value.xreplace(renaming)
+    return value
+
+
+class RenamingMemo(object):
+    """
+    Memoizes a computation on SymPy expressions up to a renaming of their free symbols.
+    """
+
+    def __init__(self, fixed_symbols=(), max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        :param fixed_symbols: Symbols which are not renamed, e.g. the time `t`
+        :param max_entries: Maximal number of stored results
+        """
+        self.fixed_symbols = list(fixed_symbols)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, expr, compute):
+        """
+        :param expr: Argument of the computation, a SymPy expression or immutable matrix
+        :param compute: Function which computes the result for an argument. It must not depend on the names of the
+        free symbols of the argument.
+        :return: The result of `compute(expr)`
+        """
+        canonical_expr, renaming = canonical_renaming(expr, self.fixed_symbols)
+        key = srepr(canonical_expr)
+
+        if key in self.entries:
+            self.hits += 1
+            result, strategies = self.entries.pop(key)
+            for strategy in strategies:
+                budget.record_strategy(strategy)
+        else:
+            self.misses += 1
+            recorded = dict(budget.statistics)
+            result = compute(canonical_expr)
+            strategies = [strategy for strategy in budget.STRATEGIES
+                          for _ in range(budget.statistics[strategy] - recorded[strategy])]
+            while len(self.entries) >= self.max_entries:
+                self.entries.popitem(last=False)
+        self.entries[key] = (result, strategies)  # (re)inserted as the most recently used entry
+
+        return rename(result, renaming)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
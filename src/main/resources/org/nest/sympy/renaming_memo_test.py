@@ -0,0 +1,71 @@
+import unittest
+
+from sympy import symbols
+from sympy.parsing.sympy_parser import parse_expr
+
+import budget
+from renaming_memo import RenamingMemo
+from shapes import ShapeFunction
+
+t = symbols("t")
+
+
+class TestRenamingMemo(unittest.TestCase):
+
+    def test_renamed_expression_is_a_hit(self):
+        testant = RenamingMemo(fixed_symbols=[t])
+        computations = []
+
+        def compute(expr):
+            computations.append(expr)
+            return [expr.diff(t), 2]
+
+        self.assertEqual([parse_expr("-exp(-t/tau_syn_in)/tau_syn_in"), 2],
+                         testant.lookup(parse_expr("exp(-t/tau_syn_in)"), compute))
+        self.assertEqual([parse_expr("-exp(-t/tau_syn_ex)/tau_syn_ex"), 2],
+                         testant.lookup(parse_expr("exp(-t/tau_syn_ex)"), compute))
+        self.assertEqual(1, len(computations))
+        self.assertEqual((1, 1), (testant.hits, testant.misses))
+
+        # the fixed symbol `t` is not renamed
+        testant.lookup(parse_expr("exp(-tau/t)"), compute)
+        self.assertEqual(2, testant.misses)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        testant = RenamingMemo(max_entries=2)
+        for definition in ["a", "a + 1", "a", "a + 2"]:
+            testant.lookup(parse_expr(definition), lambda expr: expr)
+        self.assertEqual(2, len(testant.entries))
+
+        self.assertEqual((1, 3), (testant.hits, testant.misses))
+
+        # `a` was used more recently than `a + 1`
+        testant.lookup(parse_expr("a"), lambda expr: expr)
+        self.assertEqual(2, testant.hits)
+        testant.lookup(parse_expr("a + 1"), lambda expr: expr)
+        self.assertEqual(4, testant.misses)
+
+    def test_degraded_strategy_is_recorded_on_hit(self):
+        testant = RenamingMemo()
+
+        def degraded_compute(expr):
+            budget.record_strategy("cancel")
+            return expr
+
+        budget.reset_statistics()
+        testant.lookup(parse_expr("a + 1"), degraded_compute)
+        budget.reset_statistics()
+        testant.lookup(parse_expr("b + 1"), degraded_compute)
+        self.assertEqual(1, testant.hits)
+        self.assertEqual("cancel", budget.weakest_strategy())
+        budget.reset_statistics()
+
+    def test_shape_analysis_is_reused(self):
+        shape_inh = ShapeFunction("I_in", "(e/tau_syn_in) * t * exp(-t/tau_syn_in)")
+        shape_exc = ShapeFunction("I_ex", "(e/tau_syn_ex) * t * exp(-t/tau_syn_ex)")
+        self.assertEqual([parse_expr("-1/tau_syn_in**2"), parse_expr("-2/tau_syn_in")], shape_inh.derivative_factors)
+        self.assertEqual([parse_expr("-1/tau_syn_ex**2"), parse_expr("-2/tau_syn_ex")], shape_exc.derivative_factors)
+        self.assertEqual([0, parse_expr("e/tau_syn_ex")], shape_exc.initial_values)
+
+if __name__ == '__main__':
+    unittest.main()
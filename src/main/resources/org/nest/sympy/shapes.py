@@ -11,16 +11,21 @@
    with a chosen name of the shape and it's mathematical discription;
    it checks for any given fuction of positive t, i.e. the shape, if
    it satisfies a linear homogeneous ODE of order 1,...,10:
-    
+
    Example:
    ========
-    
-   shape_alpha = ShapeFunction("shape_alpha", "e / tau * t * exp(-t / tau)") 
-    
+
+   shape_alpha = ShapeFunction("shape_alpha", "e / tau * t * exp(-t / tau)")
+
    The class will provide the properties name, order,
    nestml_ode_form, derivative factors and intitial_values.
-    
-   in this example: 
+
+   Shapes which are sums of terms `t**k * exp(lambda * t)` (exponential,
+   alpha and beta functions) are recognized structurally: the ODE is
+   read off the characteristic polynomial `prod (x - lambda)**(k + 1)`.
+   Only other shapes are passed to the generic search for the ODE.
+
+   in this example:
    'name' will be 'shape_alpha' as a symbolic expression
     
    'order' is 2, as the function above satisfies a homogeneos ODE of order 2
@@ -54,10 +59,15 @@
 """
 
 from sympy.parsing.sympy_parser import parse_expr
-from sympy import *
+from sympy import Basic, Dummy, Mul, Poly, det, diff, exp, expand, factorial, roots, symbols
 
 from sympy.matrices import zeros
 
+from budget import simplify_within_budget
+from parsed_input import derivative_name
+from renaming_memo import RenamingMemo
+from zero_oracle import is_zero
+
 # Define constants:
 # When we are checking if a function satisfies a linear homogeneous ODE
 # of some order n we will check from n=0 to n=MAX_ORDERS. 
@@ -74,8 +84,168 @@ MAX_TRIES = 100
 # shape'=derivative_factor*shape in case shape satisfies such an ODE.
 derivative_factor, t = symbols("derivative_factor, t")
 
+# The analysis of a shape doesn't depend on the names of its parameters. Shapes which only differ in them, e.g. `g_in`
+# and `g_ex`, are analyzed once per process.
+shape_analyses = RenamingMemo(fixed_symbols=[t])
+
+
+def exp_polynomial_terms(shape_expr):
+    """
+    Decomposes a function of `t` into a sum of terms `coefficient * t**power * exp(eigenvalue * t)` where neither the
+    coefficient nor the eigenvalue depend on `t`.
+    :param shape_expr: The shape as a function of `t`
+    :return: List of (eigenvalue, {power: coefficient}) tuples, one for every distinct eigenvalue, or None if the
+    shape is not of this form
+    """
+    expansion = _expand_exp_polynomial(shape_expr)
+    if expansion is None:
+        return None
+
+    groups = []
+    for coefficient, power, eigenvalue in expansion:
+        for group_eigenvalue, coefficients in groups:
+            if is_zero(group_eigenvalue - eigenvalue):
+                coefficients[power] = coefficients.get(power, 0) + coefficient
+                break
+        else:
+            groups.append((eigenvalue, {power: coefficient}))
+
+    # terms which cancel each other must not increase the order of the ODE
+    result = []
+    for eigenvalue, coefficients in groups:
+        coefficients = dict((power, c) for power, c in coefficients.items() if not is_zero(c))
+        if coefficients:
+            result.append((eigenvalue, coefficients))
+
+    return result if result else None
+
+
+def _expand_exp_polynomial(expr):
+    """
+    Expands the expression into a list of (coefficient, power, eigenvalue) tuples. In contrast to `expand` factors
+    which don't depend on `t`, e.g. the normalization of a beta function, are not multiplied into the exponentials.
+    :return: The list of tuples or None if the expression is not an exponential polynomial
+    """
+    if not expr.has(t):
+        return [(expr, 0, 0)]
+    if expr == t:
+        return [(1, 1, 0)]
+
+    if expr.func == exp:
+        rate = diff(expr.args[0], t)
+        if rate.has(t):
+            return None
+        # the part of the exponent which doesn't depend on `t` belongs to the coefficient
+        return [(exp(expand(expr.args[0] - rate * t)), 0, rate)]
+
+    if expr.is_Add:
+        result = []
+        for arg in expr.args:
+            terms = _expand_exp_polynomial(arg)
+            if terms is None:
+                return None
+            result += terms
+        return result
+
+    if expr.is_Mul or (expr.is_Pow and expr.exp.is_Integer and expr.exp > 0):
+        factors = expr.args if expr.is_Mul else [expr.base] * int(expr.exp)
+        result = [(1, 0, 0)]
+        for factor in factors:
+            terms = _expand_exp_polynomial(factor)
+            if terms is None:
+                return None
+            result = [(c1 * c2, k1 + k2, l1 + l2) for c1, k1, l1 in result for c2, k2, l2 in terms]
+        return result
+
+    if expr.is_Pow and expr.base.func == exp:
+        return _expand_exp_polynomial(exp(expr.base.args[0] * expr.exp))
+
+    return None
+
+
+def exp_polynomial_ode(terms):
+    """
+    Reads the linear homogeneous ODE off an exponential polynomial. A shape with the eigenvalues `lambda_i` of the
+    multiplicities `m_i` satisfies the ODE whose characteristic polynomial is `prod (x - lambda_i)**m_i`.
+    :param terms: Decomposition of the shape as computed by `exp_polynomial_terms`
+    :return: Tuple of the order, the derivative factors, the initial values and the list of (eigenvalue, multiplicity)
+    tuples of the ODE
+    """
+    x = Dummy("x")
+    eigenvalues = [(eigenvalue, max(coefficients.keys()) + 1) for eigenvalue, coefficients in terms]
+    order = sum(multiplicity for _, multiplicity in eigenvalues)
+
+    characteristic_polynomial = Poly(Mul(*[(x - eigenvalue) ** multiplicity
+                                           for eigenvalue, multiplicity in eigenvalues]), x)
+    derivative_factors = [-characteristic_polynomial.coeff_monomial(x ** i) for i in range(order)]
+
+    # The i-th derivative of `t**k * exp(lambda * t)` at t = 0 is `i! / (i - k)! * lambda**(i - k)` for i >= k and 0
+    # otherwise.
+    initial_values = []
+    for i in range(order):
+        initial_value = 0
+        for eigenvalue, coefficients in terms:
+            for power, coefficient in coefficients.items():
+                if i >= power:
+                    initial_value += coefficient * factorial(i) / factorial(i - power) * eigenvalue ** (i - power)
+        initial_values.append(initial_value)
+
+    return order, derivative_factors, initial_values, eigenvalues
+
+
+class Shape(object):
+    """
+    The state variables of a shape which satisfies a linear homogeneous ODE of the order `order`: the shape `name` and
+    its derivatives `name__1`, ..., `name__<order-1>`. A subclass defines `name`, `order` and `initial_values`.
+    """
+
+    def additional_shape_state_variables(self):
+        """
+
+        :return: Creates list with state shapes variables in the `reversed` order, e.g. [I'', I', I]
+        """
+        result = []
+        for order in range(0, self.order):
+            if order > 0:
+                result = [(str(self.name) + "__" + str(order))] + result
+            else:
+                result = [str(self.name)] + result
+        return result
+
+    def add_update_to_shape_state_variable(self, shape_state_variable, shape_state_variable_update):
+        self.updates_to_state_shape_variables = [{str(shape_state_variable): str(shape_state_variable_update)}] + self.updates_to_state_shape_variables
+
+    def get_updates_to_shape_state_variables(self):
+        result = []
+        if self.order > 0:  # FIX ME
+
+            for entry_map in self.updates_to_state_shape_variables:
+                # by construction, there is only one value in the `entry_map`
+                for shape_state_variable, shape_state_variable_update in entry_map.iteritems():
+                    result.append({"__tmp__" + shape_state_variable: shape_state_variable_update})
+
+            for entry_map in self.updates_to_state_shape_variables:
+                # by construction, there is only one value in the `entry_map`
+                for shape_state_variable, shape_state_variable_update in entry_map.iteritems():
+                    result.append({shape_state_variable: "__tmp__" + shape_state_variable})
+
+        else:
+            result = self.updates_to_state_shape_variables
+
+        return result
+
+    def get_initial_values(self, weight=1):
+        result = []
+        for idx, initial_value in enumerate(self.initial_values):
+            if idx > 0:
+                p = {str(self.name) + "__" + str(idx): str(weight * initial_value)}
+            else:
+                p = {str(self.name): str(weight * initial_value)}
+            result = [p] + result
+        return result
+
 
-class ShapeFunction(object):
+class ShapeFunction(Shape):
     """
     Here we provide a class, `ShapeFunction` that can be called
     with a chosen name of the shape and its mathematical description;
@@ -111,9 +281,66 @@ class ShapeFunction(object):
 
         self.name = parse_expr(name)
 
-        # convert the shape function from a string to a symbolic expression
-        self.shape_expr = parse_expr(function_def)
+        # convert the shape function from a string to a symbolic expression unless it is already parsed
+        self.shape_expr = function_def if isinstance(function_def, Basic) else parse_expr(function_def)
+
+        # `eigenvalues` is the list of (eigenvalue, multiplicity) tuples of the ODE or None if the shape is no
+        # exponential polynomial and its ODE was found by the generic search.
+        order, derivative_factors, initial_values, self.eigenvalues = shape_analyses.lookup(self.shape_expr,
+                                                                                             ShapeFunction.analyze)
+
+        self.order = order
+        self.nestml_ode_form = []
+
+        for cur_order in range(0, order-1):
+            if cur_order > 0:
+                self.nestml_ode_form.append({name + "__" + str(cur_order): name + "__" + str(cur_order + 1)})
+            else:
+                self.nestml_ode_form.append({name: name + "__1"})
+        # Compute the right and left hand side of the ODE that 'shape' satisfies
+        rhs_str = []
 
+        for k in range(order):
+            if k > 0:
+                rhs_str.append("{} * {}__{}".format(derivative_factors[k], name, str(k)))
+
+            else:
+                rhs_str.append("{} * {}".format(derivative_factors[k], name))
+
+        rhs = " + ".join(rhs_str)
+        if order == 1:
+            lhs = name
+        else:
+            lhs = name + "__" + str(order-1)
+
+        self.nestml_ode_form.append({lhs: rhs})
+        self.derivative_factors = derivative_factors
+        self.initial_values = initial_values
+        self.updates_to_state_shape_variables = []  # must be filled after the propagator matrix is computed
+
+    @staticmethod
+    def analyze(shape_expr):
+        """
+        Finds the linear homogeneous ODE of the lowest order which the shape satisfies. Almost all shapes are sums of
+        terms `t**k * exp(lambda * t)`, their ODE is read off the expression directly.
+        :param shape_expr: The shape as a function of `t`
+        :return: Tuple of the order, the derivative factors, the initial values and the eigenvalues of the ODE
+        """
+        terms = exp_polynomial_terms(shape_expr)
+        if terms is not None:
+            return exp_polynomial_ode(terms)
+
+        order, derivative_factors, initial_values = ShapeFunction.find_ode_by_search(shape_expr)
+        return order, derivative_factors, initial_values, None
+
+    @staticmethod
+    def find_ode_by_search(shape_expr):
+        """
+        Searches for the linear homogeneous ODE of the lowest order which the shape satisfies by evaluating its
+        derivatives at natural numbers.
+        :param shape_expr: The shape as a function of `t`
+        :return: Tuple of the order, the derivative factors and the initial values of the ODE
+        """
         # found_ode is true if we find a linear homogeneous ODE that
         # `shape` satisfies
         found_ode = False
@@ -121,7 +348,7 @@ class ShapeFunction(object):
         # First we check if `shape` satisfies a linear homogeneous ODE
         # of order 1. `derivatives` is a list of all derivatives of `shape`
         # up to the order we are checking (which we just call 'order')
-        derivatives = [self.shape_expr, diff(self.shape_expr, t)]
+        derivatives = [shape_expr, diff(shape_expr, t)]
 
         # If `diff_rhs_lhs`, which is here shape'-derivative_factors*shape
         # equals 0 for some 'derivative_factors', 'shape' satisfies a
@@ -144,7 +371,7 @@ class ShapeFunction(object):
 
         diff_rhs_lhs = derivatives[1] - derivative_factors[0] * derivatives[0]
 
-        if simplify(diff_rhs_lhs) == sympify(0):
+        if is_zero(diff_rhs_lhs):
             found_ode = True
 
         # Initialize the (potential) order of the differential equation.
@@ -218,7 +445,7 @@ class ShapeFunction(object):
                 # sum up derivatives 'shapes' times their potential 'derivative_factors'
                 diff_rhs_lhs -= derivative_factors[k] * derivatives[k]
             diff_rhs_lhs += derivatives[order]
-            if simplify(diff_rhs_lhs) == sympify(0):
+            if is_zero(diff_rhs_lhs):
                 found_ode = True
                 break
 
@@ -226,82 +453,10 @@ class ShapeFunction(object):
         if not found_ode:
             raise Exception("Shape does not satisfy any ODE of order <= {}".format(MAX_ORDER))
 
-        self.order = order
-        self.nestml_ode_form = []
-
-        for cur_order in range(0, order-1):
-            if cur_order > 0:
-                self.nestml_ode_form.append({name + "__" + str(cur_order): name + "__" + str(cur_order + 1)})
-            else:
-                self.nestml_ode_form.append({name: name + "__1"})
-        # Compute the right and left hand side of the ODE that 'shape' satisfies
-        rhs_str = []
-
-        for k in range(order):
-            if k > 0:
-                rhs_str.append("{} * {}__{}".format(simplify(derivative_factors[k]), name, str(k)))
-
-            else:
-                rhs_str.append("{} * {}".format(simplify(derivative_factors[k]), name))
-
-        rhs = " + ".join(rhs_str)
-        if order == 1:
-            lhs = name
-        else:
-            lhs = name + "__" + str(order-1)
-
-        self.nestml_ode_form.append({lhs: rhs})
-        self.derivative_factors = list(simplify(derivative_factors))
-        self.initial_values = [x.subs(t, 0) for x in derivatives[:-1]]
-        self.updates_to_state_shape_variables = []  # must be filled after the propagator matrix is computed
+        return order, list(simplify_within_budget(derivative_factors)), [x.subs(t, 0) for x in derivatives[:-1]]
 
-    def additional_shape_state_variables(self):
-        """
 
-        :return: Creates list with state shapes variables in the `reversed` order, e.g. [I'', I', I]
-        """
-        result = []
-        for order in range(0, self.order):
-            if order > 0:
-                result = [(str(self.name) + "__" + str(order))] + result
-            else:
-                result = [str(self.name)] + result
-        return result
-
-    def add_update_to_shape_state_variable(self, shape_state_variable, shape_state_variable_update):
-        self.updates_to_state_shape_variables = [{str(shape_state_variable): str(shape_state_variable_update)}] + self.updates_to_state_shape_variables
-
-    def get_updates_to_shape_state_variables(self):
-        result = []
-        if self.order > 0:  # FIX ME
-
-            for entry_map in self.updates_to_state_shape_variables:
-                # by construction, there is only one value in the `entry_map`
-                for shape_state_variable, shape_state_variable_update in entry_map.iteritems():
-                    result.append({"__tmp__" + shape_state_variable: shape_state_variable_update})
-
-            for entry_map in self.updates_to_state_shape_variables:
-                # by construction, there is only one value in the `entry_map`
-                for shape_state_variable, shape_state_variable_update in entry_map.iteritems():
-                    result.append({shape_state_variable: "__tmp__" + shape_state_variable})
-
-        else:
-            result = self.updates_to_state_shape_variables
-
-        return result
-
-    def get_initial_values(self):
-        result = []
-        for idx, initial_value in enumerate(self.initial_values):
-            if idx > 0:
-                p = {str(self.name) + "__" + str(idx): str(initial_value)}
-            else:
-                p = {str(self.name): str(initial_value)}
-            result = [p] + result
-        return result
-
-
-class ShapeODE(object):
+class ShapeODE(Shape):
     """
     Provides a class 'ShapeODE'. An instance of `ShapeODE` is
     defined with the name of the shape (i.e a function of `t`
@@ -311,18 +466,60 @@ class ShapeODE(object):
         
     Canonical calculation of the properties, `order`, `name`,
     `initial_values` and the system of ODEs in matrix form are made.
+
+    The shape must be the last variable of the system, it is the
+    variable which enters the ODE of the model (see
+    `PropagatorCalculator.shape_system`). `from_ode` creates the
+    system of a shape ODE of a higher order in this form.
     """
     def __init__(self, name, ode_sys_var, ode_sys_rhs, initial_values):
 
         self.name = parse_expr(name)
 
         self.ode_sys_var = [symbols(i) for i in ode_sys_var]
-        self.ode_sys_rhs = [parse_expr(i) for i in ode_sys_rhs]
+        self.ode_sys_rhs = [i if isinstance(i, Basic) else parse_expr(i) for i in ode_sys_rhs]
         self.order = len(initial_values)
-        self.initial_values = [parse_expr(i) for i in initial_values]
+        self.initial_values = [i if isinstance(i, Basic) else parse_expr(i) for i in initial_values]
+        self.updates_to_state_shape_variables = []  # must be filled after the propagator matrix is computed
 
         self.matrix = zeros(self.order)
 
         for i, rhs in enumerate(self.ode_sys_rhs):
             for j, var in enumerate(self.ode_sys_var):
                 self.matrix[i, j] = diff(rhs, var)
+
+        # the eigenvalues of the system matrix (repeated according to their multiplicity) or None if the
+        # characteristic polynomial cannot be solved
+        x = Dummy("x")
+        found = roots(self.matrix.charpoly(x).as_expr(), x)
+        if sum(found.values()) == self.order:
+            self.eigenvalues = [(eigenvalue, multiplicity) for eigenvalue, multiplicity in found.items()]
+        else:
+            self.eigenvalues = None
+
+    @staticmethod
+    def from_ode(name, order, rhs, initial_values):
+        """
+        :param name: Name of the shape
+        :param order: Order of the ODE, e.g. 2 for `g'' = -g/tau**2 - 2*g'/tau`
+        :param rhs: Right hand side of the ODE in which the derivatives are named by `derivative_name`, e.g. `__D_g`
+        :param initial_values: Initial values of the shape and its derivatives, from the lowest derivative to the
+        highest
+        :return: `ShapeODE` with the state variables [g__<order-1>, ..., g__1, g] in which `g__k` is the k-th derivative
+        """
+        derivatives = dict((symbols(derivative_name(name, k)), symbols(name + "__" + str(k))) for k in range(1, order))
+        ode_sys_var = [name + "__" + str(k) for k in range(order - 1, 0, -1)] + [name]
+        ode_sys_rhs = [rhs.xreplace(derivatives)] + [symbols(variable) for variable in ode_sys_var[:-1]]
+        return ShapeODE(name, ode_sys_var, ode_sys_rhs, initial_values)
+
+    def is_linear(self):
+        """
+        :return: True iff the right hand sides are linear homogeneous in the variables of the system with constant
+        coefficients, i.e. the shape can be propagated exactly
+        """
+        for i, rhs in enumerate(self.ode_sys_rhs):
+            if any(self.matrix[i, j].has(t, *self.ode_sys_var) for j in range(self.order)):
+                return False
+            if not is_zero(rhs - sum(self.matrix[i, j] * var for j, var in enumerate(self.ode_sys_var))):
+                return False
+        return True
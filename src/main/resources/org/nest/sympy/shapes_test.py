@@ -1,5 +1,7 @@
 import unittest
 
+from sympy import diff, simplify, symbols
+
 from shapes import ShapeFunction
 
 
@@ -12,5 +14,44 @@ class TestThatShapeIsConvertedToODEs(unittest.TestCase):
         print(shape_inh.get_ode_form())
         print(shape_exc.get_ode_form())
 
+
+class TestStructuralShapeClassification(unittest.TestCase):
+
+    def assertSatisfiesOde(self, shape):
+        t = symbols("t")
+        residual = diff(shape.shape_expr, t, shape.order)
+        for i, factor in enumerate(shape.derivative_factors):
+            residual -= factor * diff(shape.shape_expr, t, i)
+        self.assertEqual(0, simplify(residual))
+
+        for i, initial_value in enumerate(shape.initial_values):
+            self.assertEqual(0, simplify(diff(shape.shape_expr, t, i).subs(t, 0) - initial_value))
+
+    def test_alpha(self):
+        testant = ShapeFunction("I_in", "(e/tau_syn_in) * t * exp(-t/tau_syn_in)")
+        self.assertEqual(2, testant.order)
+        self.assertEqual([(-1 / symbols("tau_syn_in"), 2)], testant.eigenvalues)
+        self.assertSatisfiesOde(testant)
+
+    def test_beta(self):
+        testant = ShapeFunction("g_ex", "(exp(-t/tau_decay) - exp(-t/tau_rise)) / (tau_decay - tau_rise)")
+        self.assertEqual(2, testant.order)
+        self.assertSatisfiesOde(testant)
+
+    def test_higher_order(self):
+        testant = ShapeFunction("I", "(1 + t)**2 * exp(-t/tau) / C + exp(-(t - d)/tau_2)")
+        self.assertEqual(4, testant.order)
+        self.assertSatisfiesOde(testant)
+
+    def test_cancelling_terms(self):
+        testant = ShapeFunction("I", "t * exp(-t/tau) + exp(-t/tau) - exp(-t*tau/tau**2)")
+        self.assertEqual(2, testant.order)
+
+    def test_fallback_to_search(self):
+        testant = ShapeFunction("I", "sin(t)")
+        self.assertIsNone(testant.eigenvalues)
+        self.assertEqual(2, testant.order)
+        self.assertSatisfiesOde(testant)
+
 if __name__ == '__main__':
     unittest.main()
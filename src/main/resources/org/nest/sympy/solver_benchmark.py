@@ -0,0 +1,378 @@
+"""
+   This script benchmarks `OdeAnalyzer.compute_solution` on the
+   equations blocks of the models library and on synthetic stress cases.
+
+   Every neuron in `models/*.nestml` whose equations block is passed to
+   the solver by the frontend becomes a `SolverInput` fixture: the
+   shapes, the functions, the ODEs, the default values of the parameters,
+   internals and initial values and the initial values of the shapes which
+   are defined by ODEs. Like in the frontend, `convolve(shape, spikes)`
+   is replaced by the shape. The synthetic stress cases contain higher
+   order shapes, many receptors, long chains of functions and a system
+   of ODEs.
+
+   Every fixture is solved several times in a fresh process without the
+   in-process memos. For every fixture the median and the 95th percentile
+   of the time, the peak resident memory of the process, the solver, the
+   strategy and the size of the emitted propagator expressions (see
+   `count_ops`) are reported. The results are stored as JSON. In the
+   compare mode, the results are checked against a stored baseline and
+   regressions are reported.
+
+   Example:
+   ========
+
+   python solver_benchmark.py --output baseline.json
+   python solver_benchmark.py --output current.json --compare baseline.json
+
+   The second call exits with the status 1 if a fixture became slower by
+   more than the tolerance, if its propagators grew or if its solver
+   changed.
+"""
+
+import argparse
+import glob
+import json
+import math
+import multiprocessing
+import os
+import platform
+import re
+import sys
+import time
+from collections import OrderedDict
+
+import sympy
+from sympy import count_ops
+from sympy.parsing.sympy_parser import parse_expr
+
+DEFAULT_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), *([os.pardir] * 6 + ["models"]))
+DEFAULT_REPETITIONS = 5
+
+# A fixture is a regression if its median time grew by more than the relative tolerance and by more than the absolute
+# tolerance in seconds. The absolute tolerance suppresses the noise of very fast fixtures.
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_ABSOLUTE_TOLERANCE = 0.05
+
+NEURON_PATTERN = re.compile(r"^\s*neuron\s+(\w+)\s*:\s*$")
+SHAPE_PATTERN = re.compile(r"^shape\s+(\w+'*)\s*=\s*(.+)$")
+FUNCTION_PATTERN = re.compile(r"^(?:recordable\s+)?function\s+(\w+)\s+[^=]*?=\s*(.+)$")
+EQUATION_PATTERN = re.compile(r"^(\w+'+)\s*=\s*(.+)$")
+CONVOLVE_PATTERN = re.compile(r"convolve\(\s*(\w+)\s*,\s*\w+\s*\)")
+DECLARATION_PATTERN = re.compile(r"^(?:recordable\s+|function\s+)*((?:\w+'*\s*,\s*)*\w+'*)\s+([^=]+?)\s*=\s*(.+)$")
+# a number followed by a unit, e.g. `10ms`, is printed as a product by the frontend, e.g. `10 * ms`
+UNIT_LITERAL_PATTERN = re.compile(r"(?<![\w.])(\d+\.?\d*(?:[eE][-+]?\d+)?)\s*(?![eE][-+]?\d)([A-Za-z_]\w*)")
+
+SOLVER_BLOCKS = ["parameters", "internals", "initial_values", "equations"]
+
+
+def neuron_blocks(model_source):
+    """
+    :param model_source: Content of a NESTML file
+    :return: List of (neuron name, dictionary which maps the names of the blocks in `SOLVER_BLOCKS` onto the lists of
+    their statements) tuples
+    """
+    model_source = re.sub(r"/\*.*?\*/", "", model_source, flags=re.DOTALL)
+
+    neurons = []
+    block = None
+    statements = None
+    for line in model_source.splitlines():
+        line = line.split("#", 1)[0].strip().rstrip(";")
+        match = NEURON_PATTERN.match(line)
+        if match:
+            neurons.append((match.group(1), OrderedDict()))
+        elif statements is None and line.endswith(":") and line[:-1] in SOLVER_BLOCKS and neurons:
+            block = line[:-1]
+            statements = []
+        elif statements is not None:
+            if line == "end":
+                neurons[-1][1].setdefault(block, []).extend(statements)
+                statements = None
+            elif line:
+                statements.append(line)
+    return neurons
+
+
+def equations_blocks(model_source):
+    """
+    :param model_source: Content of a NESTML file
+    :return: List of (neuron name, list of the statements of its equations block) tuples
+    """
+    return [(neuron, blocks["equations"]) for neuron, blocks in neuron_blocks(model_source) if "equations" in blocks]
+
+
+def normalize_literals(expression):
+    """
+    :return: The expression in which the numbers with units are printed like in the frontend, e.g. `1.0 * ms` instead
+    of `1.0ms`
+    """
+    return UNIT_LITERAL_PATTERN.sub(r"\1 * \2", expression)
+
+
+def declarations(statements):
+    """
+    :param statements: Statements of a parameters, internals or initial values block
+    :return: List of (variable, expression) tuples of the declarations with a default value. Vectors are skipped, since
+    they have no scalar value.
+    """
+    result = []
+    for statement in statements:
+        declaration = DECLARATION_PATTERN.match(statement)
+        if declaration is None or "[" in declaration.group(2):
+            continue
+        expression = normalize_literals(declaration.group(3))
+        result += [(variable.strip(), expression) for variable in declaration.group(1).split(",")]
+    return result
+
+
+def solver_input(blocks):
+    """
+    Creates the `SolverInput` which the frontend passes to the solver for a neuron.
+    :param blocks: Dictionary which maps the names of the blocks of the neuron onto their statements, see
+    `neuron_blocks`
+    :return: `SolverInput` as a dictionary or None if the equations block isn't passed to the solver
+    """
+    shapes = []
+    functions = []
+    equations = []
+    for statement in blocks.get("equations", []):
+        statement = normalize_literals(CONVOLVE_PATTERN.sub(r"\1", statement))
+        shape = SHAPE_PATTERN.match(statement)
+        function = FUNCTION_PATTERN.match(statement)
+        equation = EQUATION_PATTERN.match(statement)
+        if shape:
+            shapes.append(shape.groups())
+        elif function:
+            functions.append("{} = {}".format(*function.groups()))
+        elif equation:
+            equations.append("{} = {}".format(*equation.groups()))
+
+    # like `EquationsBlockProcessor`: a block with shapes and ODEs is solved with the default values of the neuron,
+    # a block with shapes only if none of them is defined by an ODE
+    shape_odes = [name.rstrip("'") for name, _ in shapes if name.endswith("'")]
+    if not shapes or (not equations and shape_odes):
+        return None
+
+    shapes = ["{} = {}".format(name, definition) for name, definition in shapes]
+    if not equations:
+        return OrderedDict([("functions", []), ("shapes", shapes), ("ode", None), ("odes", []),
+                            ("parameters", []), ("initial_values", [])])
+
+    parameters = []
+    for block in ["parameters", "internals", "initial_values"]:
+        parameters += ["{} = {}".format(*declaration) for declaration in declarations(blocks.get(block, []))]
+    initial_values = ["{} = {}".format(variable, expression)
+                      for variable, expression in declarations(blocks.get("initial_values", []))
+                      if variable.rstrip("'") in shape_odes]
+    return OrderedDict([("functions", functions), ("shapes", shapes),
+                        ("ode", equations[0] if len(equations) == 1 else None), ("odes", equations),
+                        ("parameters", parameters), ("initial_values", initial_values)])
+
+
+def model_fixtures(models_dir=DEFAULT_MODELS_DIR):
+    """
+    :return: Dictionary which maps the neuron names onto the JSON serialization of their `SolverInput`
+    """
+    fixtures = OrderedDict()
+    for model_path in sorted(glob.glob(os.path.join(models_dir, "*.nestml"))):
+        with open(model_path, "r") as model_file:
+            for neuron, blocks in neuron_blocks(model_file.read()):
+                fixture = solver_input(blocks)
+                if fixture is not None:
+                    fixtures[neuron] = json.dumps(fixture)
+    return fixtures
+
+
+def synthetic_fixtures():
+    """
+    :return: Dictionary which maps the names of the stress cases onto the JSON serialization of their `SolverInput`
+    """
+    fixtures = OrderedDict()
+    for order in [3, 4]:
+        fixtures["synthetic_order_{}_shape".format(order)] = json.dumps({
+            "shapes": ["I_shape = t**{} * exp(-t/tau_syn) / {}".format(order - 1, order - 1)],
+            "ode": "V_m' = -V_m/tau_m + (I_shape + I_e)/C_m"})
+
+    receptors = 8
+    fixtures["synthetic_{}_receptors".format(receptors)] = json.dumps({
+        "shapes": ["I_{0} = (e/tau_{0}) * t * exp(-t/tau_{0})".format(i) for i in range(receptors)],
+        "ode": "V_m' = -V_m/tau_m + ({} + I_e)/C_m".format(" + ".join("I_{}".format(i) for i in range(receptors)))})
+
+    chain = 20
+    fixtures["synthetic_function_chain_{}".format(chain)] = json.dumps({
+        "functions": ["F_0 = I_ex - I_in"] +
+                     ["F_{0} = F_{1} - g_{0} * (V_m - E_{0})".format(i, i - 1) for i in range(1, chain)],
+        "shapes": ["I_in = exp(-t/tau_syn_in)", "I_ex = exp(-t/tau_syn_ex)"],
+        "ode": "V_m' = (F_{} + I_e)/C_m".format(chain - 1)})
+
+    fixtures["synthetic_second_order_membrane"] = json.dumps({
+        "shapes": ["I_shape = (e/tau_syn) * t * exp(-t/tau_syn)"],
+        "odes": ["V_m'' = -2/tau_m * V_m' - V_m/tau_m**2 + (I_shape + I_e)/C_m"]})
+    return fixtures
+
+
+def propagator_size(output):
+    """
+    :param output: `SolverOutput` as a dictionary
+    :return: Number of operations in all propagator elements, common subexpressions and update instructions
+    """
+    expressions = []
+    for temporary in output.get("common_subexpressions") or []:
+        expressions += temporary.values()
+    for element in output.get("propagator_elements") or []:
+        expressions += element.values()
+    for instruction in output.get("ode_var_update_instructions") or []:
+        expressions.append(re.split(r"\+?=", instruction, 1)[1])
+    for update in output.get("updates_to_shape_state_variables") or []:
+        expressions += update.values()
+    return sum(count_ops(parse_expr(expression)) for expression in expressions)
+
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2 == 1:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def percentile(values, fraction):
+    """
+    :return: The nearest rank percentile of the values
+    """
+    ordered = sorted(values)
+    return ordered[max(0, int(math.ceil(fraction * len(ordered))) - 1)]
+
+
+def peak_memory_kb():
+    try:
+        import resource
+    except ImportError:  # windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_fixture(input_json, repetitions, connection):
+    """
+    Entry point of the benchmark process of one fixture. Sends a dictionary with the measurements or the error message
+    to the parent process.
+    """
+    try:
+        from OdeAnalyzer import OdeAnalyzer
+        from prop_matrix import propagators
+        from shapes import shape_analyses
+
+        times = []
+        output = None
+        for _ in range(repetitions):
+            # every repetition is measured without the results of previous repetitions
+            shape_analyses.clear()
+            propagators.clear()
+            start = time.time()
+            output = OdeAnalyzer.compute_solution(input_json)
+            times.append(time.time() - start)
+
+        output = json.loads(output) if output is not None else {}
+        connection.send({
+            "times": times,
+            "median": median(times),
+            "p95": percentile(times, 0.95),
+            "peak_memory_kb": peak_memory_kb(),
+            "solver": output.get("solver"),
+            "strategy": output.get("strategy"),
+            "propagator_size": propagator_size(output)})
+    except Exception as e:
+        connection.send({"error": str(e)})
+    connection.close()
+
+
+def run_benchmark(fixtures, repetitions=DEFAULT_REPETITIONS):
+    """
+    :param fixtures: Dictionary which maps fixture names onto `SolverInput` JSON serializations
+    :return: Dictionary with the environment and the measurements of every fixture
+    """
+    results = OrderedDict()
+    for name, input_json in fixtures.items():
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_run_fixture, args=(input_json, repetitions, sender))
+        process.start()
+        sender.close()
+        try:
+            results[name] = receiver.recv()
+        except EOFError:
+            results[name] = {"error": "the benchmark process terminated with the exit code {}".format(process.exitcode)}
+        process.join()
+        sys.stderr.write("{:<40} {}\n".format(name, results[name].get("median", results[name].get("error"))))
+
+    return OrderedDict([("python", platform.python_version()),
+                        ("sympy", sympy.__version__),
+                        ("repetitions", repetitions),
+                        ("results", results)])
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE, absolute_tolerance=DEFAULT_ABSOLUTE_TOLERANCE):
+    """
+    :param current: Result of `run_benchmark`
+    :param baseline: Stored result of `run_benchmark`
+    :return: List of messages, one for every regression
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or "error" in reference:
+            continue
+        if "error" in result:
+            regressions.append("{}: fails with '{}'".format(name, result["error"]))
+            continue
+
+        if result["median"] > reference["median"] * (1 + tolerance) and \
+                result["median"] - reference["median"] > absolute_tolerance:
+            regressions.append("{}: median time {:.3f} s, baseline {:.3f} s".format(
+                name, result["median"], reference["median"]))
+        if result["propagator_size"] > reference["propagator_size"]:
+            regressions.append("{}: propagator size {}, baseline {}".format(
+                name, result["propagator_size"], reference["propagator_size"]))
+        if result["solver"] != reference["solver"]:
+            regressions.append("{}: solver {}, baseline {}".format(name, result["solver"], reference["solver"]))
+    return regressions
+
+
+def print_report(benchmark):
+    print("{:<40} {:>10} {:>10} {:>12} {:>8} {:>10}".format(
+        "fixture", "median [s]", "p95 [s]", "memory [kB]", "size", "solver"))
+    for name, result in benchmark["results"].items():
+        if "error" in result:
+            print("{:<40} failed: {}".format(name, result["error"]))
+        else:
+            print("{:<40} {:>10.3f} {:>10.3f} {:>12} {:>8} {:>10}".format(
+                name, result["median"], result["p95"], result["peak_memory_kb"], result["propagator_size"],
+                result["solver"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the solver on the models library.")
+    parser.add_argument("--models", default=DEFAULT_MODELS_DIR, help="folder with the NESTML models")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS)
+    parser.add_argument("--no-synthetic", action="store_true", help="skip the synthetic stress cases")
+    parser.add_argument("--output", help="file where the results are stored as JSON")
+    parser.add_argument("--compare", help="file with the baseline results")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    fixtures = model_fixtures(args.models)
+    if not args.no_synthetic:
+        fixtures.update(synthetic_fixtures())
+
+    benchmark = run_benchmark(fixtures, args.repetitions)
+    print_report(benchmark)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(benchmark, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            regressions = compare(benchmark, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,103 @@
+import json
+import unittest
+
+from solver_benchmark import compare, equations_blocks, median, model_fixtures, neuron_blocks, percentile, \
+    run_benchmark, solver_input
+
+model = """
+/*
+  neuron like dynamics interacting by point events is described in
+*/
+neuron iaf_psc_exp_neuron:
+  equations:
+    shape I_shape_in = exp(-1/tau_syn_in*t)
+    shape I_shape_ex = exp(-1/tau_syn_ex*t)
+    # the synaptic current
+    function  I_syn mV = (convolve(I_shape_in, in_spikes) + convolve(I_shape_ex, ex_spikes) + I_e + currents)
+    V_abs' = -V_abs/tau_m + (I_syn/C_m) *nS
+  end
+end
+
+neuron iaf_psc_exp_implicit:
+  initial_values:
+    V_abs mV = 0mV
+    I_shape_in pA = 1pA
+  end
+
+  equations:
+    shape I_shape_in' = -I_shape_in/tau_syn_in
+    V_abs' = -V_abs/tau_m + (convolve(I_shape_in, in_spikes)/C_m) *nS
+  end
+
+  parameters:
+    tau_m, tau_syn_in ms = 10ms
+    tau_syn ms[receptors] = 2ms
+    C_m pF = 250pF
+  end
+end
+"""
+
+
+class TestSolverBenchmark(unittest.TestCase):
+
+    def test_equations_blocks(self):
+        testant = equations_blocks(model)
+        self.assertEqual(["iaf_psc_exp_neuron", "iaf_psc_exp_implicit"], [neuron for neuron, _ in testant])
+        self.assertEqual(4, len(testant[0][1]))
+
+    def test_solver_input(self):
+        blocks = neuron_blocks(model)
+        testant = solver_input(blocks[0][1])
+        self.assertEqual(["I_syn = (I_shape_in + I_shape_ex + I_e + currents)"], testant["functions"])
+        self.assertEqual(["I_shape_in = exp(-1/tau_syn_in*t)", "I_shape_ex = exp(-1/tau_syn_ex*t)"],
+                         testant["shapes"])
+        self.assertEqual("V_abs' = -V_abs/tau_m + (I_syn/C_m) *nS", testant["ode"])
+        self.assertEqual([testant["ode"]], testant["odes"])
+        self.assertEqual([], testant["parameters"])
+
+        # shapes which are defined by ODEs are passed to the solver together with their initial values
+        testant = solver_input(blocks[1][1])
+        self.assertEqual(["I_shape_in' = -I_shape_in/tau_syn_in"], testant["shapes"])
+        self.assertEqual(["V_abs' = -V_abs/tau_m + (I_shape_in/C_m) *nS"], testant["odes"])
+        self.assertEqual(["tau_m = 10 * ms", "tau_syn_in = 10 * ms", "C_m = 250 * pF", "V_abs = 0 * mV",
+                          "I_shape_in = 1 * pA"], testant["parameters"])
+        self.assertEqual(["I_shape_in = 1 * pA"], testant["initial_values"])
+
+        # a block with shapes only is passed to the solver unless a shape is defined by an ODE
+        self.assertEqual(["I_shape_in = exp(-1/tau_syn_in*t)"],
+                         solver_input({"equations": ["shape I_shape_in = exp(-1/tau_syn_in*t)"]})["shapes"])
+        self.assertIsNone(solver_input({"equations": ["shape I_shape_in' = -I_shape_in/tau_syn_in"]}))
+
+    def test_models_library(self):
+        testant = model_fixtures()
+        self.assertTrue("iaf_psc_alpha_neuron" in testant)
+        self.assertEqual(["G = delta(t, tau_m)"], json.loads(testant["iaf_psc_delta_neuron"])["shapes"])
+        self.assertEqual(["g_in = 1 * nS", "g_ex = 1 * nS"],
+                         json.loads(testant["iaf_cond_exp_implicit"])["initial_values"])
+        # numbers with units are printed as products in all definitions, e.g. `1.0 * ms`
+        self.assertTrue("g_tau_n_0 = 0.05 * ms" in json.loads(testant["terub_neuron_gpe"])["functions"])
+
+    def test_models_library_is_solved(self):
+        results = run_benchmark(model_fixtures(), repetitions=1)["results"]
+        self.assertEqual([], [(name, result["error"]) for name, result in results.items() if "error" in result])
+
+    def test_statistics(self):
+        self.assertEqual(2.5, median([4, 1, 2, 3]))
+        self.assertEqual(3, median([3, 1, 5]))
+        self.assertEqual(19, percentile(range(1, 21), 0.95))
+
+    def test_run_and_compare(self):
+        fixtures = {"iaf_psc_exp_neuron": json.dumps(solver_input(neuron_blocks(model)[0][1]))}
+        baseline = run_benchmark(fixtures, repetitions=1)
+        result = baseline["results"]["iaf_psc_exp_neuron"]
+        self.assertEqual("exact", result["solver"])
+        self.assertTrue(result["propagator_size"] > 0)
+        self.assertEqual([], compare(baseline, baseline))
+
+        regressed = json.loads(json.dumps(baseline))
+        regressed["results"]["iaf_psc_exp_neuron"]["median"] += 10
+        regressed["results"]["iaf_psc_exp_neuron"]["solver"] = "numeric"
+        self.assertEqual(2, len(compare(regressed, baseline)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+"""
+   This script provides a persistent, content addressed cache for the
+   results of `OdeAnalyzer.compute_solution`. Most rebuilds solve the
+   same equations blocks again, therefore, the serialized `SolverOutput`
+   is stored on disk and reused as long as neither the input, nor SymPy,
+   nor the solver scripts change.
+
+   The key of an entry is computed from a normalized form of the
+   `SolverInput` JSON (whitespace is removed from all definitions,
+   functions and shapes are sorted, the neuron name is ignored), the SymPy version and a hash of the
+   solver scripts. The value is the serialized `SolverOutput`.
+
+   The profile of a cached result is replaced by the single stage
+   `cache lookup`, i.e. the stages of the original computation are not
+   reported again.
+
+   The cache is bounded by its size on disk. If the limit is exceeded,
+   the least recently used entries are removed.
+
+   Example:
+   ========
+
+   cache = SolverCache("/tmp/solver_cache")
+   result, is_hit = cache.compute_solution(input_json, OdeAnalyzer.compute_solution)
+"""
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+import sympy
+
+import solver_profile
+import zero_oracle
+from budget import FULL_STRATEGY
+
+try:
+    string_types = basestring
+except NameError:  # python 3
+    string_types = str
+
+# The cache location can be overridden through this environment variable.
+CACHE_DIR_VARIABLE = "NESTML_SOLVER_CACHE"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".nestml", "solver_cache")
+
+# The maximal size of all cache entries in bytes can be overridden through this environment variable.
+CACHE_SIZE_VARIABLE = "NESTML_SOLVER_CACHE_SIZE"
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+# Changes in the solver scripts, i.e. all scripts in the folder of this script except the tests, invalidate all cache
+# entries.
+SCRIPT_PATTERN = "*.py"
+TEST_SUFFIX = "_test.py"
+
+ENTRY_SUFFIX = ".json"
+
+
+def solver_version():
+    """
+    :return: Hash over the SymPy version and the content of the solver scripts
+    """
+    version = hashlib.sha1()
+    version.update(sympy.__version__.encode("utf-8"))
+    script_folder = os.path.dirname(os.path.abspath(__file__))
+    for script_path in solver_scripts(script_folder):
+        with open(script_path, "rb") as script_file:
+            version.update(script_file.read())
+    return version.hexdigest()
+
+
+def solver_scripts(script_folder):
+    """
+    :return: Paths of the solver scripts in the folder, sorted by their names, i.e. independent of the file system
+    """
+    return sorted(script_path for script_path in glob.glob(os.path.join(script_folder, SCRIPT_PATTERN))
+                  if not script_path.endswith(TEST_SUFFIX))
+
+
+def normalize_input(input_json):
+    """
+    Brings the JSON serialization of a `SolverInput` into a canonical form. Whitespace in definitions is removed and
+    the lists with functions, shapes, parameters and referenced shapes are sorted.
+    :param input_json: JSON serialization of a `SolverInput`
+    :return: Canonical JSON string
+    """
+    def strip(definition):
+        return "".join(definition.split()) if definition is not None else None
+
+    input_dict = json.loads(input_json)
+    normalized = {}
+    for field, value in input_dict.items():
+        if field == "name":  # the neuron name doesn't influence the solution
+            continue
+        elif field in ("functions", "shapes", "parameters", "referenced_shapes") and value is not None:
+            normalized[field] = sorted(strip(definition) for definition in value)
+        elif isinstance(value, string_types):
+            normalized[field] = strip(value)
+        else:
+            normalized[field] = value
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+
+
+class SolverCache(object):
+    """
+    Stores serialized `SolverOutput`s in a directory. Every entry is a file named after the key of the input. The
+    modification time of an entry is updated on every hit and used for the least recently used eviction.
+    """
+
+    def __init__(self, cache_dir=None, max_size=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get(CACHE_DIR_VARIABLE, DEFAULT_CACHE_DIR)
+        if max_size is None:
+            max_size = int(os.environ.get(CACHE_SIZE_VARIABLE, DEFAULT_CACHE_SIZE))
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.version = solver_version()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, input_json):
+        """
+        :return: The content address of the input
+        """
+        content = (self.version + normalize_input(input_json)).encode("utf-8")
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, key):
+        """
+        :return: The cached serialization of the `SolverOutput` or None if there is no entry for the key
+        """
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "r") as entry_file:
+                result = entry_file.read()
+            os.utime(entry, None)  # marks the entry as recently used
+            return result
+        except (IOError, OSError):
+            return None
+
+    def lookup(self, key):
+        """
+        :return: The cached serialization of the `SolverOutput` whose `profile` section contains only the stage
+        `cache lookup` and whose zero test counters are 0, or None if there is no entry for the key
+        """
+        solver_profile.reset()
+        with solver_profile.stage("cache lookup"):
+            result = self.get(key)
+        if result is None:
+            return None
+
+        output = json.loads(result, object_pairs_hook=OrderedDict)
+        output["profile"] = solver_profile.records()
+        output["zero_oracle"] = dict((path, 0) for path in zero_oracle.statistics)
+        return json.dumps(output, indent=2)
+
+    def put(self, key, result):
+        """
+        Stores the serialized `SolverOutput` and evicts least recently used entries if the cache grew too large.
+        The entry is written into a temporary file first and renamed afterwards, so that concurrent solvers never read
+        a partially written entry.
+        """
+        if not os.path.exists(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError:
+                if not os.path.isdir(self.cache_dir):
+                    raise
+
+        handle, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(handle, "w") as tmp_file:
+            tmp_file.write(result)
+        os.rename(tmp_path, self._entry_path(key))
+        self.evict()
+
+    def compute_solution(self, input_json, compute):
+        """
+        Returns the cached result for the input or computes and stores it.
+        :param input_json: JSON serialization of the `SolverInput`
+        :param compute: Function which computes the serialized `SolverOutput` from the input, e.g.
+        `OdeAnalyzer.compute_solution`
+        :return: Tuple with the serialized `SolverOutput` and a flag which is true iff the result was read from cache
+        """
+        key = self.key(input_json)
+        result = self.lookup(key)
+        if result is not None:
+            self.hits += 1
+            return result, True
+
+        self.misses += 1
+        result = compute(input_json)
+        self.put_if_cacheable(key, result)
+        return result, False
+
+    def put_if_cacheable(self, key, result):
+        """
+        Stores the result only if it was computed with the full strategy. Results of weaker strategies depend on the
+        time budgets and the load of the machine, they are recomputed.
+        :param result: Serialized `SolverOutput` or None if there is no solution
+        """
+        if result is not None and json.loads(result).get("strategy", FULL_STRATEGY) == FULL_STRATEGY:
+            self.put(key, result)
+
+    def entries(self):
+        """
+        :return: List of tuples (path, size, last access) for all entries, least recently used first
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        result = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(ENTRY_SUFFIX):
+                path = os.path.join(self.cache_dir, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:  # removed by a concurrent solver
+                    continue
+                result.append((path, stat.st_size, stat.st_mtime))
+        return sorted(result, key=lambda entry: entry[2])
+
+    def evict(self):
+        """
+        Removes least recently used entries until the total size of the cache is within `max_size`.
+        """
+        entries = self.entries()
+        total_size = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def info(self):
+        """
+        :return: Dictionary with the location, the number of entries, the size on disk and hit/miss counters
+        """
+        entries = self.entries()
+        return {"cache_dir": self.cache_dir,
+                "entries": len(entries),
+                "size": sum(size for _, size, _ in entries),
+                "max_size": self.max_size,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses}
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
@@ -0,0 +1,92 @@
+import unittest
+
+import json
+import os
+import shutil
+import tempfile
+
+from solver_cache import SolverCache, normalize_input, solver_scripts
+
+psc_ode_block = '{' \
+                '"functions" : [ "I_syn = I_shape_in+I_shape_ex+I_e+currents" ],' \
+                '"shapes" : [ "I_shape_in = pA*(e/tau_syn_in)*t*exp((-1)/tau_syn_in*t)", "I_shape_ex = pA*(e/tau_syn_ex)*t*exp((-1)/tau_syn_ex*t)" ], ' \
+                '"ode" : "V_abs\' = (-1)/Tau*V_abs+1/C_m*I_syn"' \
+                '}'
+
+psc_ode_block_reordered = '{' \
+                          '"ode" : "V_abs\' = (-1)/Tau * V_abs + 1/C_m * I_syn",' \
+                          '"shapes" : [ "I_shape_ex = pA*(e/tau_syn_ex)*t*exp((-1)/tau_syn_ex*t)", "I_shape_in = pA * (e/tau_syn_in)*t*exp((-1)/tau_syn_in*t)" ], ' \
+                          '"functions" : [ "I_syn = I_shape_in + I_shape_ex + I_e + currents" ]' \
+                          '}'
+
+
+class TestSolverCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.computations = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def compute(self, input_json):
+        self.computations += 1
+        return json.dumps({"status": "success", "input": normalize_input(input_json),
+                           "profile": [{"stage": "input parsing", "time": 1.0, "peak_memory_kb": None, "size": None}]})
+
+    def test_normalization(self):
+        self.assertEqual(normalize_input(psc_ode_block), normalize_input(psc_ode_block_reordered))
+
+    def test_hit_and_miss(self):
+        testant = SolverCache(self.cache_dir)
+
+        _, is_hit = testant.compute_solution(psc_ode_block, self.compute)
+        self.assertFalse(is_hit)
+        result, is_hit = testant.compute_solution(psc_ode_block_reordered, self.compute)
+        self.assertTrue(is_hit)
+
+        self.assertEqual(1, self.computations)
+        self.assertEqual("success", json.loads(result)["status"])
+        self.assertEqual(1, testant.info()["hits"])
+        self.assertEqual(1, testant.info()["misses"])
+
+    def test_profile_of_hit(self):
+        testant = SolverCache(self.cache_dir)
+        testant.compute_solution(psc_ode_block, self.compute)
+        result, _ = testant.compute_solution(psc_ode_block, self.compute)
+        # the stages of the original computation are not reported again
+        self.assertEqual(["cache lookup"], [stage["stage"] for stage in json.loads(result)["profile"]])
+
+    def test_persistence(self):
+        SolverCache(self.cache_dir).compute_solution(psc_ode_block, self.compute)
+        _, is_hit = SolverCache(self.cache_dir).compute_solution(psc_ode_block, self.compute)
+        self.assertTrue(is_hit)
+
+    def test_eviction(self):
+        testant = SolverCache(self.cache_dir)
+        testant.compute_solution(psc_ode_block, self.compute)
+        entry_size = testant.info()["size"]
+
+        # there is room for exactly one entry
+        testant.max_size = entry_size
+        testant.compute_solution('{"functions": [], "shapes": ["I = exp(-t/tau)"], "ode": null}', self.compute)
+        self.assertEqual(1, testant.info()["entries"])
+
+        _, is_hit = testant.compute_solution(psc_ode_block, self.compute)
+        self.assertFalse(is_hit)
+
+    def test_clear(self):
+        testant = SolverCache(self.cache_dir)
+        testant.compute_solution(psc_ode_block, self.compute)
+        testant.clear()
+        self.assertEqual(0, testant.info()["entries"])
+
+    def test_solver_scripts(self):
+        # all scripts of the folder except the tests invalidate the cache entries
+        for script in ["shapes.py", "shapes_test.py", "OdeAnalyzer.py", "notes.txt"]:
+            open(os.path.join(self.cache_dir, script), "w").close()
+        self.assertEqual(["OdeAnalyzer.py", "shapes.py"],
+                         [os.path.basename(script) for script in solver_scripts(self.cache_dir)])
+
+if __name__ == '__main__':
+    unittest.main()
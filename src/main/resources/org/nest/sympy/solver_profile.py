@@ -0,0 +1,120 @@
+"""
+   This script records the performance of the solver stages: input
+   parsing, linearity check, shape analysis and `exp(A*h)` for every
+   shape, simplification and JSON serialization. For every stage the
+   wall time, the peak memory of the solver process at the end of the
+   stage and the size of its result (see `count_ops`) are recorded. The
+   records are reported in the `profile` section of the `SolverOutput`.
+
+   The peak memory is the maximal resident set size of the process in
+   kB, i.e. the stage which increases it is the stage which allocated
+   the memory. It is None where the `resource` module isn't available.
+
+   Additionally, a cProfile dump of every solution is written into the
+   folder `NESTML_SOLVER_PROFILE` if this environment variable is set.
+
+   Example:
+   ========
+
+   reset()
+   with stage("exp(A*h) I_shape") as record:
+       P = exp_matrix(A, eigenvalues, h)
+       record.set_size(P)
+   records()  # [{"stage": "exp(A*h) I_shape", "time": 0.02, "peak_memory_kb": 81234, "size": 42}]
+"""
+
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+
+from sympy import count_ops
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+# cProfile dumps are written into the folder from this environment variable, no dumps are written if it is not set.
+CPROFILE_DIR_VARIABLE = "NESTML_SOLVER_PROFILE"
+
+_records = []
+
+
+def reset():
+    del _records[:]
+
+
+def records():
+    """
+    :return: List of the records of all stages since the last `reset` in the order in which the stages were finished
+    """
+    return [record.to_dict() for record in _records]
+
+
+def peak_memory_kb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def expression_size(value):
+    """
+    :param value: SymPy expression, matrix or a list of them
+    :return: Number of operations in the value
+    """
+    if isinstance(value, (list, tuple)):
+        return sum(expression_size(item) for item in value)
+    if hasattr(value, "is_Matrix") and value.is_Matrix:
+        return sum(count_ops(entry) for entry in value)
+    return count_ops(value)
+
+
+class StageRecord(object):
+    def __init__(self, name):
+        self.name = name
+        self.start = time.time()
+        self.time = None
+        self.peak_memory_kb = None
+        self.size = None
+
+    def set_size(self, value):
+        self.size = expression_size(value)
+
+    def to_dict(self):
+        return {"stage": self.name, "time": self.time, "peak_memory_kb": self.peak_memory_kb, "size": self.size}
+
+
+@contextmanager
+def stage(name):
+    """
+    Records the wall time and the peak memory of the enclosed block as the stage `name`. A record is stored even if
+    the block raises an exception.
+    """
+    record = StageRecord(name)
+    try:
+        yield record
+    finally:
+        record.time = time.time() - record.start
+        record.peak_memory_kb = peak_memory_kb()
+        _records.append(record)
+
+
+def call_with_cprofile(function, input_json):
+    """
+    Calls `function(input_json)`. If `NESTML_SOLVER_PROFILE` is set, the call is profiled and the statistics are dumped
+    into the file `<sha1 of the input>.prof` in this folder, e.g. for `python -m pstats`.
+    """
+    profile_dir = os.environ.get(CPROFILE_DIR_VARIABLE)
+    if not profile_dir:
+        return function(input_json)
+
+    import cProfile
+    if not os.path.isdir(profile_dir):
+        os.makedirs(profile_dir)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, input_json)
+    finally:
+        name = hashlib.sha1(input_json.encode("utf-8")).hexdigest()
+        profiler.dump_stats(os.path.join(profile_dir, name + ".prof"))
@@ -0,0 +1,47 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import solver_profile
+from OdeAnalyzer import OdeAnalyzer
+
+psc_ode_block = '{' \
+                '"shapes" : [ "I_shape = (e/tau_syn) * t * exp(-1/tau_syn*t)" ],' \
+                '"ode" : "V_m\' = -1/tau_m * V_m + 1/C_m * (I_shape + I_e)"' \
+                '}'
+
+
+class TestSolverProfile(unittest.TestCase):
+
+    def test_stages(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(psc_ode_block))
+        stages = [record["stage"] for record in testant["profile"]]
+        self.assertEqual(["input parsing", "shape order detection I_shape", "linearity check", "exp(A*h) I_shape",
+                          "simplification", "dependency index", "serialization"], stages)
+        for record in testant["profile"]:
+            self.assertTrue(record["time"] >= 0)
+        self.assertTrue(testant["profile"][3]["size"] > 0)
+
+    def test_stage_is_recorded_on_error(self):
+        solver_profile.reset()
+        try:
+            with solver_profile.stage("failing"):
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual(["failing"], [record["stage"] for record in solver_profile.records()])
+
+    def test_cprofile_dump(self):
+        profile_dir = tempfile.mkdtemp()
+        os.environ[solver_profile.CPROFILE_DIR_VARIABLE] = profile_dir
+        try:
+            OdeAnalyzer.compute_solution(psc_ode_block)
+            self.assertEqual(1, len([name for name in os.listdir(profile_dir) if name.endswith(".prof")]))
+        finally:
+            del os.environ[solver_profile.CPROFILE_DIR_VARIABLE]
+            shutil.rmtree(profile_dir)
+
+if __name__ == '__main__':
+    unittest.main()
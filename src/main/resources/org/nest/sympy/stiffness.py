@@ -0,0 +1,156 @@
+"""
+   This script recommends the GSL stepper for ODEs which are integrated
+   numerically. The ODEs are linearized around the initial values of the
+   state variables, i.e. the Jacobian of the state system (ODE variables
+   and shape state variables) is evaluated with the default values of
+   the parameters, internals and initial values from the `SolverInput`.
+   The shape state variables are zero since no spike has arrived yet.
+
+   The decay rates of the linearized system are the negative real parts
+   of the eigenvalues of the Jacobian. The stiffness ratio is the ratio
+   of the fastest and the slowest decay rate:
+   - below `STIFF_RATIO` the ODEs are integrated by the explicit stepper
+     `rkf45` with an initial step which resolves the fastest time scale,
+   - above it by the implicit stepper `rk4imp`, and above `VERY_STIFF_RATIO`
+     by the implicit extrapolation stepper `bsimp`. The initial step of
+     the implicit steppers resolves the slowest time scale.
+
+   The parameters are printed NESTML expressions. Units are NEST units,
+   e.g. `mV`, `ms`, `pA`, and are replaced by 1, `e` is the Euler number.
+   Variables without a value, e.g. input buffers, are replaced by 0. No
+   recommendation is made if the Jacobian cannot be evaluated to numbers.
+
+   Example:
+   ========
+
+   recommend_integrator(parsed_input, shape_functions, ["tau_m ms = 10 * ms", ...])
+   # {"stepper": "rk4imp", "step_size": 0.5, "stiffness_ratio": 20000.0}
+"""
+
+import re
+from tokenize import TokenError
+
+import numpy
+from sympy import Derivative, E, Matrix, S, Symbol
+from sympy.core.function import AppliedUndef
+
+from parsed_input import derivative_name, parse_definition, split_definition
+from prop_matrix import PropagatorCalculator
+
+EXPLICIT_STEPPER = "rkf45"
+IMPLICIT_STEPPER = "rk4imp"
+EXTRAPOLATION_STEPPER = "bsimp"
+
+STIFF_RATIO = 1e3
+VERY_STIFF_RATIO = 1e5
+
+# fraction of the slowest time scale which is the initial step of the implicit steppers
+IMPLICIT_STEP_FRACTION = 0.1
+
+# decay rates below this threshold in 1/ms are treated as zero, e.g. of a perfect integrator
+MIN_RATE = 1e-12
+
+UNIT_PATTERN = re.compile(r"^[pnumkMG]?(V|A|S|F|s|Ohm|Hz|mol|l)$")
+
+
+def evaluate_parameters(parameters):
+    """
+    :param parameters: List of definitions `name = expression`. A definition may refer to other definitions.
+    :return: Dictionary which maps the symbol of every definition which evaluates to a number onto the number
+    """
+    definitions = []
+    for definition in parameters:
+        name, expression = split_definition(definition)
+        try:
+            expression = parse_definition(expression)
+        # e.g. a definition which uses NESTML syntax or a NESTML function without arguments like `resolution()`
+        except (SyntaxError, TokenError, TypeError, ValueError):
+            continue
+        variable = name.rstrip("'")
+        definitions.append((Symbol(derivative_name(variable, len(name) - len(variable))), expression))
+
+    names = set(symbol for symbol, _ in definitions)
+    values = {}
+    # every pass evaluates the definitions whose dependencies were evaluated in the previous passes
+    for _ in range(len(definitions)):
+        evaluated = False
+        for symbol, expression in definitions:
+            if symbol in values:
+                continue
+            value = expression.xreplace(values).xreplace(implicit_values(expression.free_symbols - names))
+            if value.is_number and value.is_real:
+                values[symbol] = value.evalf()
+                evaluated = True
+        if not evaluated:
+            break
+    return values
+
+
+def implicit_values(symbols):
+    """
+    :param symbols: Symbols which aren't defined by a parameter
+    :return: Dictionary which maps every unit onto 1 and the Euler number `e` onto its value
+    """
+    values = dict((symbol, S.One) for symbol in symbols if UNIT_PATTERN.match(str(symbol)))
+    if Symbol("e") in symbols:
+        values[Symbol("e")] = E
+    return values
+
+
+def recommend_integrator(parsed_input, shapes, parameters):
+    """
+    :param parsed_input: `ParsedInput` with ODEs
+    :param shapes: List of `ShapeFunction` objects
+    :param parameters: List of definitions `name = expression` of the parameters, internals and initial values
+    :return: Dictionary with the `stepper`, the initial `step_size` in ms and the `stiffness_ratio` or None if the
+    Jacobian cannot be evaluated
+    """
+    states, derivatives = parsed_input.state_equations()
+    if not states:
+        return None
+
+    values = evaluate_parameters(parameters)
+    jacobian = Matrix(derivatives).jacobian(states).xreplace(dict((shape.name, 0) for shape in shapes))
+    eigenvalues = numeric_eigenvalues(jacobian, values)
+    if eigenvalues is None:
+        return None
+
+    for shape in shapes:
+        shape_matrix, _ = PropagatorCalculator.shape_system(shape, 0, 0)
+        shape_eigenvalues = numeric_eigenvalues(shape_matrix[:shape.order, :shape.order], values)
+        if shape_eigenvalues is None:
+            return None
+        eigenvalues = numpy.concatenate([eigenvalues, shape_eigenvalues])
+
+    rates = [-eigenvalue.real for eigenvalue in eigenvalues if -eigenvalue.real > MIN_RATE]
+    if not rates:
+        return {"stepper": EXPLICIT_STEPPER, "step_size": None, "stiffness_ratio": 1.0}
+
+    stiffness_ratio = max(rates) / min(rates)
+    if stiffness_ratio < STIFF_RATIO:
+        return {"stepper": EXPLICIT_STEPPER, "step_size": 1 / max(rates), "stiffness_ratio": stiffness_ratio}
+    stepper = IMPLICIT_STEPPER if stiffness_ratio < VERY_STIFF_RATIO else EXTRAPOLATION_STEPPER
+    return {"stepper": stepper, "step_size": IMPLICIT_STEP_FRACTION / min(rates), "stiffness_ratio": stiffness_ratio}
+
+
+def numeric_eigenvalues(matrix, values):
+    """
+    :param matrix: SymPy matrix
+    :param values: Dictionary with the values of the symbols in the matrix, all other symbols except units and `e`
+    are 0
+    :return: NumPy array with the eigenvalues or None if the matrix cannot be evaluated to finite numbers
+    """
+    # the derivative of a NESTML function of a state, e.g. of `bounded_min(V_m, V_peak)`, has no numeric value
+    if any(entry.atoms(Derivative, AppliedUndef) for entry in matrix):
+        return None
+    try:
+        matrix = matrix.xreplace(values)
+        undefined = set().union(*[entry.free_symbols for entry in matrix])
+        matrix = matrix.xreplace(implicit_values(undefined))
+        matrix = matrix.xreplace(dict((symbol, S.Zero) for symbol in undefined))
+        numeric = numpy.array(matrix.evalf().tolist(), dtype=float)
+    except (TypeError, ValueError):  # e.g. a function without a numeric value or a complex entry
+        return None
+    if not numpy.all(numpy.isfinite(numeric)):
+        return None
+    return numpy.linalg.eigvals(numeric)
@@ -0,0 +1,62 @@
+import json
+import unittest
+
+from sympy import Symbol
+
+from OdeAnalyzer import OdeAnalyzer
+from stiffness import evaluate_parameters
+
+
+def gated_neuron(tau_gate):
+    """
+    :return: `SolverInput` of a conductance based neuron with a gating variable of the time constant `tau_gate`
+    """
+    return json.dumps({
+        "shapes": ["g_ex = exp(-t/tau_syn)"],
+        "odes": ["V_m' = (-g_L * (V_m - E_L) - g_ex * (V_m - E_ex) - g_K * n * (V_m - E_K) + I_e) / C_m",
+                 "n' = (1 / (1 + exp(-V_m / mV)) - n) / tau_gate"],
+        "parameters": ["g_L = 10 * nS", "C_m = 250.0 * pF", "E_L = -70. * mV", "E_ex = 0 * mV", "E_K = -90 * mV",
+                       "g_K = 1 * nS", "tau_syn = 2 * ms", "tau_gate = {} * ms".format(tau_gate), "I_e = 0 * pA",
+                       "V_m = E_L", "n = 0"]})
+
+
+class TestStiffness(unittest.TestCase):
+
+    def test_evaluate_parameters(self):
+        testant = evaluate_parameters(["V_m = E_L + 10 * mV", "E_L = -70. * mV", "g_ex' = e / tau_syn",
+                                       "tau_syn = 0.2 * ms", "I_e = currents", "__h = resolution()"])
+        self.assertEqual(-60.0, testant[Symbol("V_m")])
+        self.assertAlmostEqual(2.71828182 / 0.2, float(testant[Symbol("__D_g_ex")]), places=5)
+        self.assertFalse(Symbol("I_e") in testant)
+        self.assertFalse(Symbol("__h") in testant)
+
+    def test_non_stiff(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(gated_neuron(5)))
+        self.assertEqual("numeric", testant["solver"])
+        self.assertEqual("rkf45", testant["integrator"]["stepper"])
+        # the fastest time scale is the time constant of the shape
+        self.assertAlmostEqual(2, testant["integrator"]["step_size"], places=6)
+
+    def test_stiff(self):
+        testant = json.loads(OdeAnalyzer.compute_solution(gated_neuron(0.001)))
+        self.assertEqual("rk4imp", testant["integrator"]["stepper"])
+        self.assertTrue(testant["integrator"]["stiffness_ratio"] > 1e3)
+        self.assertEqual("bsimp", json.loads(OdeAnalyzer.compute_solution(gated_neuron(1e-6)))["integrator"]["stepper"])
+
+    def test_missing_parameters(self):
+        solver_input = json.loads(gated_neuron(5))
+        del solver_input["parameters"]
+        self.assertIsNone(json.loads(OdeAnalyzer.compute_solution(json.dumps(solver_input)))["integrator"])
+
+    def test_undefined_function_of_state(self):
+        # the Jacobian contains the derivative of `bounded_min` by `V_m`, the ODEs are integrated without a recommendation
+        solver_input = json.loads(gated_neuron(5))
+        solver_input["functions"] = ["V_bounded = bounded_min(V_m, V_peak)"]
+        solver_input["odes"][0] = solver_input["odes"][0].replace("g_L * (V_m - E_L)", "g_L * (V_bounded - E_L)")
+        solver_input["parameters"].append("V_peak = 0 * mV")
+        testant = json.loads(OdeAnalyzer.compute_solution(json.dumps(solver_input)))
+        self.assertEqual("numeric", testant["solver"])
+        self.assertIsNone(testant["integrator"])
+
+if __name__ == '__main__':
+    unittest.main()
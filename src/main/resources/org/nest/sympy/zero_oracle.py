@@ -0,0 +1,110 @@
+"""
+   This script provides a fast test whether a symbolic expression is
+   identically zero. It replaces checks like `simplify(x) == 0`, which
+   run the most expensive SymPy routine only to get a yes/no answer.
+
+   The expression is evaluated with high precision at several random
+   points of its free symbols first:
+   - if it evaluates to a clearly non-zero value at any point, it is
+     not identically zero,
+   - if it vanishes (up to the evaluation error) at all points, it is
+     identically zero with overwhelming probability.
+   Only if the numeric probe is inconclusive, e.g. because the
+   expression contains functions which cannot be evaluated numerically,
+   the expression is simplified symbolically.
+
+   The module counts how often each path was taken in `statistics`. The
+   counters of a solution are reported next to its profile.
+
+   Example:
+   ========
+
+   is_zero("exp(-t/tau) * exp(t/tau) - 1")  # True
+"""
+
+import random
+
+from sympy import Float, simplify, sympify
+
+# Number of random points at which the expression is evaluated.
+NUM_PROBES = 4
+# Number of significant digits used in the numeric evaluation.
+PRECISION = 50
+# An evaluation whose magnitude relative to the magnitude of its terms is below `ZERO_THRESHOLD` vanishes at the point.
+# Above `NON_ZERO_THRESHOLD` the expression is certainly non-zero. In between, the result is inconclusive.
+ZERO_THRESHOLD = Float(10) ** (-2 * PRECISION // 3)
+NON_ZERO_THRESHOLD = Float(10) ** (-PRECISION // 3)
+# The random points are reproducible, so that the solver produces the same output for the same input.
+RANDOM_SEED = 4711
+
+# Counts which path led to the decision.
+statistics = {"numeric_zero": 0, "numeric_non_zero": 0, "symbolic": 0}
+
+
+def reset_statistics():
+    for path in statistics:
+        statistics[path] = 0
+
+
+def is_zero(expr):
+    """
+    Checks whether the expression is identically zero.
+    :param expr: SymPy expression or its string representation
+    :return: True iff the expression is identically zero
+    """
+    expr = sympify(expr)
+    if expr == 0:
+        return True
+
+    decision = _numeric_probe(expr)
+    if decision is None:
+        statistics["symbolic"] += 1
+        return simplify(expr) == 0
+
+    if decision:
+        statistics["numeric_zero"] += 1
+    else:
+        statistics["numeric_non_zero"] += 1
+    return decision
+
+
+def _numeric_probe(expr):
+    """
+    :return: True if the expression vanishes at all random points, False if it doesn't vanish at any of them,
+    None if the probe is inconclusive
+    """
+    symbols = sorted(expr.free_symbols, key=str)
+    generator = random.Random(RANDOM_SEED)
+    for _ in range(NUM_PROBES):
+        # values between 0.5 and 2.5 keep exponentials and reciprocals of parameters in a moderate range
+        point = dict((symbol, Float(0.5 + 2 * generator.random(), PRECISION)) for symbol in symbols)
+        magnitude = _evaluate_magnitude(expr, point)
+        if magnitude is None:
+            return None
+
+        # the evaluation error grows with the magnitude of the terms which cancel each other. The thresholds are
+        # relative, i.e. expressions with tiny coefficients, e.g. in SI units, are compared with their own terms.
+        term_magnitudes = [_evaluate_magnitude(term, point) for term in expr.as_ordered_terms()]
+        scale = max([magnitude] + [term for term in term_magnitudes if term is not None])
+        if magnitude > NON_ZERO_THRESHOLD * scale:
+            return False
+        if magnitude > ZERO_THRESHOLD * scale:
+            return None
+
+    return True
+
+
+def _evaluate_magnitude(expr, point):
+    """
+    :return: The absolute value of the expression at the point or None if it cannot be evaluated to a finite number
+    """
+    try:
+        value = expr.evalf(PRECISION, subs=point)
+        real_part, imaginary_part = value.as_real_imag()
+        if not (real_part.is_Number and imaginary_part.is_Number):
+            return None
+        if not (real_part.is_finite and imaginary_part.is_finite):
+            return None
+        return max(abs(real_part), abs(imaginary_part))
+    except (TypeError, ValueError, ZeroDivisionError, AttributeError):
+        return None
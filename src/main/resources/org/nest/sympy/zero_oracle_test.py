@@ -0,0 +1,32 @@
+import unittest
+
+import zero_oracle
+from zero_oracle import is_zero
+
+
+class TestZeroOracle(unittest.TestCase):
+
+    def setUp(self):
+        zero_oracle.reset_statistics()
+
+    def test_identically_zero(self):
+        self.assertTrue(is_zero("exp(-t/tau) * (exp(t/tau) - exp(t/tau_syn)) + exp(t/tau_syn - t/tau) - 1"))
+        self.assertTrue(is_zero("(a + b)**2 - a**2 - 2*a*b - b**2"))
+        self.assertTrue(is_zero("1/(tau_syn - Tau) + 1/(Tau - tau_syn)"))
+        self.assertEqual(3, zero_oracle.statistics["numeric_zero"])
+
+    def test_non_zero(self):
+        self.assertFalse(is_zero("exp(-t/tau) - exp(-t/tau_syn)"))
+        self.assertFalse(is_zero("-1/tau**2"))
+        # the thresholds are relative to the magnitude of the terms
+        self.assertFalse(is_zero("1e-40 * x"))
+        self.assertFalse(is_zero("1e-40 * (exp(-t/tau) - exp(-t/tau_syn))"))
+        self.assertEqual(4, zero_oracle.statistics["numeric_non_zero"])
+
+    def test_symbolic_fallback(self):
+        # `delta` cannot be evaluated numerically
+        self.assertFalse(is_zero("delta(t, tau_m)"))
+        self.assertEqual(1, zero_oracle.statistics["symbolic"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -58,6 +58,29 @@ public class ExactSolutionTransformerTest extends ModelbasedTest {
 
   }
 
+  @Test
+  public void testCommonSubexpressions() {
+    final ExactSolutionTransformer exactSolutionTransformer = new ExactSolutionTransformer();
+    final ASTNESTMLCompilationUnit modelRoot = parseNestmlModel(MODEL_FILE_PATH);
+    scopeCreator.runSymbolTableCreator(modelRoot);
+    exactSolutionTransformer.addExactSolution(
+        modelRoot.getNeurons().get(0),
+        SolverOutput.fromJSON(SolverJsonData.IAF_PSC_ALPHA_WITH_CSE));
+
+    printModelToFile(modelRoot, TARGET_TMP_MODEL_PATH);
+
+    ASTNESTMLCompilationUnit testant = parseNestmlModel(TARGET_TMP_MODEL_PATH);
+
+    final NESTMLScopeCreator scopeCreator2 = new NESTMLScopeCreator();
+    final Scope scope = scopeCreator2.runSymbolTableCreator(testant);
+
+    Optional<NeuronSymbol> neuronSymbol = scope.resolve(NEURON_NAME, NeuronSymbol.KIND);
+
+    final Optional<VariableSymbol> temporary = neuronSymbol.get().getVariableByName("__cse0");
+    assertTrue(temporary.isPresent());
+    assertTrue(temporary.get().getBlockType().equals(VariableSymbol.BlockType.INTERNALS));
+  }
+
   @Test
   public void testReplaceODEThroughMatrixMultiplication() {
     // false abstraction level
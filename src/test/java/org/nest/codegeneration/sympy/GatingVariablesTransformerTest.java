@@ -0,0 +1,86 @@
+/*
+ * Copyright (c)  RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.codegeneration.sympy;
+
+import de.monticore.symboltable.Scope;
+import org.junit.Test;
+import org.nest.base.ModelbasedTest;
+import org.nest.nestml._ast.ASTNESTMLCompilationUnit;
+import org.nest.nestml._ast.ASTNeuron;
+import org.nest.nestml._symboltable.NESTMLScopeCreator;
+import org.nest.nestml._symboltable.symbols.NeuronSymbol;
+import org.nest.nestml._symboltable.symbols.VariableSymbol;
+
+import java.io.IOException;
+import java.nio.file.Files;
+import java.nio.file.Paths;
+import java.util.Optional;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertTrue;
+
+/**
+ * Checks that the gating variables are removed from the ODEs and are updated before the integrate call.
+ *
+ * @author plotnikov
+ */
+public class GatingVariablesTransformerTest extends ModelbasedTest {
+  private static final String TARGET_TMP_MODEL_PATH = "target/tmp_gating.nestml";
+
+  private static final String NEURON_NAME = "hh_psc_alpha_neuron";
+  private static final String MODEL_FILE_PATH = "models/hh_psc_alpha.nestml";
+
+  private static final String HH_PSC_ALPHA_GATING = "{\n" +
+      "  \"status\": \"success\",\n" +
+      "  \"solver\": \"numeric\",\n" +
+      "  \"gating_variables\": [\"Inact_n\", \"Act_m\", \"Act_h\"],\n" +
+      "  \"gating_update_instructions\": [\n" +
+      "    \"__gate0 real = exp(-0.05*V_m/mV)\",\n" +
+      "    \"Inact_n = Inact_n*exp(-__h/ms)\",\n" +
+      "    \"Act_m = Act_m*exp(-__h/ms)\",\n" +
+      "    \"Act_h = __gate0 + (Act_h - __gate0)*exp(-__h/ms)\"\n" +
+      "  ]\n" +
+      "}";
+
+  @Test
+  public void testGatingUpdates() throws IOException {
+    final ASTNESTMLCompilationUnit modelRoot = parseNestmlModel(MODEL_FILE_PATH);
+    scopeCreator.runSymbolTableCreator(modelRoot);
+    new GatingVariablesTransformer().addGatingUpdates(
+        modelRoot.getNeurons().get(0),
+        SolverOutput.fromJSON(HH_PSC_ALPHA_GATING));
+
+    printModelToFile(modelRoot, TARGET_TMP_MODEL_PATH);
+
+    final ASTNESTMLCompilationUnit testant = parseNestmlModel(TARGET_TMP_MODEL_PATH);
+    testant.setArtifactName("hh_psc_alpha");
+    final Scope scope = new NESTMLScopeCreator().runSymbolTableCreator(testant);
+    final Optional<NeuronSymbol> neuronSymbol = scope.resolve(NEURON_NAME, NeuronSymbol.KIND);
+    assertTrue(neuronSymbol.isPresent());
+
+    // only the membrane potential is integrated numerically
+    final ASTNeuron astNeuron = testant.getNeurons().get(0);
+    assertEquals(1, astNeuron.getEquations().size());
+    assertEquals("V_m", astNeuron.getEquations().get(0).getLhs().getName());
+
+    final Optional<VariableSymbol> gatingVariable = neuronSymbol.get().getVariableByName("Act_m");
+    assertTrue(gatingVariable.isPresent());
+    assertEquals(VariableSymbol.BlockType.STATE, gatingVariable.get().getBlockType());
+
+    final Optional<VariableSymbol> membranePotential = neuronSymbol.get().getVariableByName("V_m");
+    assertTrue(membranePotential.isPresent());
+    assertEquals(VariableSymbol.BlockType.INITIAL_VALUES, membranePotential.get().getBlockType());
+
+    assertTrue(neuronSymbol.get().getVariableByName("__h").isPresent());
+
+    // the gating variables are updated before the membrane potential is integrated
+    final String model = new String(Files.readAllBytes(Paths.get(TARGET_TMP_MODEL_PATH)));
+    assertTrue(model.contains("__gate0 real = "));
+    assertTrue(model.contains("Act_h = "));
+    assertTrue(model.indexOf("Act_h = ") < model.indexOf("integrate_odes()"));
+  }
+
+}
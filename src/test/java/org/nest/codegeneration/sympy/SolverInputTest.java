@@ -36,6 +36,9 @@ public class SolverInputTest extends ModelbasedTest {
   private static final String COND_MODEL_FILE_PATH = "models/iaf_cond_alpha.nestml";
   private static final String PSC_MODEL_FILE_PATH = "models/iaf_psc_alpha.nestml";
   private static final String DELTA_MODEL_FILE_PATH = "models/iaf_psc_delta.nestml";
+  private static final String SYSTEM_MODEL_FILE_PATH = "models/iaf_cond_exp_sfa_rr.nestml";
+  private static final String REFERENCED_SHAPES_MODEL_FILE_PATH =
+      "src/test/resources/codegeneration/sympy/referenced_shapes.nestml";
 
   @Test
   public void test_cond_model() {
@@ -58,7 +61,52 @@ public class SolverInputTest extends ModelbasedTest {
     String result = solverInput.toJSON();
     System.out.println(result);
     assertNotNull(result);
+    assertEquals(1, solverInput.odes.size());
+    assertEquals(solverInput.odes.get(0), solverInput.ode);
+  }
+
+  @Test
+  public void test_system_of_odes() {
+    ASTNESTMLCompilationUnit root = parseAndBuildSymboltable(SYSTEM_MODEL_FILE_PATH);
+
+    final ASTEquationsBlock odeBlock = root.getNeurons().get(0).findEquationsBlock().get();
+    SolverInput solverInput = new SolverInput(odeBlock);
+    assertEquals(3, solverInput.odes.size());
+    assertNull(solverInput.ode);
+    assertTrue(solverInput.toJSON().contains("\"odes\""));
+  }
+
+  @Test
+  public void test_parameters() {
+    ASTNESTMLCompilationUnit root = parseAndBuildSymboltable(COND_MODEL_FILE_PATH);
+
+    SolverInput solverInput = new SolverInput(root.getNeurons().get(0));
+    assertTrue(solverInput.parameters.stream().anyMatch(parameter -> parameter.startsWith("C_m = ")));
+    assertTrue(solverInput.parameters.stream().anyMatch(parameter -> parameter.startsWith("V_m = ")));
+  }
 
+  @Test
+  public void test_shape_odes() {
+    ASTNESTMLCompilationUnit root = parseAndBuildSymboltable(COND_MODEL_FILE_PATH);
+
+    // the second neuron defines its shapes as ODEs
+    SolverInput solverInput = new SolverInput(root.getNeurons().get(1));
+    assertTrue(solverInput.shapes.stream().anyMatch(shape -> shape.startsWith("g_in'' = ")));
+    assertEquals(4, solverInput.initial_values.size());
+    assertTrue(solverInput.initial_values.stream().anyMatch(initialValue -> initialValue.startsWith("g_ex' = ")));
+    assertTrue(new SolverInput(root.getNeurons().get(0)).initial_values.isEmpty());
+  }
+
+  @Test
+  public void test_referenced_shapes() {
+    ASTNESTMLCompilationUnit root = parseAndBuildSymboltable(REFERENCED_SHAPES_MODEL_FILE_PATH);
+
+    // the excitatory shape is read in the update block, the inhibitory shape is only convolved with its buffer
+    SolverInput solverInput = new SolverInput(root.getNeurons().get(0));
+    assertEquals(1, solverInput.referenced_shapes.size());
+    assertEquals("I_shape_ex", solverInput.referenced_shapes.get(0));
+    assertTrue(new SolverInput(parseAndBuildSymboltable(PSC_MODEL_FILE_PATH).getNeurons().get(0))
+        .referenced_shapes.isEmpty());
   }
 
   @Test
@@ -0,0 +1,72 @@
+/*
+ * SolverInstallationTest.java
+ *
+ * This file is part of NEST.
+ *
+ * Copyright (C) 2004 The NEST Initiative
+ *
+ * NEST is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 2 of the License, or
+ * (at your option) any later version.
+ *
+ * NEST is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with NEST.  If not, see <http://www.gnu.org/licenses/>.
+ */
+package org.nest.codegeneration.sympy;
+
+import com.google.common.collect.Lists;
+import org.junit.Test;
+
+import java.nio.file.Files;
+import java.nio.file.Path;
+
+import static org.junit.Assert.*;
+
+/**
+ * Tests that the solver scripts are installed once per version into the installation home.
+ *
+ * @author plotnikov
+ */
+public class SolverInstallationTest {
+  private static final String TEST_SCRIPTS = "codegeneration/sympy/solver_scripts/";
+
+
+  @Test
+  public void testInstallation() throws Exception {
+    final Path home = Files.createTempDirectory("solver_home");
+    final Path testant = SolverInstallation.install(home, "python", "org/nest/sympy/");
+
+    assertEquals(home, testant.getParent());
+    assertTrue(Files.exists(testant.resolve("OdeAnalyzer.py")));
+    assertTrue(Files.exists(testant.resolve("parsed_input.py")));
+    assertFalse(Files.exists(testant.resolve("parsed_input_test.py")));
+    // the second installation of the same scripts reuses the first one
+    assertEquals(testant, SolverInstallation.install(home, "python", "org/nest/sympy/"));
+    assertEquals(1, Files.list(home).count());
+  }
+
+  @Test
+  public void testScripts() throws Exception {
+    // tests and scripts in subfolders are not part of the solver
+    assertEquals(
+        Lists.newArrayList("OdeAnalyzer.py"),
+        Lists.newArrayList(SolverInstallation.scripts(TEST_SCRIPTS).keySet()));
+  }
+
+  @Test
+  public void testVersions() throws Exception {
+    final Path first = SolverInstallation.install(
+        Files.createTempDirectory("solver_home"), "python", "org/nest/sympy/");
+    final Path second = SolverInstallation.install(
+        Files.createTempDirectory("solver_home"), "python", TEST_SCRIPTS);
+
+    assertNotEquals(first.getFileName(), second.getFileName());
+  }
+
+}
@@ -119,6 +119,12 @@ public class SolverJsonData {
                                "  ]" +
                                "}";
 
+  // the same solution in which the exponential of the inhibitory time constant is a common subexpression
+  final static String IAF_PSC_ALPHA_WITH_CSE = IAF_PSC_ALPHA
+      .replace("exp(-__h/tau_syn_in)", "__cse0")
+      .replace("\"solver\": \"exact\", \n",
+               "\"solver\": \"exact\", \n  \"common_subexpressions\": [{\"__cse0\": \"exp(-__h/tau_syn_in)\"}], \n");
+
   final static String IAF_COND_ALPHA = "{\n" +
                                 "  \"status\": \"success\", \n" +
                                 "  \"initial_values\": [\n" +
@@ -21,6 +21,7 @@
 
 package org.nest.codegeneration.sympy;
 
+import com.google.common.collect.Lists;
 import org.junit.Assert;
 import org.junit.Test;
 
@@ -55,4 +56,118 @@ public class SolverOutputTest {
     Assert.assertEquals("exact", testant.solver);
   }
 
-}
\ No newline at end of file
+  @Test
+  public void testCommonSubexpressions() {
+    final SolverOutput testant = SolverOutput.fromJSON(SolverJsonData.IAF_PSC_ALPHA_WITH_CSE);
+    Assert.assertEquals(1, testant.common_subexpressions.size());
+    Assert.assertEquals("__cse0", testant.common_subexpressions.get(0).getKey());
+    Assert.assertEquals("__cse0", testant.propagator_elements.get(0).getValue());
+  }
+
+  @Test
+  public void testMergedShapes() {
+    final String mergedShapes = "{\n" +
+                                "  \"status\": \"success\", \n" +
+                                "  \"solver\": \"exact\", \n" +
+                                "  \"merged_shapes\": [{\"I_shape_ex\": \"I_shape_in\"}], \n" +
+                                "  \"merged_shape_initial_values\": [{\"I_shape_ex\": \"2\"}]\n" +
+                                "}\n";
+    final SolverOutput testant = SolverOutput.fromJSON(mergedShapes);
+    Assert.assertEquals("I_shape_in", testant.merged_shapes.get(0).getValue());
+    Assert.assertEquals("2", testant.merged_shape_initial_values.get(0).getValue());
+  }
+
+  @Test
+  public void testStrategy() {
+    final String numericFallback = "{\n" +
+                                   "  \"status\": \"success\", \n" +
+                                   "  \"solver\": \"numeric\", \n" +
+                                   "  \"strategy\": \"numeric\"\n" +
+                                   "}\n";
+    final SolverOutput testant = SolverOutput.fromJSON(numericFallback);
+    Assert.assertEquals("numeric", testant.strategy);
+  }
+
+  @Test
+  public void testIntegrator() {
+    final String stiffOutput = "{\n" +
+                               "  \"status\": \"success\", \n" +
+                               "  \"solver\": \"numeric\", \n" +
+                               "  \"integrator\": {\"stepper\": \"rk4imp\", \"step_size\": 0.5, " +
+                               "\"stiffness_ratio\": 20000.0}\n" +
+                               "}\n";
+    final SolverOutput testant = SolverOutput.fromJSON(stiffOutput);
+    Assert.assertEquals("rk4imp", testant.integrator.stepper);
+    Assert.assertEquals(0.5, testant.integrator.step_size, 1e-9);
+    Assert.assertNull(SolverOutput.fromJSON("{\"status\": \"success\", \"integrator\": null}").integrator);
+  }
+
+  @Test
+  public void testProfile() {
+    final String profiledOutput = "{\n" +
+                                  "  \"status\": \"success\", \n" +
+                                  "  \"solver\": \"exact\", \n" +
+                                  "  \"profile\": [{\"stage\": \"exp(A*h) I_shape\", \"time\": 0.5, " +
+                                  "\"peak_memory_kb\": 81234, \"size\": 42}, " +
+                                  "{\"stage\": \"linearity check\", \"time\": 0.01, " +
+                                  "\"peak_memory_kb\": null, \"size\": null}],\n" +
+                                  "  \"zero_oracle\": {\"numeric_zero\": 3, \"numeric_non_zero\": 5, \"symbolic\": 1}\n" +
+                                  "}\n";
+    final SolverOutput testant = SolverOutput.fromJSON(profiledOutput);
+    Assert.assertEquals(2, testant.profile.size());
+    Assert.assertEquals("exp(A*h) I_shape", testant.profile.get(0).stage);
+    Assert.assertEquals(0.5, testant.profile.get(0).time, 1e-9);
+    Assert.assertEquals(Long.valueOf(42), testant.profile.get(0).size);
+    Assert.assertNull(testant.profile.get(1).peak_memory_kb);
+    Assert.assertEquals(Integer.valueOf(1), testant.zero_oracle.get("symbolic"));
+  }
+
+  @Test
+  public void testJacobian() {
+    final String numericOutput = "{\n" +
+                                 "  \"status\": \"success\", \n" +
+                                 "  \"solver\": \"numeric\", \n" +
+                                 "  \"jacobian\": [{\"row\": \"V_m\", \"column\": \"g_ex\", \"value\": \"(E_ex - V_m)*__jac0\"}, " +
+                                 "{\"row\": \"g_ex\", \"column\": \"g_ex\", \"value\": \"-1/tau_syn\"}], \n" +
+                                 "  \"jacobian_subexpressions\": [{\"__jac0\": \"1/C_m\"}]\n" +
+                                 "}\n";
+    final SolverOutput testant = SolverOutput.fromJSON(numericOutput);
+    Assert.assertEquals(2, testant.jacobian.size());
+    Assert.assertEquals("V_m", testant.jacobian.get(0).row);
+    Assert.assertEquals("g_ex", testant.jacobian.get(0).column);
+    Assert.assertEquals("__jac0", testant.jacobian_subexpressions.get(0).getKey());
+    Assert.assertNull(SolverOutput.fromJSON("{\"status\": \"success\", \"jacobian\": null}").jacobian);
+  }
+
+  @Test
+  public void testDeltaShapes() {
+    final String exactOutput = "{\n" +
+                               "  \"status\": \"success\", \n" +
+                               "  \"solver\": \"exact\", \n" +
+                               "  \"delta_shapes\": [{\"I_ex\": \"1/C_m\"}, {\"I_in\": \"-2/C_m\"}]\n" +
+                               "}\n";
+    final SolverOutput testant = SolverOutput.fromJSON(exactOutput);
+    Assert.assertEquals(2, testant.delta_shapes.size());
+    Assert.assertEquals("I_in", testant.delta_shapes.get(1).getKey());
+    Assert.assertEquals("-2/C_m", testant.delta_shapes.get(1).getValue());
+    Assert.assertTrue(SolverOutput.fromJSON("{\"status\": \"success\"}").delta_shapes.isEmpty());
+  }
+
+  @Test
+  public void testDependencies() {
+    final String exactOutput = "{\n" +
+                               "  \"status\": \"success\", \n" +
+                               "  \"solver\": \"exact\", \n" +
+                               "  \"dependencies\": [" +
+                               "{\"name\": \"__cse0\", \"parameters\": [\"__h\", \"tau_syn\"], \"temporaries\": []}, " +
+                               "{\"name\": \"__P__0_0\", \"parameters\": [\"__h\", \"tau_syn\"], \"temporaries\": [\"__cse0\"]}, " +
+                               "{\"name\": \"__const_input\", \"parameters\": [\"C_m\", \"I_e\"], \"temporaries\": []}]\n" +
+                               "}\n";
+    final SolverOutput testant = SolverOutput.fromJSON(exactOutput);
+    Assert.assertEquals(3, testant.dependencies.size());
+    Assert.assertEquals(Lists.newArrayList("__cse0"), testant.dependencies.get(1).temporaries);
+    Assert.assertEquals("__const_input", testant.dependencies.get(2).name);
+    Assert.assertEquals(Lists.newArrayList("C_m", "I_e"), testant.dependencies.get(2).parameters);
+  }
+
+}
@@ -20,6 +20,7 @@
  */
 package org.nest.codegeneration.sympy;
 
+import com.google.common.collect.Maps;
 import org.junit.Test;
 import org.nest.base.ModelbasedTest;
 import org.nest.nestml._ast.ASTNESTMLCompilationUnit;
@@ -30,6 +31,7 @@ import org.nest.utils.FilesHelper;
 import java.io.IOException;
 import java.nio.file.Path;
 import java.nio.file.Paths;
+import java.util.Map;
 import java.util.Optional;
 
 import static org.junit.Assert.assertEquals;
@@ -76,6 +78,31 @@ public class SymPySolverTest extends ModelbasedTest {
     assertEquals("delta", testant.solver);
   }
 
+  @Test
+  public void test_solve_in_batch() throws IOException {
+    final SymPySolver symPySolver = new SymPySolver();
+    final ASTEquationsBlock psc = parseEquationsBlock(IAF_PSC_ALPHA);
+    final ASTEquationsBlock delta = parseEquationsBlock(IAF_PSC_DELTA);
+
+    final Map<String, SolverInput> solverInputs = Maps.newHashMap();
+    solverInputs.put("iaf_psc_alpha", new SolverInput(psc));
+    solverInputs.put("iaf_psc_delta", new SolverInput(delta));
+    symPySolver.solveInBatch(solverInputs, SYMPY_OUTPUT);
+
+    assertEquals("exact", symPySolver.solveOdeWithShapes(psc, SYMPY_OUTPUT).solver);
+    assertEquals("delta", symPySolver.solveOdeWithShapes(delta, SYMPY_OUTPUT).solver);
+  }
+
+  private ASTEquationsBlock parseEquationsBlock(final String pathToModel) throws IOException {
+    final Optional<ASTNESTMLCompilationUnit> root = parser.parse(pathToModel);
+    assertTrue(root.isPresent());
+
+    final NESTMLScopeCreator nestmlScopeCreator = new NESTMLScopeCreator();
+    nestmlScopeCreator.runSymbolTableCreator(root.get());
+
+    return root.get().getNeurons().get(0).findEquationsBlock().get();
+  }
+
   private SolverOutput executeSolver(final String pathToModel) throws IOException {
     final Optional<ASTNESTMLCompilationUnit> root = parser.parse(pathToModel);
     assertTrue(root.isPresent());
@@ -0,0 +1,92 @@
+/*
+ * Copyright (c)  RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.frontend;
+
+import com.google.common.collect.Lists;
+import org.junit.Test;
+
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.attribute.FileTime;
+import java.util.Map;
+
+import static org.junit.Assert.*;
+
+/**
+ * Tests that the build manifest survives a round trip and that unchanged generated files keep their timestamps.
+ *
+ * @author plotnikov
+ */
+public class BuildManifestTest {
+  private final BuildManifest.Entry inputs = entry("source", "sympy 1.1.1", "nest_module", false);
+
+  private static BuildManifest.Entry entry(
+      final String source,
+      final String environment,
+      final String module,
+      final boolean tracing) {
+    return new BuildManifest.Entry(source, "solver", "templates", environment, module, tracing);
+  }
+
+  @Test
+  public void testRoundTrip() throws Exception {
+    final Path targetPath = Files.createTempDirectory("manifest");
+    Files.write(targetPath.resolve("iaf_neuron.h"), "header".getBytes());
+    Files.write(targetPath.resolve("iaf_neuron.cpp"), "source".getBytes());
+
+    final BuildManifest manifest = BuildManifest.read(targetPath);
+    assertFalse(manifest.isUpToDate("iaf_neuron", inputs));
+    manifest.update("iaf_neuron", inputs);
+    manifest.update("deleted_neuron", inputs);
+    manifest.retain(Lists.newArrayList("iaf_neuron"));
+    manifest.write();
+
+    final BuildManifest testant = BuildManifest.read(targetPath);
+    assertTrue(testant.isUpToDate("iaf_neuron", inputs));
+    assertFalse(testant.isUpToDate("iaf_neuron", entry("changed", "sympy 1.1.1", "nest_module", false)));
+    // the SymPy version, the module name and the tracing flag change the generated code as well
+    assertFalse(testant.isUpToDate("iaf_neuron", entry("source", "sympy 1.2", "nest_module", false)));
+    assertFalse(testant.isUpToDate("iaf_neuron", entry("source", "sympy 1.1.1", "other_module", false)));
+    assertFalse(testant.isUpToDate("iaf_neuron", entry("source", "sympy 1.1.1", "nest_module", true)));
+    assertFalse(testant.isUpToDate("deleted_neuron", inputs));
+
+    // the generated code must be present
+    Files.delete(targetPath.resolve("iaf_neuron.cpp"));
+    assertFalse(testant.isUpToDate("iaf_neuron", inputs));
+  }
+
+  @Test
+  public void testCorruptedManifest() throws Exception {
+    final Path targetPath = Files.createTempDirectory("manifest");
+    Files.write(targetPath.resolve(BuildManifest.MANIFEST_FILE), "{ not json".getBytes());
+
+    assertFalse(BuildManifest.read(targetPath).isUpToDate("iaf_neuron", inputs));
+  }
+
+  @Test
+  public void testRestoreUnchangedTimestamps() throws Exception {
+    final Path targetPath = Files.createTempDirectory("manifest");
+    final Path unchanged = targetPath.resolve("module.h");
+    final Path changed = targetPath.resolve("iaf_neuron.cpp");
+    Files.write(unchanged, "module".getBytes());
+    Files.write(changed, "old".getBytes());
+    final FileTime past = FileTime.fromMillis(1000000000000L);
+    Files.setLastModifiedTime(unchanged, past);
+    Files.setLastModifiedTime(changed, past);
+
+    final Map<Path, BuildManifest.FileState> snapshot = BuildManifest.snapshot(targetPath);
+    assertEquals(2, snapshot.size());
+
+    // regenerate both files
+    Files.write(unchanged, "module".getBytes());
+    Files.write(changed, "new".getBytes());
+    BuildManifest.restoreUnchangedTimestamps(snapshot);
+
+    assertEquals(past, Files.getLastModifiedTime(unchanged));
+    assertNotEquals(past, Files.getLastModifiedTime(changed));
+  }
+
+}
@@ -0,0 +1,42 @@
+/*
+ * Copyright (c)  RWTH Aachen. All rights reserved.
+ *
+ * http://www.se-rwth.de/
+ */
+package org.nest.frontend;
+
+import com.google.common.collect.Lists;
+import org.junit.Test;
+
+import java.nio.file.Files;
+import java.nio.file.Path;
+
+import static org.junit.Assert.*;
+
+/**
+ * Tests the parsing of the environment probe and that failed probes are not cached.
+ *
+ * @author plotnikov
+ */
+public class EnvironmentProbeTest {
+
+  @Test
+  public void testStatus() {
+    final EnvironmentProbe.Status testant = EnvironmentProbe.Status.parse(Lists.newArrayList("python True", "sympy False"));
+    assertTrue(testant.python);
+    assertFalse(testant.sympy);
+    assertFalse(testant.isSatisfied());
+    assertTrue(EnvironmentProbe.Status.parse(Lists.newArrayList("python True", "sympy True")).isSatisfied());
+  }
+
+  @Test
+  public void testMissingInterpreter() throws Exception {
+    final Path cacheFile = Files.createTempDirectory("probes").resolve("probes.properties");
+    final EnvironmentProbe testant = new EnvironmentProbe("no_such_python_interpreter", cacheFile);
+
+    assertFalse(testant.resolveInterpreter().isPresent());
+    assertFalse(testant.probe().isSatisfied());
+    assertFalse(Files.exists(cacheFile));
+  }
+
+}
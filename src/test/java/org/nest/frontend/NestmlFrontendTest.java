@@ -33,11 +33,13 @@ public class NestmlFrontendTest {
         "--dry-run",
         "--json_log", Paths.get(targetPath.toString(), "model_log.log").toString(),
         "--module_name", "integration",
+        "--incremental",
         testInputModelsPath.toString(),
     });
 
     assertTrue(testantLong.isPresent());
     assertTrue(testantLong.get().isTracing());
+    assertTrue(testantLong.get().isIncremental());
     assertFalse(testantLong.get().isCodegeneration());
     assertEquals(testInputModelsPath, testantLong.get().getInputPath());
     assertEquals(targetPath, testantLong.get().getTargetPath());
@@ -49,10 +51,12 @@ public class NestmlFrontendTest {
         "-d",
         "-j", Paths.get(targetPath.toString(), "model_log.log").toString(),
         "-m", "integration",
+        "-i",
         testInputModelsPath.toString(),
     });
     assertTrue(testantShort.isPresent());
     assertTrue(testantShort.get().isTracing());
+    assertTrue(testantShort.get().isIncremental());
     assertFalse(testantShort.get().isCodegeneration());
     assertEquals(testInputModelsPath, testantShort.get().getInputPath());
     assertEquals(targetPath, testantShort.get().getTargetPath());
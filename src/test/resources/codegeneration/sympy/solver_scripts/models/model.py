@@ -0,0 +1 @@
+print("not a solver script")
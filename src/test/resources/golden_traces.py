@@ -0,0 +1,87 @@
+"""
+  Stores the recorded traces of the NEST reference models, so that a comparison only simulates the testant. A trace
+  is identified by the reference model, the input protocol (a JSON-serializable dictionary, e.g. the spike times and
+  weights and the simulation time) and the NEST version. Every recorded variable, including the times, is stored as
+  a `.npy` file. The index entry `<identifier>.json` maps the variables onto the files. Since every identifier has its
+  own index entry, parallel workers can record different models into the same folder. Traces are read memory-mapped,
+  i.e. they are not copied into memory.
+
+  Example:
+
+  store = GoldenTraceStore("golden")
+  traces = store.load("iaf_psc_alpha", protocol, nest.version())
+  if traces is None:
+    traces = store.record("iaf_psc_alpha", protocol, nest.version(), {"times": ts, "V_m": Vms})
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy
+
+INDEX_SUFFIX = ".json"
+
+
+def trace_key(model, protocol, nest_version):
+  """
+  :return: identifier of the traces which doesn't depend on the order of the protocol entries
+  """
+  serialization = json.dumps([model, protocol, nest_version], sort_keys=True)
+  return hashlib.sha1(serialization.encode("utf-8")).hexdigest()
+
+
+class GoldenTraceStore(object):
+
+  def __init__(self, folder):
+    self.folder = folder
+    if not os.path.isdir(folder):
+      os.makedirs(folder)
+
+  def _index_path(self, key):
+    return os.path.join(self.folder, key + INDEX_SUFFIX)
+
+  def record(self, model, protocol, nest_version, traces):
+    """
+    Stores the traces and replaces traces which were recorded before with the same identifier.
+    :param traces: dictionary which maps the names of the recorded variables, e.g. `times` and `V_m`, onto arrays
+    :return: the stored traces, memory-mapped
+    """
+    key = trace_key(model, protocol, nest_version)
+    files = {}
+    for name, values in traces.items():
+      files[name] = key + "_" + name + ".npy"
+      numpy.save(os.path.join(self.folder, files[name]), numpy.asarray(values, dtype=float))
+
+    # the index entry is written last and atomically, so that readers never see partially recorded traces
+    descriptor, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+    with os.fdopen(descriptor, "w") as index_file:
+      json.dump({"model": model, "protocol": protocol, "nest_version": nest_version, "files": files}, index_file,
+                indent=2, sort_keys=True)
+    os.rename(tmp_path, self._index_path(key))
+    return self.load(model, protocol, nest_version)
+
+  def load(self, model, protocol, nest_version):
+    """
+    :return: dictionary which maps the recorded variables onto read-only memory-mapped arrays or None if the traces were
+    not recorded
+    """
+    index_path = self._index_path(trace_key(model, protocol, nest_version))
+    if not os.path.exists(index_path):
+      return None
+    with open(index_path, "r") as index_file:
+      entry = json.load(index_file)
+    return dict((name, numpy.load(os.path.join(self.folder, file_name), mmap_mode="r"))
+                for name, file_name in entry["files"].items())
+
+  def models(self):
+    """
+    :return: list of (model, protocol, NEST version) of all stored traces
+    """
+    entries = []
+    for index_path in sorted(glob.glob(os.path.join(self.folder, "*" + INDEX_SUFFIX))):
+      with open(index_path, "r") as index_file:
+        entry = json.load(index_file)
+      entries.append((entry["model"], entry["protocol"], entry["nest_version"]))
+    return entries
@@ -1,61 +1,181 @@
-
-import nest
-import pylab
-
-nest.Install("models")
-nest.set_verbosity("M_WARNING")
-
-def test(referenceModel, testant, gsl_error_tol, tolerance = 0.000001):
+"""
+  Compares the generated NEST models with the handwritten NEST models. Every reference/testant pair is simulated in
+  its own worker process, i.e. with its own NEST kernel, therefore, the whole model matrix finishes in the time of the
+  slowest pair. The voltage traces are compared with NumPy and the results are written as a JSON report. Figures are
+  only created if a plot folder is passed.
+
+  Example:
+
+  python nest_integration_test_for_models.py --report report.json --plot figures
+  python nest_integration_test_for_models.py --models iaf_psc_alpha_neuron iaf_psc_exp_neuron
+  python nest_integration_test_for_models.py --golden golden_traces
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+import numpy
+
+from golden_traces import GoldenTraceStore
+
+V_m_specifier = 'V_m'  # 'delta_V_m'
+# the input of the reference model and the testant, it identifies the golden traces of the reference models
+PROTOCOL = {"spike_times": [100.0, 200.0], "spike_weights": [1.0, -1.0], "simulation_time": 400.0,
+            "record_from": [V_m_specifier]}
+
+# reference model, testant, gsl_error_tol of the testant, tolerance of the voltage trace
+MODELS = [
+  ("aeif_cond_alpha", "aeif_cond_alpha_implicit", 1.e-3, 0.001),
+  ("aeif_cond_exp", "aeif_cond_exp_implicit", 1.e-3, 0.001),
+  ("hh_cond_exp_traub", "hh_cond_exp_traub_implicit", 1.e-3, 0.001),
+  ("hh_psc_alpha", "hh_psc_alpha_implicit", 1.e-3, 0.001),
+  ("iaf_chxk_2008", "iaf_chxk_2008_implicit", 1.e-3, 0.001),
+  ("iaf_cond_alpha", "iaf_cond_alpha_implicit", 1.e-3, 0.001),
+  ("iaf_cond_beta_neuron", "iaf_cond_beta_neuron", None, 0.001),
+  ("iaf_cond_exp", "iaf_cond_exp_implicit", 1.e-3, 0.001),
+  ("iaf_cond_exp_sfa_rr", "iaf_cond_exp_sfa_rr_implicit", 1.e-3, 0.001),
+  ("iaf_neuron", "iaf_neuron_nestml", None, 0.001),
+  ("iaf_psc_alpha", "iaf_psc_alpha_neuron", None, 0.001),
+  ("iaf_psc_delta", "iaf_psc_delta", None, 0.001),
+  ("iaf_psc_exp", "iaf_psc_exp_neuron", None, 0.01),
+  ("iaf_tum_2000", "iaf_tum_2000_neuron", None, 0.01),
+  ("izhikevich", "izhikevich_neuron", 1.e-3, 0.5),
+  ("izhikevich_psc_alpha", "izhikevich_psc_alpha_implicit", 1.e-3, 0.01),
+  ("mat2_psc_exp", "mat2_psc_exp_neuron", None, 0.1),
+  ("terub_neuron_gpe", "terub_neuron_gpe_implicit", 1.e-3, 0.001),
+  ("terub_neuron_stn", "terub_neuron_stn_implicit", 1.e-3, 0.001)]
+
+
+def simulate(model, gsl_error_tol=None):
+  """
+  Runs the model with the input protocol `PROTOCOL` in a fresh NEST kernel.
+  :return: dictionary with the times and the recorded voltage trace as NumPy arrays
+  """
+  import nest  # every worker process loads its own kernel
+
+  nest.set_verbosity("M_WARNING")
+  nest.Install("models")
   nest.ResetKernel()
-  neuron1=nest.Create (referenceModel)
-  neuron2=nest.Create (testant)
+  neuron = nest.Create(model)
 
   if not (gsl_error_tol is None):
-    nest.SetStatus(neuron2, {"gsl_error_tol": gsl_error_tol})
-
-  spikegenerator=nest.Create('spike_generator',params={'spike_times':[100.0, 200.0], 'spike_weights':[1.0, -1.0]})
-
-  nest.Connect(spikegenerator, neuron1)
-  nest.Connect(spikegenerator, neuron2)
-
-  multimeter1=nest.Create('multimeter')
-  multimeter2=nest.Create('multimeter')
-
-  V_m_specifier = 'V_m'# 'delta_V_m'
-  nest.SetStatus (multimeter1, {"withtime":True, "record_from":[V_m_specifier]})
-  nest.SetStatus (multimeter2, {"withtime":True, "record_from":[V_m_specifier]})
-
-  nest.Connect (multimeter1, neuron1)
-  nest.Connect (multimeter2, neuron2)
-
-  nest.Simulate (400.0)
-  dmm1=nest.GetStatus(multimeter1)[0]
-  Vms1=dmm1["events"][V_m_specifier]
-  ts1=dmm1["events"]["times"]
-
-  events1=dmm1["events"]
-  pylab.figure(1)
-
-  dmm2=nest.GetStatus(multimeter2)[0]
-  Vms2=dmm2["events"][V_m_specifier]
-  ts2=dmm2["events"]["times"]
-
-  #pylab.plot(ts1, Vms1, label = "Reference " + referenceModel)
-  #pylab.plot(ts2, Vms2, label = "Testant " + testant)
-  #pylab.legend(loc='upper right')
-
-  for index in range(0, len(Vms1)):
-  	if abs(Vms1[index]-Vms2[index]) > tolerance:
-  		print('!!!!!!!!!!!!!!!!!!!!')
-  		print(str(Vms1[index]) + " divers from  " + str(Vms2[index]) + " at iteration: " + str(index) + " of overall iterations: " + str(len(Vms1)))
-  		print('!!!!!!!!!!!!!!!!!!!!')
-  		raise Exception(testant + ": TEST FAILED")
-  	elif abs(Vms1[index]-Vms2[index]) > 0:
-  		None #print("Greater than 0 difference" + str(abs(Vms1[index]-Vms2[index])) + " at iteration: " + str(index) + " of overall iterations: " + str(len(Vms1)))
-  print(testant + " PASSED")
+    nest.SetStatus(neuron, {"gsl_error_tol": gsl_error_tol})
+
+  spikegenerator = nest.Create('spike_generator', params={'spike_times': PROTOCOL["spike_times"],
+                                                          'spike_weights': PROTOCOL["spike_weights"]})
+  nest.Connect(spikegenerator, neuron)
+
+  multimeter = nest.Create('multimeter')
+  nest.SetStatus(multimeter, {"withtime": True, "record_from": [V_m_specifier]})
+  nest.Connect(multimeter, neuron)
+
+  nest.Simulate(PROTOCOL["simulation_time"])
+  dmm = nest.GetStatus(multimeter)[0]
+  return {"times": numpy.asarray(dmm["events"]["times"]), V_m_specifier: numpy.asarray(dmm["events"][V_m_specifier])}
+
+
+def reference_traces(referenceModel, golden_folder=None):
+  """
+  :return: traces of the reference model. If a golden trace folder is passed, the reference model is only simulated if
+  its traces for the current NEST version are not stored yet.
+  """
+  if golden_folder is None:
+    return simulate(referenceModel)
+
+  import nest
+  store = GoldenTraceStore(golden_folder)
+  traces = store.load(referenceModel, PROTOCOL, nest.version())
+  if traces is None:
+    traces = store.record(referenceModel, PROTOCOL, nest.version(), simulate(referenceModel))
+  return traces
+
+
+def compare_traces(Vms1, Vms2, tolerance):
+  """
+  :return: dictionary with the maximal absolute and relative error, the index of the first sample which differs by more
+  than the tolerance (None if there is none) and whether the traces match
+  """
+  Vms1 = numpy.asarray(Vms1, dtype=float)
+  Vms2 = numpy.asarray(Vms2, dtype=float)
+  if Vms1.shape != Vms2.shape:
+    return {"passed": False, "samples": [Vms1.size, Vms2.size], "max_abs_error": None, "max_rel_error": None,
+            "first_divergence": 0}
+
+  abs_error = numpy.abs(Vms1 - Vms2)
+  rel_error = abs_error / numpy.maximum(numpy.abs(Vms1), numpy.finfo(float).tiny)
+  # NaN in one of the traces is a divergence as well
+  with numpy.errstate(invalid="ignore"):
+    diverged = numpy.flatnonzero(~(abs_error <= tolerance))
+  return {"passed": diverged.size == 0,
+          "samples": Vms1.size,
+          "max_abs_error": float(numpy.nanmax(abs_error)) if Vms1.size else 0.0,
+          "max_rel_error": float(numpy.nanmax(rel_error)) if Vms1.size else 0.0,
+          "first_divergence": int(diverged[0]) if diverged.size else None}
+
+
+def plot(referenceModel, testant, ts, Vms1, Vms2, plot_folder):
+  import matplotlib
+  matplotlib.use("Agg")
+  import pylab
+
+  pylab.figure()
+  pylab.plot(ts, Vms1, label="Reference " + referenceModel)
+  pylab.plot(ts, Vms2, label="Testant " + testant)
+  pylab.legend(loc='upper right')
+  pylab.savefig(os.path.join(plot_folder, testant + ".png"))
+  pylab.close()
+
+
+def test(model, plot_folder=None, golden_folder=None):
+  """
+  Worker of the harness: simulates and compares one model pair.
+  :param model: tuple of the reference model, the testant, the gsl_error_tol and the tolerance, see `MODELS`
+  :param golden_folder: folder of the `GoldenTraceStore` with the traces of the reference models
+  :return: report of the pair
+  """
+  referenceModel, testant, gsl_error_tol, tolerance = model
+  report = {"reference": referenceModel, "testant": testant, "tolerance": tolerance}
+  start = time.time()
+  try:
+    reference = reference_traces(referenceModel, golden_folder)
+    testant_traces = simulate(testant, gsl_error_tol)
+    report.update(compare_traces(reference[V_m_specifier], testant_traces[V_m_specifier], tolerance))
+    if plot_folder is not None:
+      plot(referenceModel, testant, reference["times"], reference[V_m_specifier], testant_traces[V_m_specifier],
+           plot_folder)
+  except Exception:
+    report.update({"passed": False, "error": traceback.format_exc()})
+  report["time"] = time.time() - start
+  return report
+
+
+def _test(arguments):
+  return test(*arguments)
+
+
+def run_models(models, processes=None, plot_folder=None, golden_folder=None):
+  """
+  Runs every model pair in its own worker process. A process is never reused, therefore, every pair gets a fresh kernel.
+  :return: list with the reports of the pairs in the order of `models`
+  """
+  pool = multiprocessing.Pool(processes or len(models), maxtasksperchild=1)
+  try:
+    return pool.map(_test, [(model, plot_folder, golden_folder) for model in models], chunksize=1)
+  finally:
+    pool.close()
+    pool.join()
 
 
 def test_multysinapse():
+  import nest
+  import pylab
+
+  nest.Install("models")
+  nest.set_verbosity("M_WARNING")
   neuron1=nest.Create ("iaf_psc_alpha_multisynapse_neuron")
   neuron2=nest.Create ("iaf_psc_alpha_multisynapse_neuron")
 
@@ -75,7 +195,6 @@ def test_multysinapse():
   multimeter1=nest.Create('multimeter')
   multimeter2=nest.Create('multimeter')
 
-  V_m_specifier = 'V_m'# 'delta_V_m'
   nest.SetStatus (multimeter1, {"withtime":True, "record_from":[V_m_specifier]})
   nest.SetStatus (multimeter2, {"withtime":True, "record_from":[V_m_specifier]})
 
@@ -87,9 +206,6 @@ def test_multysinapse():
   Vms1=dmm1["events"][V_m_specifier]
   ts1=dmm1["events"]["times"]
 
-  events1=dmm1["events"]
-  pylab.figure(1)
-
   dmm2=nest.GetStatus(multimeter2)[0]
   Vms2=dmm2["events"][V_m_specifier]
   ts2=dmm2["events"]["times"]
@@ -99,14 +215,12 @@ def test_multysinapse():
 
   pylab.show()
 
-  for index in range(0, len(Vms1)):
-    if abs(Vms1[index]-Vms2[index]) > 0.000001:
-      print('!!!!!!!!!!!!!!!!!!!!')
-      print(str(Vms1[index]) + " divers from  " + str(Vms2[index]) + " at iteration: " + str(index) + " of overall iterations: " + str(len(Vms1)))
-      print('!!!!!!!!!!!!!!!!!!!!')
-      raise Exception("TEST FAILED")
-    elif abs(Vms1[index]-Vms2[index]) > 0:
-      print("Greater than 0 difference" + str(abs(Vms1[index]-Vms2[index])) + " at iteration: " + str(index) + " of overall iterations: " + str(len(Vms1)))
+  result = compare_traces(Vms1, Vms2, 0.000001)
+  if not result["passed"]:
+    print('!!!!!!!!!!!!!!!!!!!!')
+    print("The traces diverge at iteration: " + str(result["first_divergence"]) + " of overall iterations: " + str(len(Vms1)))
+    print('!!!!!!!!!!!!!!!!!!!!')
+    raise Exception("TEST FAILED")
   print("Test: PASSED")
 
 
@@ -115,30 +229,30 @@ def test_multysinapse():
 if __name__ == "__main__":
   # execute only if run as a script
   # test_multysinapse()
-  models = list()
-  
-  models.append( ("aeif_cond_alpha", "aeif_cond_alpha_implicit", 1.e-3, 0.001))
-  models.append( ("aeif_cond_exp", "aeif_cond_exp_implicit", 1.e-3, 0.001))
-  models.append( ("hh_cond_exp_traub", "hh_cond_exp_traub_implicit", 1.e-3, 0.001))
-  models.append( ("hh_psc_alpha", "hh_psc_alpha_implicit", 1.e-3, 0.001))
-  models.append( ("iaf_chxk_2008", "iaf_chxk_2008_implicit", 1.e-3, 0.001))
-  models.append( ("iaf_cond_alpha", "iaf_cond_alpha_implicit", 1.e-3, 0.001))
-  models.append( ("iaf_cond_beta_neuron", "iaf_cond_beta_neuron", None, 0.001))
-  models.append( ("iaf_cond_exp", "iaf_cond_exp_implicit", 1.e-3, 0.001))
-  models.append( ("iaf_cond_exp_sfa_rr", "iaf_cond_exp_sfa_rr_implicit", 1.e-3, 0.001))
-  models.append( ("iaf_neuron", "iaf_neuron_nestml", None, 0.001))
-  models.append( ("iaf_psc_alpha", "iaf_psc_alpha_neuron", None, 0.001))
-  models.append( ("iaf_psc_delta", "iaf_psc_delta", None, 0.001))
-  models.append( ("iaf_psc_exp", "iaf_psc_exp_neuron", None, 0.01))    
-  models.append( ("iaf_tum_2000", "iaf_tum_2000_neuron", None, 0.01))
-  models.append( ("izhikevich", "izhikevich_neuron", 1.e-3, 0.5))
-  models.append( ("izhikevich_psc_alpha", "izhikevich_psc_alpha_implicit", 1.e-3, 0.01))
-  models.append( ("mat2_psc_exp", "mat2_psc_exp_neuron", None, 0.1))
-  models.append( ("terub_neuron_gpe", "terub_neuron_gpe_implicit", 1.e-3, 0.001))
-  models.append( ("terub_neuron_stn", "terub_neuron_stn_implicit", 1.e-3, 0.001))
-
-
-  for reference, testant, gsl_error_tol, tollerance in models:
-    test(reference, testant, gsl_error_tol, tollerance)
-
-  
\ No newline at end of file
+  parser = argparse.ArgumentParser(description="Compares the generated NEST models with the handwritten NEST models.")
+  parser.add_argument("--models", nargs="*", help="names of the testants which are compared, all if omitted")
+  parser.add_argument("--processes", type=int, help="number of worker processes, one per model pair if omitted")
+  parser.add_argument("--report", help="file where the JSON report is written")
+  parser.add_argument("--plot", help="folder where the voltage traces are plotted, no plots if omitted")
+  parser.add_argument("--golden", help="folder with the stored traces of the reference models, the reference models are "
+                                       "simulated in every run if omitted")
+  args = parser.parse_args()
+
+  models = [model for model in MODELS if not args.models or model[1] in args.models]
+  if args.plot and not os.path.isdir(args.plot):
+    os.makedirs(args.plot)
+
+  reports = run_models(models, args.processes, args.plot, args.golden)
+  for report in reports:
+    if report["passed"]:
+      print(report["testant"] + " PASSED")
+    elif "error" in report:
+      print(report["testant"] + ": TEST FAILED\n" + report["error"])
+    else:
+      print(report["testant"] + ": TEST FAILED, max abs error " + str(report["max_abs_error"]) +
+            " at first divergence " + str(report["first_divergence"]) + " of " + str(report["samples"]))
+
+  if args.report:
+    with open(args.report, "w") as report_file:
+      json.dump(reports, report_file, indent=2)
+  sys.exit(0 if all(report["passed"] for report in reports) else 1)
@@ -2,57 +2,64 @@
 import nest
 import pylab
 
+from golden_traces import GoldenTraceStore
+from nest_integration_test_for_models import compare_traces
+
 nest.Install("models")
 nest.set_verbosity("M_WARNING")
 
-def test(referenceModel, testant, gsl_error_tol, tolerance = 0.000001):
+# the input of the reference model and the testant, it identifies the golden traces of the reference models
+PROTOCOL = {"spike_times": [100.0, 200.0], "spike_weights": [20.0, -20.0], "simulation_time": 400.0,
+            "record_from": ["V_m"]}
+
+def simulate(model, gsl_error_tol = None):
   nest.ResetKernel()
-  neuron1=nest.Create (referenceModel)
-  neuron2=nest.Create (testant)
+  neuron=nest.Create (model)
 
   if not (gsl_error_tol is None):
-    nest.SetStatus(neuron2, {"gsl_error_tol": gsl_error_tol})
+    nest.SetStatus(neuron, {"gsl_error_tol": gsl_error_tol})
 
-  spikegenerator=nest.Create('spike_generator',params={'spike_times':[100.0, 200.0], 'spike_weights':[20.0, -20.0]})
+  spikegenerator=nest.Create('spike_generator',params={'spike_times':PROTOCOL["spike_times"], 'spike_weights':PROTOCOL["spike_weights"]})
+  nest.Connect(spikegenerator, neuron)
 
-  nest.Connect(spikegenerator, neuron1)
-  nest.Connect(spikegenerator, neuron2)
+  multimeter=nest.Create('multimeter')
+  nest.SetStatus (multimeter, {"withtime":True, "record_from":PROTOCOL["record_from"]})
+  nest.Connect (multimeter, neuron)
 
-  multimeter1=nest.Create('multimeter')
-  multimeter2=nest.Create('multimeter')
+  nest.Simulate (PROTOCOL["simulation_time"])
+  events=nest.GetStatus(multimeter)[0]["events"]
+  return dict((name, events[name]) for name in ["times"] + PROTOCOL["record_from"])
 
+def test(referenceModel, testant, gsl_error_tol, tolerance = 0.000001, golden_folder = None):
   V_m_specifier = 'V_m'# 'delta_V_m'
-  nest.SetStatus (multimeter1, {"withtime":True, "record_from":[V_m_specifier]})
-  nest.SetStatus (multimeter2, {"withtime":True, "record_from":[V_m_specifier]})
-
-  nest.Connect (multimeter1, neuron1)
-  nest.Connect (multimeter2, neuron2)
-
-  nest.Simulate (400.0)
-  dmm1=nest.GetStatus(multimeter1)[0]
-  Vms1=dmm1["events"][V_m_specifier]
-  ts1=dmm1["events"]["times"]
-
-  events1=dmm1["events"]
-  pylab.figure(1)
-
-  dmm2=nest.GetStatus(multimeter2)[0]
-  Vms2=dmm2["events"][V_m_specifier]
-  ts2=dmm2["events"]["times"]
+  # the reference model is simulated only once per NEST version if its traces are stored
+  reference = None
+  if golden_folder is not None:
+    store = GoldenTraceStore(golden_folder)
+    reference = store.load(referenceModel, PROTOCOL, nest.version())
+    if reference is None:
+      reference = store.record(referenceModel, PROTOCOL, nest.version(), simulate(referenceModel))
+  else:
+    reference = simulate(referenceModel)
+
+  testant_traces = simulate(testant, gsl_error_tol)
+  Vms1=reference[V_m_specifier]
+  ts1=reference["times"]
+  Vms2=testant_traces[V_m_specifier]
+  ts2=testant_traces["times"]
 
   pylab.plot(ts1, Vms1, label = "Reference " + referenceModel)
   pylab.plot(ts2, Vms2, label = "Testant " + testant)
   pylab.legend(loc='upper right')
 
   pylab.show()
-  for index in range(0, len(Vms1)):
-  	if abs(Vms1[index]-Vms2[index]) > tolerance:
-  		print('!!!!!!!!!!!!!!!!!!!!')
-  		print(str(Vms1[index]) + " divers from  " + str(Vms2[index]) + " at iteration: " + str(index) + " of overall iterations: " + str(len(Vms1)))
-  		print('!!!!!!!!!!!!!!!!!!!!')
-  		raise Exception(testant + ": TEST FAILED")
-  	elif abs(Vms1[index]-Vms2[index]) > 0:
-  		None #print("Greater than 0 difference" + str(abs(Vms1[index]-Vms2[index])) + " at iteration: " + str(index) + " of overall iterations: " + str(len(Vms1)))
+  result = compare_traces(Vms1, Vms2, tolerance)
+  if not result["passed"]:
+    print('!!!!!!!!!!!!!!!!!!!!')
+    print("The traces diverge at iteration: " + str(result["first_divergence"]) + " of overall iterations: " + str(len(Vms1)) +
+          ", max abs error: " + str(result["max_abs_error"]))
+    print('!!!!!!!!!!!!!!!!!!!!')
+    raise Exception(testant + ": TEST FAILED")
   print(testant + " PASSED")
 
 if __name__ == "__main__":